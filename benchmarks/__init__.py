@@ -0,0 +1,5 @@
+"""Performance benchmarks for the users API and store.
+
+Benchmarks are plain scripts run with ``python -m benchmarks.<name>``; they
+are not collected by pytest.
+"""
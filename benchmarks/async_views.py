@@ -0,0 +1,171 @@
+"""Compare the async views under ASGI with the sync views under WSGI.
+
+Usage::
+
+    python -m benchmarks.async_views --connections 32 --seconds 5
+
+Starts the application three ways on a local port, one worker each: the
+sync views under gunicorn (WSGI, as deployed by ``docker-compose.prod.yml``),
+the sync views under uvicorn (ASGI, each request handed to a worker thread)
+and the async views under uvicorn (``USERS_ASYNC_VIEWS=1``). For each it
+keeps ``--connections`` HTTP/1.1 clients busy with one kind of request at a
+time and prints requests per second and latency. The servers inherit the
+environment, so e.g. ``USERS_STORE_BACKEND=shared`` benchmarks that backend.
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from users.loadtest import Connection, http_request
+
+from .common import print_table
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+_SERVERS = {
+    "wsgi-sync": (
+        ["gunicorn", "config.wsgi:application", "--workers", "1", "--bind"],
+        {},
+    ),
+    "asgi-sync": (
+        ["uvicorn", "config.asgi:application", "--log-level", "warning", "--fd"],
+        {"USERS_ASYNC_VIEWS": "0"},
+    ),
+    "asgi-async": (
+        ["uvicorn", "config.asgi:application", "--log-level", "warning", "--fd"],
+        {"USERS_ASYNC_VIEWS": "1"},
+    ),
+}
+
+
+def _workloads(ids: list[str]) -> dict[str, list[bytes]]:
+    """Build the requests of each workload, cycling through ``ids``."""
+    return {
+        "GET /user/<uid>": [http_request("GET", f"/user/{uid}") for uid in ids],
+        "GET /users?limit=20": [http_request("GET", "/users?limit=20")],
+        "PATCH /user/<uid>": [
+            http_request("PATCH", f"/user/{uid}", {"phone": f"+1555{index:07d}"})
+            for index, uid in enumerate(ids)
+        ],
+    }
+
+
+async def _load(port: int, requests: list[bytes], connections: int, seconds: float):
+    """Keep ``connections`` clients sending ``requests`` for ``seconds``.
+
+    Returns:
+        dict: ``rps``, ``p50_ms``, ``p99_ms`` and the number of ``errors``.
+    """
+    samples: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client(offset: int) -> None:
+        nonlocal errors
+        connection = Connection("127.0.0.1", port)
+        index = offset
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                status, _ = await connection.request(requests[index % len(requests)])
+                samples.append(time.perf_counter() - start)
+                errors += status >= 400
+                index += 1
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(offset) for offset in range(connections)))
+    elapsed = time.perf_counter() - started
+    samples.sort()
+    return {
+        "rps": len(samples) / elapsed,
+        "p50_ms": samples[len(samples) // 2] * 1000,
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000,
+        "errors": errors,
+    }
+
+
+async def _bench_server(port: int, connections: int, seconds: float) -> list[dict]:
+    """Run every workload against the server listening on ``port``."""
+    connection = Connection("127.0.0.1", port)
+    for _ in range(100):
+        try:
+            status, body = await connection.request(http_request("GET", "/users"))
+            break
+        except OSError:
+            connection.close()
+            await asyncio.sleep(0.1)
+    else:
+        raise RuntimeError(f"server on port {port} did not start")
+    connection.close()
+    if status != 200:
+        raise RuntimeError(f"GET /users returned {status}")
+    ids = [user["id"] for user in json.loads(body)]
+    rows = []
+    for workload, requests in _workloads(ids).items():
+        result = await _load(port, requests, connections, seconds)
+        rows.append({"workload": workload, **result})
+    return rows
+
+
+def _run_server(name: str, connections: int, seconds: float) -> list[dict]:
+    """Start one server, benchmark it and stop it."""
+    command, env = _SERVERS[name]
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    if command[0] == "gunicorn":
+        address, pass_fds = f"127.0.0.1:{port}", ()
+        listener.close()
+    else:
+        # uvicorn takes the bound socket, so there is no race for the port.
+        address, pass_fds = str(listener.fileno()), (listener.fileno(),)
+    server = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", *command, address],
+        cwd=_ROOT,
+        env={**os.environ, **env},
+        pass_fds=pass_fds,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        rows = asyncio.run(_bench_server(port, connections, seconds))
+    finally:
+        server.terminate()
+        server.wait()
+        listener.close()
+    return [{"server": name, **row} for row in rows]
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument(
+        "--servers",
+        default=",".join(_SERVERS),
+        help="comma-separated servers to run: " + ", ".join(_SERVERS),
+    )
+    parser.add_argument(
+        "--connections", type=int, default=32, help="concurrent clients"
+    )
+    parser.add_argument(
+        "--seconds", type=float, default=5, help="duration of each workload"
+    )
+    args = parser.parse_args(argv)
+
+    rows = []
+    for name in args.servers.split(","):
+        rows.extend(_run_server(name, args.connections, args.seconds))
+    print_table(rows, ["server", "workload", "rps", "p50_ms", "p99_ms", "errors"])
+
+
+if __name__ == "__main__":
+    main()
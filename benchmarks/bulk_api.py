@@ -0,0 +1,133 @@
+"""Compare bulk endpoints with one request per user.
+
+Usage::
+
+    python -m benchmarks.bulk_api --users 2000 --batch 500
+
+Creates, updates and deletes the same number of users through the full
+Django request stack, first with ``POST /user``, ``PATCH /user/<uid>`` and
+``DELETE /user/<uid>``, then with ``/users/bulk`` in batches, and prints
+users per second for each.
+"""
+
+from __future__ import annotations
+import argparse
+import time
+
+from .common import print_table, setup_django
+
+
+def _timed(run) -> float:
+    """Seconds taken by ``run()``."""
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--users", type=int, default=2000, help="users to write")
+    parser.add_argument("--batch", type=int, default=500, help="bulk batch size")
+    parser.add_argument("--backend", default="memory", help="store backend")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    # pylint: disable=import-outside-toplevel
+    from django.conf import settings
+    from rest_framework.test import APIClient
+    from users import store
+    from users.backends import load_backend
+    from users.sample_data import generate_users
+
+    settings.ALLOWED_HOSTS = ["testserver"]
+    store.set_backend(load_backend(args.backend))
+    client = APIClient()
+    payloads = [
+        {field: user[field] for field in ("firstName", "lastName", "email", "phone")}
+        for user in generate_users(args.users)
+    ]
+    batches = [
+        range(start, min(start + args.batch, args.users))
+        for start in range(0, args.users, args.batch)
+    ]
+    rows = []
+
+    def record(mode: str, operation: str, seconds: float) -> None:
+        rows.append(
+            {
+                "mode": mode,
+                "operation": operation,
+                "users_per_sec": args.users / seconds,
+                "total_ms": seconds * 1000,
+            }
+        )
+
+    store.clear_users()
+    ids = []
+    record(
+        "single",
+        "create",
+        _timed(
+            lambda: ids.extend(
+                client.post("/user", data, format="json").json()["id"]
+                for data in payloads
+            )
+        ),
+    )
+    record(
+        "single",
+        "update",
+        _timed(
+            lambda: [
+                client.patch(f"/user/{uid}", {"lastName": "Single"}, format="json")
+                for uid in ids
+            ]
+        ),
+    )
+    record(
+        "single",
+        "delete",
+        _timed(lambda: [client.delete(f"/user/{uid}") for uid in ids]),
+    )
+
+    store.clear_users()
+    ids = []
+
+    def bulk_create():
+        for batch in batches:
+            response = client.post(
+                "/users/bulk", [payloads[i] for i in batch], format="json"
+            )
+            ids.extend(result["user"]["id"] for result in response.json()["results"])
+
+    record(f"bulk/{args.batch}", "create", _timed(bulk_create))
+    record(
+        f"bulk/{args.batch}",
+        "update",
+        _timed(
+            lambda: [
+                client.patch(
+                    "/users/bulk",
+                    [{"id": ids[i], "lastName": "Bulk"} for i in batch],
+                    format="json",
+                )
+                for batch in batches
+            ]
+        ),
+    )
+    record(
+        f"bulk/{args.batch}",
+        "delete",
+        _timed(
+            lambda: [
+                client.delete("/users/bulk", [ids[i] for i in batch], format="json")
+                for batch in batches
+            ]
+        ),
+    )
+    print_table(rows, ["mode", "operation", "users_per_sec", "total_ms"])
+
+
+if __name__ == "__main__":
+    main()
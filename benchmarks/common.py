@@ -0,0 +1,86 @@
+"""Shared helpers for the benchmark scripts."""
+
+from __future__ import annotations
+import os
+import statistics
+import time
+from collections.abc import Callable
+
+
+def setup_django(db_path: str | None = None) -> None:
+    """Configure Django for a standalone benchmark run.
+
+    Args:
+        db_path (str | None): If given, use this SQLite file as the default
+            database and apply migrations to it.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    # pylint: disable=import-outside-toplevel
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    if db_path is not None:
+        settings.DATABASES["default"]["NAME"] = db_path
+    django.setup()
+    if db_path is not None:
+        call_command("migrate", verbosity=0, interactive=False)
+
+
+def measure(
+    operation: Callable[[int], object],
+    count: int,
+    setup: Callable[[int], object] | None = None,
+) -> dict:
+    """Time ``count`` calls of ``operation``.
+
+    Args:
+        operation (Callable[[int], object]): Called with the iteration index.
+        count (int): Number of calls.
+        setup (Callable[[int], object] | None): Called with the iteration
+            index before each call, untimed.
+
+    Returns:
+        dict: ``ops_per_sec``, and ``mean_us``/``p50_us``/``p99_us`` latency
+        in microseconds.
+    """
+    samples = []
+    clock = time.perf_counter
+    for index in range(count):
+        if setup is not None:
+            setup(index)
+        start = clock()
+        operation(index)
+        samples.append(clock() - start)
+    samples.sort()
+    total = sum(samples)
+    return {
+        "ops_per_sec": count / total if total else float("inf"),
+        "mean_us": statistics.fmean(samples) * 1e6,
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p99_us": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6,
+    }
+
+
+def print_table(rows: list[dict], columns: list[str]) -> None:
+    """Print result rows as an aligned text table.
+
+    Args:
+        rows (list[dict]): One dict per row.
+        columns (list[str]): Keys to print, in order.
+    """
+
+    def cell(value) -> str:
+        return f"{value:,.1f}" if isinstance(value, float) else str(value)
+
+    widths = [
+        max(len(column), *(len(cell(row[column])) for row in rows))
+        for column in columns
+    ]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print(
+            "  ".join(
+                cell(row[column]).rjust(width) for column, width in zip(columns, widths)
+            )
+        )
@@ -0,0 +1,149 @@
+"""Measure idle SSE connections and change fan-out through ASGI.
+
+Usage::
+
+    python -m benchmarks.events_fanout --clients 1000,5000 --writes 20
+
+Opens the given number of ``GET /users/events`` streams against the ASGI
+application in one event loop, as a single uvicorn worker would, then
+writes users one at a time and prints the memory held per idle connection
+and how long each write takes to reach every client.
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+from .common import print_table, setup_django
+
+
+class _Client:
+    """One SSE connection driven directly through the ASGI interface."""
+
+    def __init__(self):
+        self.events = 0
+        self.connected = False
+        self.arrived = asyncio.Event()
+        self.gone = asyncio.Event()
+
+    async def receive(self) -> dict:
+        """Report the request body, then wait until told to disconnect."""
+        if not self.arrived.is_set():
+            self.arrived.set()
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self.gone.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message: dict) -> None:
+        """Note the stream opening and count the events in each body chunk."""
+        if message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            self.connected = self.connected or body.startswith(b": connected")
+            self.events += body.count(b"\nevent: ")
+
+
+def _scope() -> dict:
+    """Build the ASGI scope of an SSE request for ``/users/events``."""
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/users/events",
+        "raw_path": b"/users/events",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"localhost"), (b"accept", b"text/event-stream")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 8000),
+    }
+
+
+async def _fan_out(connections: list[_Client], writes: int) -> list[float]:
+    """Create ``writes`` users and time how long each takes to reach everyone."""
+    # pylint: disable=import-outside-toplevel
+    from asgiref.sync import sync_to_async
+    from users import store
+    from users.sample_data import generate_users
+
+    latencies = []
+    for count, user in enumerate(generate_users(writes), 1):
+        start = time.perf_counter()
+        await sync_to_async(store.create_user)(
+            {
+                field: user[field]
+                for field in ("firstName", "lastName", "email", "phone")
+            }
+        )
+        while any(client.events < count for client in connections):
+            await asyncio.sleep(0.001)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies
+
+
+async def _run(clients: int, writes: int) -> dict:
+    """Open ``clients`` streams, fan ``writes`` writes out and measure."""
+    # pylint: disable=import-outside-toplevel
+    from asgiref.sync import sync_to_async
+    from config.asgi import application
+    from users import store
+
+    await sync_to_async(store.reset_and_seed)()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    connections = [_Client() for _ in range(clients)]
+    tasks = [
+        asyncio.create_task(application(_scope(), client.receive, client.send))
+        for client in connections
+    ]
+    while not all(client.connected for client in connections):
+        await asyncio.sleep(0.01)
+    opened = time.perf_counter() - started
+    per_client = (tracemalloc.get_traced_memory()[0] - before) / clients
+    tracemalloc.stop()
+
+    latencies = await _fan_out(connections, writes)
+    for client in connections:
+        client.gone.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {
+        "clients": clients,
+        "open_s": opened,
+        "kib_per_client": per_client / 1024,
+        "fanout_p50_ms": statistics.median(latencies) * 1000,
+        "fanout_max_ms": latencies[-1] * 1000,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument(
+        "--clients", default="1000,5000", help="comma-separated connection counts"
+    )
+    parser.add_argument("--writes", type=int, default=20, help="writes to fan out")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    # pylint: disable=import-outside-toplevel
+    from django.conf import settings
+
+    settings.ALLOWED_HOSTS = ["localhost"]
+    rows = [
+        asyncio.run(_run(int(clients), args.writes))
+        for clients in args.clients.split(",")
+    ]
+    print_table(
+        rows,
+        ["clients", "open_s", "kib_per_client", "fanout_p50_ms", "fanout_max_ms"],
+    )
+
+
+if __name__ == "__main__":
+    main()
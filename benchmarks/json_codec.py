@@ -0,0 +1,105 @@
+"""Compare the users API's JSON renderer and parser with DRF's.
+
+Usage::
+
+    python -m benchmarks.json_codec --ops 5000
+
+Renders a user, a page of users and a bulk response, and parses a create
+and a bulk create body, with DRF's ``JSONRenderer`` / ``JSONParser`` and
+with ``UsersJSONRenderer`` / ``UsersJSONParser`` from ``users.renderers``,
+both with ``orjson`` (if installed) and with the stdlib fallback. Prints
+operations per second for each.
+"""
+
+from __future__ import annotations
+import argparse
+import io
+import json
+
+from .common import measure, print_table, setup_django
+
+
+def _cases(users: list[dict]) -> dict:
+    """Build the data each case renders or the body it parses."""
+    create = {key: users[0][key] for key in ("firstName", "lastName", "email")}
+    return {
+        "render user": ("render", users[0]),
+        "render 100 users": ("render", users[:100]),
+        "render 1000 users": ("render", users),
+        "parse create": ("parse", json.dumps(create).encode()),
+        "parse 1000 users": ("parse", json.dumps(users).encode()),
+    }
+
+
+def _codecs() -> dict:
+    """Build the renderer and parser pairs, keyed by column label."""
+    # pylint: disable=import-outside-toplevel
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from users import renderers
+
+    codecs = {"drf": (JSONRenderer(), JSONParser(), renderers.orjson)}
+    codecs["stdlib"] = (
+        renderers.UsersJSONRenderer(),
+        renderers.UsersJSONParser(),
+        None,
+    )
+    if renderers.orjson is not None:
+        codecs["orjson"] = (
+            renderers.UsersJSONRenderer(),
+            renderers.UsersJSONParser(),
+            renderers.orjson,
+        )
+    return codecs
+
+
+def _seed(count: int) -> list[dict]:
+    """Seed the store up to ``count`` users, with some non-ASCII names."""
+    # pylint: disable=import-outside-toplevel
+    from users import store
+
+    store.reset_and_seed()
+    for index in range(count - len(store.list_users())):
+        store.create_user(
+            {
+                "firstName": f"Zoë{index}",
+                "lastName": "Ñúñez",
+                "email": f"user{index}@example.com",
+                "phone": f"+1555{index:07d}",
+            }
+        )
+    return store.list_users()
+
+
+def _operation(kind: str, payload, renderer, json_parser):
+    """Build the call ``measure`` times for one case and codec."""
+    if kind == "render":
+        return lambda _: renderer.render(payload)
+    return lambda _: json_parser.parse(io.BytesIO(payload))
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--ops", type=int, default=5000, help="calls per case")
+    parser.add_argument("--users", type=int, default=1000, help="users to generate")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    # pylint: disable=import-outside-toplevel
+    from users import renderers
+
+    codecs = _codecs()
+    rows = []
+    for case, (kind, payload) in _cases(_seed(args.users)).items():
+        row = {"case": case}
+        for label, (renderer, json_parser, module) in codecs.items():
+            renderers.orjson = module
+            operation = _operation(kind, payload, renderer, json_parser)
+            row[f"{label}_ops_per_sec"] = measure(operation, args.ops)["ops_per_sec"]
+        rows.append(row)
+    print_table(rows, ["case", *(f"{label}_ops_per_sec" for label in codecs)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Compare the store backends on the operations behind each endpoint.
+
+Usage::
+
+    python -m benchmarks.store_backends --users 1000,10000 --ops 2000
+
+Each backend is loaded with the given number of synthetic users and then
+timed on lookups by id and email, first and deep keyset pages, creates,
+updates and deletes. The ORM backend runs against a temporary SQLite file
+in WAL mode, and the durable backend writes its log to a temporary
+directory with the ``--durable-sync`` mode.
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import random
+import tempfile
+
+from .common import measure, print_table, setup_django
+
+PAGE_SIZE = 100
+
+
+def _new_user(index: int) -> dict:
+    """Build the create payload for the index-th benchmark user."""
+    return {
+        "firstName": "Bench",
+        "lastName": "Mark",
+        "email": f"bench.{index}@bench.test",
+        "phone": "+1-555-000-0000",
+    }
+
+
+def bench_backend(name: str, backend, users: list[dict], ops: int) -> list[dict]:
+    """Time every store operation on one loaded backend.
+
+    Args:
+        name (str): Backend label for the results.
+        backend (StoreBackend): The backend to exercise.
+        users (list[dict]): Users to load before timing.
+        ops (int): Number of calls per operation.
+
+    Returns:
+        list[dict]: One result row per operation.
+    """
+    backend.reset_and_seed(users)
+    rng = random.Random(0)
+    ids = [user["id"] for user in users]
+    emails = [user["email"] for user in users]
+    _, middle = backend.list_users_page(len(users) // 2 or 1)
+    created = []
+
+    operations = {
+        "get_user": lambda i: backend.get_user(rng.choice(ids)),
+        "find_user_by_email": lambda i: backend.find_user_by_email(rng.choice(emails)),
+        "list_users_page(first)": lambda i: backend.list_users_page(PAGE_SIZE),
+        "list_users_page(deep)": lambda i: backend.list_users_page(PAGE_SIZE, middle),
+        "create_user": lambda i: created.append(backend.create_user(_new_user(i))),
+        "update_user": lambda i: backend.update_user(
+            rng.choice(ids), {"phone": f"+1-555-111-{i % 10000:04d}"}
+        ),
+        "delete_user": lambda i: backend.delete_user(created[i]["id"]),
+    }
+    rows = []
+    for operation, run in operations.items():
+        result = measure(run, ops)
+        rows.append(
+            {"backend": name, "users": len(users), "operation": operation, **result}
+        )
+    return rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--users", default="1000,10000", help="store sizes")
+    parser.add_argument("--ops", type=int, default=1000, help="calls per operation")
+    parser.add_argument(
+        "--backends", default="memory,durable,orm", help="backends to run"
+    )
+    parser.add_argument(
+        "--durable-sync", default="commit", help="durable backend sync mode"
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, "bench.sqlite3"))
+        # pylint: disable=import-outside-toplevel
+        from django.conf import settings
+        from users.backends import load_backend
+        from users.sample_data import generate_users
+
+        settings.USERS_DURABLE_STORE_SYNC = args.durable_sync
+
+        rows = []
+        for size in (int(value) for value in args.users.split(",")):
+            users = generate_users(size)
+            for name in args.backends.split(","):
+                settings.USERS_DURABLE_STORE_DIR = os.path.join(tmp, f"{name}-{size}")
+                backend = load_backend(name)
+                rows.extend(bench_backend(name, backend, users, args.ops))
+                if hasattr(backend, "close"):
+                    backend.close()
+    print_table(
+        rows, ["backend", "users", "operation", "ops_per_sec", "p50_us", "p99_us"]
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Measure the memory each user takes in the in-memory store.
+
+Usage::
+
+    python -m benchmarks.store_memory --users 10000,100000 --ops 2000
+
+Loads the given number of synthetic users into a ``MemoryBackend`` with
+each ``USERS_STORE_RECORDS`` engine and prints the bytes allocated per user
+(records, indexes and change log together, as traced by ``tracemalloc``),
+along with the cost of reads, which the compact engine pays by building
+each user's dict again.
+"""
+
+from __future__ import annotations
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+
+from .common import measure, print_table, setup_django
+
+PAGE_SIZE = 100
+
+
+def _loaded_bytes(backend, blob: str) -> int:
+    """Load the users encoded in ``blob`` and count the bytes they keep."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        # Decoded here so the backend holds the only references to them.
+        backend.reset_and_seed(json.loads(blob))
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def bench_engine(records: str, users: list[dict], ops: int) -> dict:
+    """Measure one record engine loaded with ``users``.
+
+    Args:
+        records (str): A value of the ``USERS_STORE_RECORDS`` setting.
+        users (list[dict]): Users to load.
+        ops (int): Number of calls per read operation.
+
+    Returns:
+        dict: The result row.
+    """
+    # pylint: disable=import-outside-toplevel
+    from users.backends.memory import MemoryBackend
+
+    backend = MemoryBackend(records=records)
+    loaded = _loaded_bytes(backend, json.dumps(users))
+    rng = random.Random(0)
+    ids = [user["id"] for user in users]
+    get_user = measure(lambda _: backend.get_user(rng.choice(ids)), ops)
+    page = measure(lambda _: backend.list_users_page(PAGE_SIZE), ops)
+    backend.clear_users()
+    return {
+        "records": records,
+        "users": len(users),
+        "bytes_per_user": loaded / len(users),
+        "total_mib": loaded / 2**20,
+        "get_user_p50_us": get_user["p50_us"],
+        "page_p50_us": page["p50_us"],
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--users", default="10000,100000", help="store sizes")
+    parser.add_argument("--ops", type=int, default=2000, help="calls per read")
+    parser.add_argument("--records", default="dict,compact", help="engines to run")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    # pylint: disable=import-outside-toplevel
+    from users.sample_data import generate_users
+
+    rows = []
+    for size in (int(value) for value in args.users.split(",")):
+        users = generate_users(size)
+        for records in args.records.split(","):
+            rows.append(bench_engine(records, users, args.ops))
+    print_table(
+        rows,
+        [
+            "records",
+            "users",
+            "bytes_per_user",
+            "total_mib",
+            "get_user_p50_us",
+            "page_p50_us",
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
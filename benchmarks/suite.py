@@ -0,0 +1,660 @@
+"""Run every store and API benchmark and check the results against a baseline.
+
+Usage::
+
+    python -m benchmarks.suite --sizes 1000,100000,1000000 --output base.json
+    python -m benchmarks.suite --baseline base.json --threshold 0.25
+
+For each store size, loads the configured store backend with that many
+synthetic users and times every public function of ``users.store``
+(``StoreBench``), then a request to every route of ``users.urls`` through
+the Django test client (``RouteBench``). Functions whose cost grows with
+the store, such as ``list_users``, are called fewer times on large stores.
+
+Runs are reproducible: the users, the ids picked and the payloads sent come
+from fixed seeds, so two runs on one machine do the same work. ``--output``
+writes the results as JSON; ``--baseline`` compares each result's median
+latency with the same result in such a file and exits with status 1 if any
+got slower by more than ``--threshold``.
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import gc
+import inspect
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+# pylint: disable=import-error
+from django.conf import settings
+from django.test import AsyncClient, Client
+from users import store
+
+from .common import measure, print_table, setup_django
+
+PAGE_SIZE = 100
+BATCH_SIZE = 100
+
+# Functions whose cost grows with the store are called this many times (or
+# ops scaled down by store size, if more) instead of --ops.
+MIN_LINEAR_OPS = 3
+
+# Settings that change the results; a baseline run with others is noted.
+_COMPARABLE = ("python", "django", "platform", "backend", "records", "metrics")
+
+RESULT_COLUMNS = ["suite", "case", "users", "ops", "ops_per_sec", "p50_us", "p99_us"]
+
+
+# pylint: disable-next=too-many-public-methods,too-many-instance-attributes
+class StoreBench:
+    """One call of each public ``users.store`` function, by function name.
+
+    Each method makes one call with arguments drawn from the loaded users;
+    ``cases`` lists them in the order they are defined in ``users.store``,
+    so writes that need earlier writes (``delete_user`` deletes the users
+    ``create_user`` created) come after them.
+
+    Args:
+        users (list[dict]): The users the store is loaded with.
+    """
+
+    # Functions whose cost grows with the number of users.
+    LINEAR = frozenset({"list_users", "iter_users", "clear_users", "reset_and_seed"})
+
+    # Functions that empty the store; it is loaded again before each call.
+    DESTRUCTIVE = frozenset({"clear_users", "reset_and_seed"})
+
+    def __init__(self, users: list[dict]):
+        self.users = users
+        self.ids = [user["id"] for user in users]
+        self.emails = [user["email"] for user in users]
+        self.rng = random.Random(0)
+        self.serial = itertools.count()
+        self.created: list[str] = []
+        self.batches: list[list[str]] = []
+        self.loop = asyncio.new_event_loop()
+        self.middle = None
+
+    @staticmethod
+    def cases() -> list[str]:
+        """List the public functions of ``users.store``, in source order."""
+        functions = [
+            function
+            for name, function in vars(store).items()
+            if inspect.isfunction(function)
+            and function.__module__ == store.__name__
+            and not name.startswith("_")
+        ]
+        functions.sort(key=lambda function: function.__code__.co_firstlineno)
+        return [function.__name__ for function in functions]
+
+    def load(self, _index: int | None = None) -> None:
+        """Load the store with ``users``, replacing what it holds."""
+        store.get_backend().reset_and_seed(self.users)
+        _, self.middle = store.list_users_page(len(self.users) // 2 or 1)
+
+    def close(self) -> None:
+        """Close the event loop used for the async functions."""
+        self.loop.close()
+
+    def user_id(self) -> str:
+        """Pick a loaded user's id."""
+        return self.rng.choice(self.ids)
+
+    def payload(self) -> dict:
+        """Build a create payload with an email no other user has."""
+        serial = next(self.serial)
+        return {
+            "firstName": "Bench",
+            "lastName": "Mark",
+            "email": f"bench.{serial}@bench.test",
+            "phone": f"+1-555-{serial % 10000:04d}",
+        }
+
+    def change(self) -> dict:
+        """Build an update payload."""
+        return {"phone": f"+1-555-{self.rng.randrange(10000):04d}"}
+
+    def _await(self, coroutine):
+        """Run a coroutine on the suite's event loop."""
+        return self.loop.run_until_complete(coroutine)
+
+    def normalize_email(self, _index: int):
+        """Time ``store.normalize_email``."""
+        return store.normalize_email(f" {self.rng.choice(self.emails).upper()} ")
+
+    def normalize_term(self, _index: int):
+        """Time ``store.normalize_term``."""
+        return store.normalize_term(" Johnson ")
+
+    def sort_key(self, index: int):
+        """Time ``store.sort_key``."""
+        return store.sort_key(
+            "createdAt", self.users[index % len(self.users)]["createdAt"]
+        )
+
+    def now_iso(self, _index: int):
+        """Time ``store.now_iso``."""
+        return store.now_iso()
+
+    def get_backend(self, _index: int):
+        """Time ``store.get_backend``."""
+        return store.get_backend()
+
+    def set_backend(self, _index: int):
+        """Time ``store.set_backend``, putting back the active backend."""
+        return store.set_backend(store.get_backend())
+
+    def load_store(self, _index: int):
+        """Time ``store.load_store`` on a store that is already loaded."""
+        return store.load_store()
+
+    def seed_once(self, _index: int):
+        """Time ``store.seed_once`` on a store that is already seeded."""
+        return store.seed_once()
+
+    def list_users(self, _index: int):
+        """Time ``store.list_users``."""
+        return store.list_users()
+
+    def count_users(self, _index: int):
+        """Time ``store.count_users``."""
+        return store.count_users()
+
+    def list_users_page(self, _index: int):
+        """Time ``store.list_users_page`` from the middle of the store."""
+        return store.list_users_page(PAGE_SIZE, self.middle)
+
+    def iter_users(self, _index: int):
+        """Time ``store.iter_users`` over the whole store."""
+        for _ in store.iter_users(1000):
+            pass
+
+    def get_user(self, _index: int):
+        """Time ``store.get_user``."""
+        return store.get_user(self.user_id())
+
+    def search_users_page(self, _index: int):
+        """Time ``store.search_users_page``."""
+        return store.search_users_page({"lastName": "john"}, ["emma"], PAGE_SIZE)
+
+    def sorted_users_page(self, _index: int):
+        """Time ``store.sorted_users_page``."""
+        return store.sorted_users_page("createdAt", PAGE_SIZE, descending=True)
+
+    def get_users(self, _index: int):
+        """Time ``store.get_users``."""
+        return store.get_users(self.rng.sample(self.ids, PAGE_SIZE))
+
+    def get_user_snapshot(self, _index: int):
+        """Time ``store.get_user_snapshot``."""
+        return store.get_user_snapshot(self.user_id())
+
+    def find_user_by_email(self, _index: int):
+        """Time ``store.find_user_by_email``."""
+        return store.find_user_by_email(self.rng.choice(self.emails).upper())
+
+    def create_user(self, _index: int):
+        """Time ``store.create_user``."""
+        self.created.append(store.create_user(self.payload())["id"])
+
+    def update_user(self, _index: int):
+        """Time ``store.update_user``."""
+        return store.update_user(self.user_id(), self.change())
+
+    def delete_user(self, _index: int):
+        """Time ``store.delete_user`` on a user ``create_user`` created."""
+        return store.delete_user(self.created.pop())
+
+    def create_users(self, _index: int):
+        """Time ``store.create_users``."""
+        payloads = [self.payload() for _ in range(BATCH_SIZE)]
+        self.batches.append([user["id"] for user in store.create_users(payloads)])
+
+    def update_users(self, _index: int):
+        """Time ``store.update_users``."""
+        uids = self.rng.sample(self.ids, BATCH_SIZE)
+        return store.update_users([(uid, self.change()) for uid in uids])
+
+    def delete_users(self, _index: int):
+        """Time ``store.delete_users`` on users ``create_users`` created."""
+        return store.delete_users(self.batches.pop())
+
+    def get_changes(self, _index: int):
+        """Time ``store.get_changes`` for the last page of changes."""
+        return store.get_changes(max(0, store.get_generation() - PAGE_SIZE), PAGE_SIZE)
+
+    def get_generation(self, _index: int):
+        """Time ``store.get_generation``."""
+        return store.get_generation()
+
+    def get_user_version(self, _index: int):
+        """Time ``store.get_user_version``."""
+        return store.get_user_version(self.user_id())
+
+    def get_last_modified(self, _index: int):
+        """Time ``store.get_last_modified``."""
+        return store.get_last_modified()
+
+    def clear_users(self, _index: int):
+        """Time ``store.clear_users`` on a loaded store."""
+        return store.clear_users()
+
+    def reset_and_seed(self, _index: int):
+        """Time ``store.reset_and_seed`` on a loaded store."""
+        return store.reset_and_seed()
+
+    def arun(self, _index: int):
+        """Time ``store.arun``."""
+        return self._await(store.arun(store.get_generation))
+
+    def alist_users_page(self, _index: int):
+        """Time ``store.alist_users_page``."""
+        return self._await(store.alist_users_page(PAGE_SIZE, self.middle))
+
+    def asearch_users_page(self, _index: int):
+        """Time ``store.asearch_users_page``."""
+        return self._await(
+            store.asearch_users_page({"lastName": "john"}, ["emma"], PAGE_SIZE)
+        )
+
+    def asorted_users_page(self, _index: int):
+        """Time ``store.asorted_users_page``."""
+        return self._await(
+            store.asorted_users_page("createdAt", PAGE_SIZE, descending=True)
+        )
+
+    def aget_users(self, _index: int):
+        """Time ``store.aget_users``."""
+        return self._await(store.aget_users(self.rng.sample(self.ids, PAGE_SIZE)))
+
+    def aget_user_snapshot(self, _index: int):
+        """Time ``store.aget_user_snapshot``."""
+        return self._await(store.aget_user_snapshot(self.user_id()))
+
+    def afind_user_by_email(self, _index: int):
+        """Time ``store.afind_user_by_email``."""
+        email = self.rng.choice(self.emails).upper()
+        return self._await(store.afind_user_by_email(email))
+
+    def acreate_user(self, _index: int):
+        """Time ``store.acreate_user``."""
+        self.created.append(self._await(store.acreate_user(self.payload()))["id"])
+
+    def aupdate_user(self, _index: int):
+        """Time ``store.aupdate_user``."""
+        return self._await(store.aupdate_user(self.user_id(), self.change()))
+
+    def adelete_user(self, _index: int):
+        """Time ``store.adelete_user`` on a user ``acreate_user`` created."""
+        return self._await(store.adelete_user(self.created.pop()))
+
+    def aget_changes(self, _index: int):
+        """Time ``store.aget_changes`` for the last page of changes."""
+        since = max(0, store.get_generation() - PAGE_SIZE)
+        return self._await(store.aget_changes(since, PAGE_SIZE))
+
+    def aget_generation(self, _index: int):
+        """Time ``store.aget_generation``."""
+        return self._await(store.aget_generation())
+
+    def aget_last_modified(self, _index: int):
+        """Time ``store.aget_last_modified``."""
+        return self._await(store.aget_last_modified())
+
+
+class RouteBench:
+    """One request to each route of ``users.urls``, by case name.
+
+    ``CASES`` maps each case to its URL name and the method making the
+    request; every URL name is covered, and cases of routes the settings
+    turn off (``/metrics``, ``/profiles``) are skipped. Requests that must fail the same
+    way each time raise ``RuntimeError`` on an unexpected status instead.
+
+    Args:
+        bench (StoreBench): Supplies the loaded users and payloads.
+    """
+
+    CASES = {
+        "GET /users": ("users-list", "users_list"),
+        "POST /users/bulk": ("users-bulk", "bulk_create"),
+        "PATCH /users/bulk": ("users-bulk", "bulk_update"),
+        "DELETE /users/bulk": ("users-bulk", "bulk_delete"),
+        "POST /users/lookup": ("users-lookup", "lookup"),
+        "GET /users/changes": ("users-changes", "changes"),
+        "GET /users/events": ("users-events", "events"),
+        "POST /user": ("user-create", "create"),
+        "GET /user/<uid>": ("user-detail", "retrieve"),
+        "PATCH /user/<uid>": ("user-detail", "update"),
+        "DELETE /user/<uid>": ("user-detail", "delete"),
+        "GET /metrics": ("metrics", "metrics"),
+        "GET /profiles": ("profiles", "profiles"),
+        "GET /profiles/<id>/text": ("profile", "profile_report"),
+    }
+
+    def __init__(self, bench: StoreBench):
+        self.bench = bench
+        self.client = Client(HTTP_HOST="localhost")
+        # /users/events answers only through ASGI. AsyncClient always sends
+        # Host: testserver, which main() allows.
+        self.async_client = AsyncClient()
+        self.created: list[str] = []
+        self.batches: list[list[str]] = []
+        self.profile_id: str | None = None
+
+    @staticmethod
+    def _check(response, expected: int):
+        """Fail the run on a response with another status than ``expected``."""
+        if response.status_code != expected:
+            raise RuntimeError(
+                f"{response.request['REQUEST_METHOD']} {response.request['PATH_INFO']}"
+                f" answered {response.status_code}, not {expected}"
+            )
+        return response
+
+    def _send(self, method: str, path: str, body, expected: int):
+        """Send ``body`` as JSON and check the status."""
+        response = getattr(self.client, method)(
+            path, json.dumps(body), content_type="application/json"
+        )
+        return self._check(response, expected)
+
+    def users_list(self, _index: int):
+        """Request a page of users."""
+        return self._check(self.client.get("/users", {"limit": PAGE_SIZE}), 200)
+
+    def bulk_create(self, _index: int):
+        """Create a batch of users."""
+        payloads = [self.bench.payload() for _ in range(BATCH_SIZE)]
+        results = self._send("post", "/users/bulk", payloads, 201).json()["results"]
+        self.batches.append([result["user"]["id"] for result in results])
+
+    def bulk_update(self, _index: int):
+        """Update a batch of users."""
+        uids = self.bench.rng.sample(self.bench.ids, BATCH_SIZE)
+        items = [{"id": uid, **self.bench.change()} for uid in uids]
+        return self._send("patch", "/users/bulk", items, 200)
+
+    def bulk_delete(self, _index: int):
+        """Delete a batch of users ``bulk_create`` created."""
+        return self._send("delete", "/users/bulk", self.batches.pop(), 200)
+
+    def lookup(self, _index: int):
+        """Look up a page of users by id."""
+        uids = self.bench.rng.sample(self.bench.ids, PAGE_SIZE)
+        return self._send("post", "/users/lookup", uids, 200)
+
+    def changes(self, _index: int):
+        """Request the last page of changes."""
+        since = max(0, store.get_generation() - PAGE_SIZE)
+        query = {"since": since, "limit": PAGE_SIZE}
+        return self._check(self.client.get("/users/changes", query), 200)
+
+    def events(self, _index: int):
+        """Long-poll for a change that has already been made."""
+        query = {"since": store.get_generation() - 1, "timeout": 0}
+        request = self.async_client.get("/users/events", query)
+        return self._check(self.bench.loop.run_until_complete(request), 200)
+
+    def create(self, _index: int):
+        """Create a user."""
+        response = self._send("post", "/user", self.bench.payload(), 201)
+        self.created.append(response.json()["id"])
+
+    def retrieve(self, _index: int):
+        """Request a user."""
+        uid = self.bench.user_id()
+        return self._check(self.client.get(f"/user/{uid}"), 200)
+
+    def update(self, _index: int):
+        """Update a user."""
+        uid = self.bench.user_id()
+        return self._send("patch", f"/user/{uid}", self.bench.change(), 200)
+
+    def delete(self, _index: int):
+        """Delete a user ``create`` created."""
+        uid = self.created.pop()
+        return self._check(self.client.delete(f"/user/{uid}"), 204)
+
+    def metrics(self, _index: int):
+        """Request the metrics."""
+        return self._check(self.client.get("/metrics"), 200)
+
+    def _profiled(self, path: str, expected: int = 200):
+        """Request ``path`` sending the profiling flag."""
+        flag = settings.USERS_PROFILING_TOKEN or "1"
+        return self._check(self.client.get(path, HTTP_X_PROFILE=flag), expected)
+
+    def profiles(self, _index: int):
+        """Request the index of request profiles."""
+        return self._profiled("/profiles")
+
+    def profile_report(self, _index: int):
+        """Request the text report of a profiled request."""
+        if self.profile_id is None:
+            self.profile_id = self._profiled("/users")["X-Profile-Id"]
+        return self._profiled(f"/profiles/{self.profile_id}/text")
+
+
+def _route_names() -> set[str]:
+    """Names of the routes ``users.urls`` serves with the current settings."""
+    # pylint: disable=import-outside-toplevel
+    from users.urls import urlpatterns
+
+    return {url.name for url in urlpatterns}
+
+
+def _check_coverage() -> None:
+    """Fail if a store function or a route has no benchmark."""
+    missing = [name for name in StoreBench.cases() if not hasattr(StoreBench, name)]
+    routes = {route for route, _ in RouteBench.CASES.values()}
+    missing += sorted(_route_names() - routes)
+    if missing:
+        raise SystemExit(f"No benchmark for: {', '.join(missing)}")
+
+
+def _ops(name: str, ops: int, size: int, linear: frozenset) -> int:
+    """Number of calls for one case on a store of ``size`` users."""
+    if name in linear:
+        return max(MIN_LINEAR_OPS, ops * 1000 // size)
+    return ops
+
+
+def run_size(size: int, ops: int, http_ops: int, suites: list[str]) -> list[dict]:
+    """Run the suites on a store loaded with ``size`` users.
+
+    Args:
+        size (int): Number of users to load.
+        ops (int): Calls per store function.
+        http_ops (int): Requests per route.
+        suites (list[str]): ``store`` and/or ``http``.
+
+    Returns:
+        list[dict]: One result row per case.
+    """
+    # pylint: disable=import-outside-toplevel
+    from users.sample_data import generate_users
+
+    bench = StoreBench(generate_users(size))
+    bench.load()
+    rows = []
+    cases = []
+    if "store" in suites:
+        cases += [("store", name, getattr(bench, name)) for name in bench.cases()]
+    if "http" in suites:
+        routes = RouteBench(bench)
+        cases += [
+            ("http", name, getattr(routes, method))
+            for name, (route, method) in RouteBench.CASES.items()
+            if route in _route_names()
+        ]
+    for suite, name, operation in cases:
+        destructive = suite == "store" and name in StoreBench.DESTRUCTIVE
+        count = _ops(name, ops if suite == "store" else http_ops, size, bench.LINEAR)
+        gc.collect()
+        result = measure(operation, count, bench.load if destructive else None)
+        if destructive:
+            bench.load()
+        rows.append(
+            {"suite": suite, "case": name, "users": size, "ops": count, **result}
+        )
+    bench.close()
+    store.clear_users()
+    return rows
+
+
+def _metadata(args) -> dict:
+    """Describe the run, so results are only compared with like results."""
+    # pylint: disable=import-outside-toplevel
+    import django
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "django": django.get_version(),
+        "platform": platform.platform(),
+        "backend": settings.USERS_STORE_BACKEND,
+        "records": settings.USERS_STORE_RECORDS,
+        "metrics": settings.USERS_METRICS,
+        "profiling": settings.USERS_PROFILING,
+        "sizes": args.sizes,
+        "ops": args.ops,
+        "http_ops": args.http_ops,
+    }
+
+
+def compare(
+    rows: list[dict],
+    baseline: dict,
+    threshold: float,
+    metric: str,
+    min_delta_us: float = 0.0,
+) -> list[dict]:
+    """Compare results with a baseline run.
+
+    Args:
+        rows (list[dict]): This run's results.
+        baseline (dict): An earlier run, as written with ``--output``.
+        threshold (float): Largest tolerated change, e.g. 0.25 for 25%.
+        metric (str): The latency column to compare, e.g. ``p50_us``.
+        min_delta_us (float): Changes smaller than this many microseconds
+            are within the timer's noise and always ``ok``.
+
+    Returns:
+        list[dict]: One row per result, with the baseline value, the
+        relative change and a ``status`` of ``ok``, ``faster``, ``SLOWER``
+        or ``new``.
+    """
+    before = {
+        (row["suite"], row["case"], row["users"]): row[metric]
+        for row in baseline["results"]
+    }
+    compared = []
+    for row in rows:
+        old = before.get((row["suite"], row["case"], row["users"]))
+        change = row[metric] / old - 1 if old else None
+        if change is None:
+            status = "new"
+        elif abs(row[metric] - old) < min_delta_us or abs(change) <= threshold:
+            status = "ok"
+        else:
+            status = "SLOWER" if change > 0 else "faster"
+        compared.append(
+            {
+                "suite": row["suite"],
+                "case": row["case"],
+                "users": row["users"],
+                "baseline": "-" if old is None else old,
+                metric: row[metric],
+                "change": "-" if change is None else f"{change:+.0%}",
+                "status": status,
+            }
+        )
+    return compared
+
+
+def check_baseline(results: dict, args) -> bool:
+    """Print how results compare with the ``--baseline`` file.
+
+    Args:
+        results (dict): This run, as written with ``--output``.
+        args: The parsed command line.
+
+    Returns:
+        bool: False if a result got slower than ``--threshold`` allows.
+    """
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    for key, value in baseline["meta"].items():
+        if key in _COMPARABLE and results["meta"][key] != value:
+            print(f"Note: the baseline ran with {key}={value!r}")
+    compared = compare(
+        results["results"], baseline, args.threshold, args.metric, args.min_delta_us
+    )
+    print()
+    print_table(compared, list(compared[0]))
+    slower = [row for row in compared if row["status"] == "SLOWER"]
+    if slower:
+        print(
+            f"\n{len(slower)} result(s) slower than the baseline by more than"
+            f" {args.threshold:.0%}"
+        )
+    return not slower
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the suite, print the results and compare them with a baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="store sizes")
+    parser.add_argument("--ops", type=int, default=1000, help="calls per function")
+    parser.add_argument("--http-ops", type=int, default=200, help="requests per route")
+    parser.add_argument("--suites", default="store,http", help="suites to run")
+    parser.add_argument("--backend", help="store backend, if not the configured one")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with the results in this file")
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="tolerated slowdown"
+    )
+    parser.add_argument(
+        "--metric", default="p50_us", choices=["p50_us", "p99_us", "mean_us"]
+    )
+    parser.add_argument(
+        "--min-delta-us", type=float, default=1.0, help="ignore smaller changes"
+    )
+    args = parser.parse_args(argv)
+    sizes = [int(value) for value in args.sizes.split(",")]
+    if min(sizes) < max(PAGE_SIZE, BATCH_SIZE):
+        parser.error(f"--sizes must be at least {max(PAGE_SIZE, BATCH_SIZE)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A database for the ORM backend, and directories for the durable
+        # one, that are discarded after the run.
+        os.environ.setdefault("USERS_DURABLE_STORE_DIR", os.path.join(tmp, "durable"))
+        setup_django(os.path.join(tmp, "bench.sqlite3"))
+        _check_coverage()
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+        if args.backend:
+            settings.USERS_STORE_BACKEND = args.backend
+            store.set_backend(None)
+        suites = args.suites.split(",")
+        rows = []
+        for size in sizes:
+            rows.extend(run_size(size, args.ops, args.http_ops, suites))
+        results = {"meta": _metadata(args), "results": rows}
+    print_table(rows, RESULT_COLUMNS)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline and not check_baseline(results, args):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
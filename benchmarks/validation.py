@@ -0,0 +1,68 @@
+"""Compare compiled validation of user payloads with DRF's.
+
+Usage::
+
+    python -m benchmarks.validation --ops 20000
+
+Validates the payloads of ``POST /user`` and ``PATCH /user/<uid>`` with
+``UserCreateSerializer`` and ``UserUpdateSerializer``, first through DRF's
+field machinery and then through the rules compiled by
+``users.validation``, and prints validations per second for each.
+"""
+
+from __future__ import annotations
+import argparse
+
+from .common import measure, print_table, setup_django
+
+_CREATE = {
+    "firstName": "John",
+    "lastName": "Doe",
+    "email": "john.doe@example.com",
+    "phone": "+1234567890",
+}
+
+
+def _cases(uid: str) -> dict:
+    """Build a serializer for each payload kind, keyed by its label."""
+    # pylint: disable=import-outside-toplevel
+    from users.serializers import UserCreateSerializer, UserUpdateSerializer
+
+    return {
+        "create": lambda: UserCreateSerializer(data=_CREATE),
+        "create, invalid": lambda: UserCreateSerializer(
+            data={**_CREATE, "email": "not-an-email"}
+        ),
+        "update": lambda: UserUpdateSerializer(uid, data={"phone": "+1555"}),
+        "update email": lambda: UserUpdateSerializer(
+            uid, data={"email": "jane.doe@example.com"}
+        ),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--ops", type=int, default=20000, help="validations per case")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    # pylint: disable=import-outside-toplevel
+    from django.conf import settings
+    from users import store
+
+    store.reset_and_seed()
+    rows = []
+    for case, make in _cases(store.list_users()[0]["id"]).items():
+        row = {"case": case}
+        for label, fast in (("drf", False), ("compiled", True)):
+            settings.USERS_FAST_VALIDATION = fast
+            result = measure(lambda _, make=make: make().is_valid(), args.ops)
+            row[f"{label}_ops_per_sec"] = result["ops_per_sec"]
+        row["speedup"] = row["compiled_ops_per_sec"] / row["drf_ops_per_sec"]
+        rows.append(row)
+    print_table(rows, ["case", "drf_ops_per_sec", "compiled_ops_per_sec", "speedup"])
+
+
+if __name__ == "__main__":
+    main()
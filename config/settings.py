@@ -39,6 +39,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "users.metrics.MetricsMiddleware",
+    "users.profiling.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -75,6 +77,12 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            # WAL lets readers proceed while a write is in progress; starting
+            # write transactions IMMEDIATE avoids lock-upgrade deadlocks.
+            "init_command": "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;",
+            "transaction_mode": "IMMEDIATE",
+        },
     }
 }
 
@@ -119,3 +127,181 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Django REST framework
+# https://www.django-rest-framework.org/api-guide/settings/
+
+# Serve the browsable API alongside JSON. Off when DEBUG=0 in the environment
+# (docker-compose.prod.yml), so production responses are always plain JSON.
+
+USERS_BROWSABLE_API = (
+    os.environ.get("USERS_BROWSABLE_API", os.environ.get("DEBUG", "1")) == "1"
+)
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "users.renderers.UsersJSONRenderer",
+        *(
+            ["rest_framework.renderers.BrowsableAPIRenderer"]
+            if USERS_BROWSABLE_API
+            else []
+        ),
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "users.renderers.UsersJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+
+# Users API
+# Page size used by GET /users when no ``limit`` is given, and the largest
+# ``limit`` a client may ask for.
+
+USERS_PAGE_SIZE = int(os.environ.get("USERS_PAGE_SIZE", "100"))
+
+USERS_MAX_PAGE_SIZE = int(os.environ.get("USERS_MAX_PAGE_SIZE", "1000"))
+
+# Number of users serialized per chunk when GET /users streams its response.
+
+USERS_STREAM_CHUNK_SIZE = int(os.environ.get("USERS_STREAM_CHUNK_SIZE", "1000"))
+
+# Maximum number of items in one POST, PATCH or DELETE /users/bulk request,
+# and of ids in one GET /users?ids= or POST /users/lookup request.
+
+USERS_BULK_MAX_ITEMS = int(os.environ.get("USERS_BULK_MAX_ITEMS", "1000"))
+
+# Number of store generations (i.e. writes) whose changes GET /users/changes
+# can replay; clients whose cursor is older are told to resync.
+
+USERS_CHANGE_LOG_SIZE = int(os.environ.get("USERS_CHANGE_LOG_SIZE", "10000"))
+
+# GET /users/events (served through ASGI): how often each worker checks the
+# store for new changes, how many changes may wait for one subscriber before
+# it falls back to catching up from the change log, how many subscribers a
+# worker accepts, the SSE keep-alive interval and the longest long-poll wait.
+
+USERS_EVENTS_POLL_INTERVAL_MS = int(
+    os.environ.get("USERS_EVENTS_POLL_INTERVAL_MS", "100")
+)
+
+USERS_EVENTS_QUEUE_SIZE = int(os.environ.get("USERS_EVENTS_QUEUE_SIZE", "1000"))
+
+USERS_EVENTS_MAX_SUBSCRIBERS = int(
+    os.environ.get("USERS_EVENTS_MAX_SUBSCRIBERS", "10000")
+)
+
+USERS_EVENTS_HEARTBEAT_S = int(os.environ.get("USERS_EVENTS_HEARTBEAT_S", "15"))
+
+USERS_EVENTS_LONG_POLL_S = int(os.environ.get("USERS_EVENTS_LONG_POLL_S", "30"))
+
+# Set to 1 when serving through ASGI to route GET /users, POST /user and
+# GET/PATCH/DELETE /user/<uid> to async views that run on the event loop
+# instead of a worker thread. Leave at 0 under WSGI, where Django would run
+# each async view in an event loop of its own.
+
+USERS_ASYNC_VIEWS = os.environ.get("USERS_ASYNC_VIEWS", "0") == "1"
+
+# With USERS_ASYNC_VIEWS, the ASGI app runs users API requests through this
+# middleware only. Each sync middleware method costs a thread hop under ASGI,
+# and the API needs no sessions, authentication, messages or CSRF tokens.
+
+USERS_ASYNC_MIDDLEWARE = [
+    "users.metrics.MetricsMiddleware",
+    "users.profiling.ProfilingMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.middleware.common.CommonMiddleware",
+]
+
+# Record request latency per URL name, store call and serialization timings
+# (users.metrics) and serve them with store and cache statistics at /metrics
+# in the Prometheus text format. Set to 0 to record and serve nothing.
+
+USERS_METRICS = os.environ.get("USERS_METRICS", "1") == "1"
+
+# Profile single requests that send an X-Profile header or a profile query
+# parameter with cProfile (users.profiling), keeping the last PROFILING_KEEP
+# profiles in PROFILING_DIR and listing them at /profiles. With a token set,
+# the header or parameter must be the token, and so must be sent to /profiles.
+
+USERS_PROFILING = os.environ.get("USERS_PROFILING", "0") == "1"
+
+USERS_PROFILING_TOKEN = os.environ.get("USERS_PROFILING_TOKEN", "")
+
+USERS_PROFILING_DIR = os.environ.get(
+    "USERS_PROFILING_DIR", str(BASE_DIR / "var" / "profiles")
+)
+
+USERS_PROFILING_KEEP = int(os.environ.get("USERS_PROFILING_KEEP", "50"))
+
+# Validate POST /user, PATCH /user/<uid> and bulk payloads with rules compiled
+# from the serializers' fields (users.validation) instead of DRF's field
+# machinery. Errors are the same either way; set to 0 to use DRF's.
+
+USERS_FAST_VALIDATION = os.environ.get("USERS_FAST_VALIDATION", "1") == "1"
+
+# Pre-encoded JSON responses for GET /users and GET /user/<uid> are kept in an
+# LRU cache bounded by entry count and total bytes. Set either to 0 to disable.
+
+USERS_RESPONSE_CACHE_ENTRIES = int(
+    os.environ.get("USERS_RESPONSE_CACHE_ENTRIES", "1024")
+)
+
+USERS_RESPONSE_CACHE_MAX_BYTES = int(
+    os.environ.get("USERS_RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+
+# Where users are stored: "memory" keeps them in this process; "durable" also
+# keeps them in this process but persists every write to a local log;
+# "shared" keeps them in a memory-mapped log that every worker process on the
+# host reads; "orm" keeps them in the database through the User model.
+
+USERS_STORE_BACKEND = os.environ.get("USERS_STORE_BACKEND", "memory")
+
+# How the memory, durable and shared backends hold users in each process:
+# "dict" keeps every user as the dict the API returns; "compact" packs them
+# into slotted records (users.backends.records), which takes less memory per
+# user but builds each user's dict again on every read.
+
+USERS_STORE_RECORDS = os.environ.get("USERS_STORE_RECORDS", "dict")
+
+# Shared backend: the memory-mapped log all workers attach to, and the log
+# size at which it is compacted into a snapshot of the current users.
+
+USERS_SHARED_STORE_PATH = os.environ.get(
+    "USERS_SHARED_STORE_PATH",
+    "/dev/shm/api-demo-users" if os.path.isdir("/dev/shm") else "/tmp/api-demo-users",
+)
+
+USERS_SHARED_STORE_COMPACT_BYTES = int(
+    os.environ.get("USERS_SHARED_STORE_COMPACT_BYTES", str(64 * 1024 * 1024))
+)
+
+# Durable backend: the directory holding its write-ahead log and snapshots,
+# and the log size at which a new snapshot replaces the log.
+
+USERS_DURABLE_STORE_DIR = os.environ.get(
+    "USERS_DURABLE_STORE_DIR", str(BASE_DIR / "var" / "users")
+)
+
+USERS_DURABLE_STORE_SNAPSHOT_BYTES = int(
+    os.environ.get("USERS_DURABLE_STORE_SNAPSHOT_BYTES", str(64 * 1024 * 1024))
+)
+
+# How the durable backend's log reaches the disk, trading durability for
+# throughput: "commit" fsyncs before each write returns, sharing one fsync
+# between concurrent writers and optionally waiting COMMIT_DELAY_US for more
+# of them; "interval" fsyncs in the background every SYNC_INTERVAL_MS; "off"
+# leaves flushing to the operating system.
+
+USERS_DURABLE_STORE_SYNC = os.environ.get("USERS_DURABLE_STORE_SYNC", "commit")
+
+USERS_DURABLE_STORE_SYNC_INTERVAL_MS = int(
+    os.environ.get("USERS_DURABLE_STORE_SYNC_INTERVAL_MS", "100")
+)
+
+USERS_DURABLE_STORE_COMMIT_DELAY_US = int(
+    os.environ.get("USERS_DURABLE_STORE_COMMIT_DELAY_US", "0")
+)
@@ -1,7 +1,7 @@
 """Django app configuration for the users app.
 
 Configures the users application and handles app initialization,
-including seeding the user store with initial data.
+including loading the user store.
 """
 
 from django.apps import AppConfig
@@ -11,7 +11,7 @@ class UsersConfig(AppConfig):
     """Configuration class for the users Django app.
 
     Handles app initialization and sets up the user store
-    with initial seed data when the app is ready.
+    when the app is ready.
     """
 
     name = "users"
@@ -19,9 +19,11 @@ class UsersConfig(AppConfig):
     def ready(self):
         """Initialize the app when Django starts.
 
-        Seeds the user store with initial data. The import is done here
-        to avoid circular imports and ensure Django is fully initialized.
+        Loads the user store: persistent backends restore their saved
+        users, and a store that has never held data is seeded with initial
+        data. The import is done here to avoid circular imports and ensure
+        Django is fully initialized.
         """
-        from .store import seed_once  # pylint: disable=import-outside-toplevel
+        from .store import load_store  # pylint: disable=import-outside-toplevel
 
-        seed_once()
+        load_store()
@@ -0,0 +1,66 @@
+"""ASGI application that serves the users API without thread hops.
+
+Django's built-in middleware is sync code. Under ASGI, each of its
+``process_*`` methods runs in a worker thread, which costs about fourteen
+thread hops per request with the default stack. The users API does not use
+sessions, authentication, messages or CSRF tokens. So, with
+``USERS_ASYNC_VIEWS`` set, its requests go through a second handler that runs
+only ``USERS_ASYNC_MIDDLEWARE``, and every other request (the admin, for
+instance) keeps the full ``MIDDLEWARE`` stack.
+"""
+
+from __future__ import annotations
+
+# pylint: disable=import-error
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.test.utils import override_settings
+
+USERS_PATHS = ("/user", "/users")
+
+_USERS_PATH_PREFIXES = ("/user/", "/users/")
+
+
+class UsersASGIHandler(ASGIHandler):
+    """ASGI handler that runs ``USERS_ASYNC_MIDDLEWARE`` instead of ``MIDDLEWARE``."""
+
+    def __init__(self):
+        # Django builds the chain from settings.MIDDLEWARE, once, while the
+        # handler is constructed; only that reads the overridden list.
+        with override_settings(MIDDLEWARE=settings.USERS_ASYNC_MIDDLEWARE):
+            super().__init__()
+
+
+def is_users_path(path: str) -> bool:
+    """Check whether a request path belongs to the users API.
+
+    Args:
+        path (str): The request path.
+
+    Returns:
+        bool: True for ``/user``, ``/users`` and anything below them.
+    """
+    return path in USERS_PATHS or path.startswith(_USERS_PATH_PREFIXES)
+
+
+def get_asgi_application():
+    """Build the project's ASGI application.
+
+    Returns:
+        The plain Django ASGI handler, or, with ``USERS_ASYNC_VIEWS`` set, an
+        application passing users API requests to a ``UsersASGIHandler``
+        and the rest to the plain handler.
+    """
+    django.setup(set_prefix=False)
+    default = ASGIHandler()
+    if not settings.USERS_ASYNC_VIEWS:
+        return default
+    users = UsersASGIHandler()
+
+    async def application(scope, receive, send):
+        if scope["type"] == "http" and is_users_path(scope["path"]):
+            return await users(scope, receive, send)
+        return await default(scope, receive, send)
+
+    return application
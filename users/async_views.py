@@ -0,0 +1,109 @@
+"""Async variants of the user endpoints, for ASGI deployments.
+
+Django runs sync views under ASGI in a worker thread, handing every request
+over to it and back. These views are coroutines instead. Each one runs the
+sync view's handler through ``users.store.arun``, which calls it directly on
+the event loop when the store backend never waits on I/O (the in-memory
+backends) and otherwise in a single thread hop for the whole handler.
+Streamed exports are read from the store chunk by chunk the same way.
+``users.urls`` serves these views in place of the sync ones when
+``USERS_ASYNC_VIEWS`` is set.
+"""
+
+# The handlers are coroutines overriding the sync views' handlers.
+# pylint: disable=import-error,too-few-public-methods,invalid-overridden-method
+from __future__ import annotations
+from django.http import HttpResponse
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .fields import get_projection
+from .store import arun
+from .streaming import stream_users
+from .views import UserCreateView, UserDetailView, UsersListView
+
+
+def _rendered(response):
+    """Render a DRF response into a plain ``HttpResponse``.
+
+    Django renders any response with a sync ``render`` method in a worker
+    thread; rendering it here keeps that on the event loop.
+    """
+    if not isinstance(response, Response):
+        return response
+    response.render()
+    return HttpResponse(
+        response.content, status=response.status_code, headers=response.headers
+    )
+
+
+class AsyncAPIView(APIView):
+    """DRF ``APIView`` whose handlers are coroutines.
+
+    DRF dispatches synchronously; this dispatch runs the same steps
+    (content negotiation, exception handling, response finalization) and
+    awaits the handler.
+    """
+
+    # The users API is public. Authenticating would load the session from
+    # the database, which is not allowed on the event loop.
+    authentication_classes = ()
+
+    async def dispatch(self, request, *args, **kwargs):
+        """Dispatch the request to its async handler, as ``APIView.dispatch``."""
+        # pylint: disable=attribute-defined-outside-init
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            self.initial(request, *args, **kwargs)
+            method = request.method.lower()
+            handler = getattr(self, method, None)
+            if method not in self.http_method_names or handler is None:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if not isinstance(response, Response):
+                response = await response
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return _rendered(self.response)
+
+
+class AsyncUsersListView(AsyncAPIView, UsersListView):
+    """Async variant of ``UsersListView``."""
+
+    async def get(self, request):
+        """Retrieve users as ``UsersListView.get``, streaming asynchronously."""
+        params = request.query_params
+        if "ids" not in params and "email" not in params:
+            stream_format = self._stream_format(request)
+            if stream_format is not None:
+                projection = get_projection(request)
+                return stream_users(stream_format, projection, asynchronous=True)
+        return await arun(super().get, request)
+
+
+class AsyncUserCreateView(AsyncAPIView, UserCreateView):
+    """Async variant of ``UserCreateView``."""
+
+    async def post(self, request):
+        """Create a new user, as ``UserCreateView.post``."""
+        return await arun(super().post, request, write=True)
+
+
+class AsyncUserDetailView(AsyncAPIView, UserDetailView):
+    """Async variant of ``UserDetailView``."""
+
+    async def get(self, request, uid: str):
+        """Retrieve a specific user by ID, as ``UserDetailView.get``."""
+        return await arun(super().get, request, uid)
+
+    async def patch(self, request, uid: str):
+        """Update a specific user by ID, as ``UserDetailView.patch``."""
+        return await arun(super().patch, request, uid, write=True)
+
+    async def delete(self, request, uid: str):
+        """Delete a specific user by ID, as ``UserDetailView.delete``."""
+        return await arun(super().delete, request, uid, write=True)
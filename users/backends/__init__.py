@@ -0,0 +1,172 @@
+"""Pluggable storage backends for the users store.
+
+``users.store`` exposes a module-level function API; the functions delegate
+to a backend chosen by the ``USERS_STORE_BACKEND`` setting. Every backend
+implements the interface of ``StoreBackend``.
+"""
+
+from __future__ import annotations
+from collections.abc import Collection
+
+# pylint: disable=import-error
+from django.utils.module_loading import import_string
+
+BACKENDS = {
+    "memory": "users.backends.memory.MemoryBackend",
+    "durable": "users.backends.durable.DurableMemoryBackend",
+    "shared": "users.backends.shared.SharedMemoryBackend",
+    "orm": "users.backends.orm.OrmBackend",
+}
+
+# Errors a bad item of a batch may raise; ``create_users`` and
+# ``update_users`` report them as that item's result instead of failing the
+# rest of the batch.
+ITEM_ERRORS = (KeyError, TypeError, ValueError)
+
+
+def load_backend(name: str) -> StoreBackend:
+    """Instantiate a store backend.
+
+    Args:
+        name (str): A key of ``BACKENDS`` or a dotted path to a
+            ``StoreBackend`` subclass.
+
+    Returns:
+        StoreBackend: A new backend instance.
+    """
+    return import_string(BACKENDS.get(name, name))()
+
+
+class StoreBackend:  # pylint: disable=too-many-public-methods
+    """Interface implemented by every users store backend.
+
+    The methods mirror the functions of ``users.store``; see there for the
+    full contract of each.
+
+    Attributes:
+        inline_reads (bool): Whether reads never wait on I/O, so the async
+            store functions may run them on the event loop rather than in
+            a worker thread.
+        inline_writes (bool): The same for writes.
+    """
+
+    inline_reads = False
+    inline_writes = False
+
+    def load(self, sample: list[dict]) -> None:
+        """Prepare the store at startup.
+
+        Backends that persist users restore them here and only seed a store
+        that has never held data; by default this is ``seed``.
+        """
+        self.seed(sample)
+
+    def seed(self, sample: list[dict]) -> None:
+        """Load ``sample`` unless the store has already been seeded."""
+        raise NotImplementedError
+
+    def list_users(self) -> list[dict]:
+        """Get all users in insertion order."""
+        raise NotImplementedError
+
+    def count_users(self) -> int:
+        """Get the number of users; by default by listing them."""
+        return len(self.list_users())
+
+    def list_users_page(
+        self, limit: int, after: int | None = None
+    ) -> tuple[list[dict], int | None]:
+        """Get up to ``limit`` users following position ``after``."""
+        raise NotImplementedError
+
+    def search_users_page(
+        self,
+        prefixes: dict[str, str],
+        terms: list[str],
+        limit: int,
+        after: int | None = None,
+    ) -> tuple[list[dict], int | None]:
+        """Get up to ``limit`` users matching the prefixes, after ``after``."""
+        raise NotImplementedError
+
+    def sorted_users_page(  # pylint: disable=too-many-arguments
+        self,
+        field: str,
+        limit: int,
+        after: tuple[float | str, int] | None = None,
+        *,
+        descending: bool = False,
+        start: float | str | None = None,
+        prefixes: dict[str, str],
+        terms: list[str],
+    ) -> tuple[list[dict], tuple[float | str, int] | None]:
+        """Get up to ``limit`` matching users ordered by ``field``."""
+        raise NotImplementedError
+
+    def get_user(self, uid: str) -> dict | None:
+        """Get a user by id."""
+        raise NotImplementedError
+
+    def get_user_snapshot(self, uid: str) -> tuple[dict | None, int | None]:
+        """Get a user and its version, read consistently."""
+        raise NotImplementedError
+
+    def get_users(self, uids: list[str]) -> list[dict | None]:
+        """Get several users by id in one pass, None for each missing id."""
+        raise NotImplementedError
+
+    def find_user_by_email(self, email: str) -> dict | None:
+        """Get a user by email, ignoring case."""
+        raise NotImplementedError
+
+    def create_user(self, data: dict) -> dict:
+        """Create a user."""
+        raise NotImplementedError
+
+    def update_user(
+        self, uid: str, data: dict, if_versions: Collection[int] | None = None
+    ) -> dict | None:
+        """Update a user, optionally only while at one of ``if_versions``."""
+        raise NotImplementedError
+
+    def delete_user(self, uid: str) -> bool:
+        """Delete a user."""
+        raise NotImplementedError
+
+    def create_users(self, items: list[dict]) -> list[dict | Exception]:
+        """Create several users in one pass, one result or error per item."""
+        raise NotImplementedError
+
+    def update_users(
+        self, items: list[tuple[str, dict]]
+    ) -> list[dict | Exception | None]:
+        """Update several ``(id, data)`` pairs in one pass."""
+        raise NotImplementedError
+
+    def delete_users(self, uids: list[str]) -> list[bool]:
+        """Delete several users in one pass."""
+        raise NotImplementedError
+
+    def get_changes(self, since: int, limit: int) -> tuple[list[dict], int, bool]:
+        """Get up to ``limit`` changes made after generation ``since``."""
+        raise NotImplementedError
+
+    def get_generation(self) -> int:
+        """Get the store generation."""
+        raise NotImplementedError
+
+    def get_user_version(self, uid: str) -> int | None:
+        """Get the version a user was last written at."""
+        raise NotImplementedError
+
+    def get_last_modified(self) -> float:
+        """Get the POSIX timestamp of the last write."""
+        raise NotImplementedError
+
+    def clear_users(self) -> None:
+        """Remove every user and reset the seeded flag."""
+        raise NotImplementedError
+
+    def reset_and_seed(self, sample: list[dict]) -> None:
+        """Clear the store and load ``sample`` in one step."""
+        raise NotImplementedError
@@ -0,0 +1,470 @@
+"""Durable in-memory backend for the users store.
+
+Reads are served from an in-process ``UserTable`` exactly like the memory
+backend. Every write is also appended to a write-ahead log in
+``USERS_DURABLE_STORE_DIR`` as a checksummed JSON operation, and the table
+is periodically written out as a compact binary snapshot, after which the
+log it covers is deleted. On startup the newest snapshot is loaded and the
+log written after it is replayed.
+
+The directory holds ``snapshot-<n>.bin`` (the state before log segment
+``n``) and ``wal-<n>.log`` segments. A new segment starts at every startup
+and every snapshot. A torn record at the end of the last segment, left by a
+crash mid-write, is discarded.
+
+``USERS_DURABLE_STORE_SYNC`` picks how writes reach the disk:
+
+- ``"commit"``: a write returns once its record is fsynced. Writers that
+  commit together share one fsync (group commit), optionally waiting
+  ``USERS_DURABLE_STORE_COMMIT_DELAY_US`` for more writers to join.
+- ``"interval"``: a background thread fsyncs the log every
+  ``USERS_DURABLE_STORE_SYNC_INTERVAL_MS``; a power loss can drop the
+  writes of the last interval.
+- ``"off"``: records are left to the operating system to flush; they
+  survive a process crash but not a power loss.
+
+The log belongs to a single process; use the ``shared`` or ``orm`` backend
+to serve users from several workers.
+"""
+
+from __future__ import annotations
+from collections.abc import Iterator
+from contextlib import contextmanager
+import json
+import os
+from pathlib import Path
+import re
+import struct
+import threading
+import time
+import zlib
+
+# pylint: disable=import-error
+from django.conf import settings
+from users.store import USER_FIELDS
+from .memory import MemoryBackend
+
+SYNC_MODES = ("commit", "interval", "off")
+
+# Log record header: payload length and CRC-32 of the payload.
+_RECORD = struct.Struct("<II")
+
+SNAPSHOT_MAGIC = b"USRSNP02"
+# Snapshots written before the change log was persisted; still readable.
+_SNAPSHOT_MAGIC_V1 = b"USRSNP01"
+# Snapshot header: generation, next sequence number, last-modified time,
+# seeded flag and user count; then the change log floor and the change log
+# as length-prefixed JSON (absent in version 1); then per user its sequence
+# number and version followed by each of ``USER_FIELDS`` as length-prefixed
+# UTF-8.
+_SNAPSHOT_HEADER = struct.Struct("<QQd?Q")
+_SNAPSHOT_USER = struct.Struct("<QQ")
+_FIELD_LENGTH = struct.Struct("<H")
+_SNAPSHOT_CHANGES = struct.Struct("<QI")
+_CRC = struct.Struct("<I")
+
+_FILE_NAME = re.compile(r"^(wal|snapshot)-(\d{10})\.(?:log|bin)$")
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def encode_record(op: dict) -> bytes:
+    """Encode an operation as a checksummed log record."""
+    payload = _encoder.encode(op).encode()
+    return _RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_records(data: bytes) -> tuple[list[dict], int]:
+    """Decode the log records in ``data``.
+
+    Args:
+        data (bytes): The contents of a log segment.
+
+    Returns:
+        tuple[list[dict], int]: The operations, and the length of the valid
+        prefix of ``data``; anything after it is a torn or corrupt record.
+    """
+    ops, offset = [], 0
+    while offset + _RECORD.size <= len(data):
+        length, crc = _RECORD.unpack_from(data, offset)
+        start, end = offset + _RECORD.size, offset + _RECORD.size + length
+        payload = data[start:end]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            break
+        ops.append(json.loads(payload))
+        offset = end
+    return ops, offset
+
+
+def encode_snapshot(ops: Iterator[dict]) -> bytes:
+    """Encode the output of ``UserTable.export`` as a binary snapshot.
+
+    Args:
+        ops (Iterator[dict]): A ``base`` operation followed by ``restore``
+            operations.
+
+    Returns:
+        bytes: The snapshot, ending with a CRC-32 of its contents.
+    """
+    base = next(ops)
+    restores = list(ops)
+    parts = [
+        SNAPSHOT_MAGIC,
+        _SNAPSHOT_HEADER.pack(
+            base["generation"],
+            base["next_seq"],
+            base["at"],
+            base["seeded"],
+            len(restores),
+        ),
+    ]
+    changes = _encoder.encode(base["changes"]).encode()
+    parts.append(_SNAPSHOT_CHANGES.pack(base["changes_floor"], len(changes)))
+    parts.append(changes)
+    for op in restores:
+        user = op["user"]
+        parts.append(_SNAPSHOT_USER.pack(op["seq"], op["version"]))
+        for field in USER_FIELDS:
+            value = user[field].encode()
+            parts.append(_FIELD_LENGTH.pack(len(value)))
+            parts.append(value)
+    body = b"".join(parts)
+    return body + _CRC.pack(zlib.crc32(body))
+
+
+def _decode_base(body: bytes, magic: bytes) -> tuple[dict, int, int]:
+    """Decode the header and change log of a snapshot body.
+
+    Returns:
+        tuple[dict, int, int]: The ``base`` operation, the number of users
+        and the offset of the first user.
+    """
+    offset = len(magic)
+    generation, next_seq, at, seeded, count = _SNAPSHOT_HEADER.unpack_from(body, offset)
+    offset += _SNAPSHOT_HEADER.size
+    base = {
+        "op": "base",
+        "generation": generation,
+        "next_seq": next_seq,
+        "at": at,
+        "seeded": seeded,
+    }
+    if magic == SNAPSHOT_MAGIC:
+        base["changes_floor"], length = _SNAPSHOT_CHANGES.unpack_from(body, offset)
+        offset += _SNAPSHOT_CHANGES.size
+        base["changes"] = json.loads(body[offset : offset + length])
+        offset += length
+    return base, count, offset
+
+
+def decode_snapshot(data: bytes) -> Iterator[dict]:
+    """Decode a binary snapshot back into ``export`` operations.
+
+    Args:
+        data (bytes): A snapshot produced by ``encode_snapshot``.
+
+    Yields:
+        dict: A ``base`` operation followed by ``restore`` operations.
+
+    Raises:
+        ValueError: If the data is not an intact snapshot.
+    """
+    body, trailer = data[: -_CRC.size], data[-_CRC.size :]
+    magic = body[: len(SNAPSHOT_MAGIC)]
+    if (
+        magic not in (SNAPSHOT_MAGIC, _SNAPSHOT_MAGIC_V1)
+        or len(trailer) != _CRC.size
+        or _CRC.unpack(trailer)[0] != zlib.crc32(body)
+    ):
+        raise ValueError("not an intact users store snapshot")
+    base, count, offset = _decode_base(body, magic)
+    yield base
+    view = memoryview(body)
+    for _ in range(count):
+        seq, version = _SNAPSHOT_USER.unpack_from(body, offset)
+        offset += _SNAPSHOT_USER.size
+        user = {}
+        for field in USER_FIELDS:
+            (length,) = _FIELD_LENGTH.unpack_from(body, offset)
+            offset += _FIELD_LENGTH.size
+            user[field] = str(view[offset : offset + length], "utf-8")
+            offset += length
+        yield {"op": "restore", "user": user, "seq": seq, "version": version}
+
+
+class DurableMemoryBackend(
+    MemoryBackend
+):  # pylint: disable=too-many-instance-attributes
+    """Memory backend that persists its writes to a log and snapshots.
+
+    Args:
+        directory (str | None): Where the log and snapshots live. Defaults
+            to the ``USERS_DURABLE_STORE_DIR`` setting.
+        sync (str | None): One of ``SYNC_MODES``. Defaults to the
+            ``USERS_DURABLE_STORE_SYNC`` setting.
+        sync_interval (float | None): Seconds between background fsyncs in
+            ``"interval"`` mode.
+        commit_delay (float | None): Seconds a group commit waits for more
+            writers before its fsync in ``"commit"`` mode.
+        snapshot_bytes (int | None): Log size that triggers a snapshot.
+    """
+
+    # Writes append to the log and may fsync it or write a snapshot.
+    inline_writes = False
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        directory: str | None = None,
+        *,
+        sync: str | None = None,
+        sync_interval: float | None = None,
+        commit_delay: float | None = None,
+        snapshot_bytes: int | None = None,
+    ):
+        super().__init__()
+        self.directory = Path(directory or settings.USERS_DURABLE_STORE_DIR)
+        self.sync = sync or settings.USERS_DURABLE_STORE_SYNC
+        if self.sync not in SYNC_MODES:
+            raise ValueError(f"USERS_DURABLE_STORE_SYNC must be one of {SYNC_MODES}")
+        if sync_interval is None:
+            sync_interval = settings.USERS_DURABLE_STORE_SYNC_INTERVAL_MS / 1000
+        if commit_delay is None:
+            commit_delay = settings.USERS_DURABLE_STORE_COMMIT_DELAY_US / 1e6
+        self.commit_delay = commit_delay
+        self.snapshot_bytes = (
+            snapshot_bytes or settings.USERS_DURABLE_STORE_SNAPSHOT_BYTES
+        )
+        self.recovered = False
+        # Log positions are byte counts since this backend opened the log,
+        # across segments: ``_written`` is guarded by ``lock`` and
+        # ``_synced``/``_syncing`` by ``_synced_cond``.
+        self._written = self._synced = 0
+        self._syncing = False
+        self._synced_cond = threading.Condition()
+        self._since_snapshot = 0
+        self._snapshotting = threading.Lock()
+        self._segment = 0
+        self._fd = -1
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self.lock:
+            self._recover()
+        self._closed = threading.Event()
+        if self.sync == "interval":
+            threading.Thread(
+                target=self._sync_periodically,
+                args=(sync_interval,),
+                name="users-wal-sync",
+                daemon=True,
+            ).start()
+
+    def _path(self, kind: str, number: int) -> Path:
+        """Path of the log segment or snapshot with the given number."""
+        suffix = "log" if kind == "wal" else "bin"
+        return self.directory / f"{kind}-{number:010d}.{suffix}"
+
+    def _files(self) -> tuple[list[int], list[int]]:
+        """Numbers of the snapshots and log segments on disk, ascending."""
+        found: dict[str, list[int]] = {"snapshot": [], "wal": []}
+        for path in self.directory.iterdir():
+            match = _FILE_NAME.match(path.name)
+            if match:
+                found[match[1]].append(int(match[2]))
+        return sorted(found["snapshot"]), sorted(found["wal"])
+
+    def _recover(self) -> None:
+        """Rebuild the table from disk and start a new log segment.
+
+        Loads the newest snapshot, replays the segments written after it
+        and deletes files it supersedes. Call with ``lock`` held.
+
+        Raises:
+            ValueError: If the snapshot or a segment other than the last is
+                damaged.
+        """
+        self.table = self._new_table()
+        snapshots, segments = self._files()
+        start = snapshots[-1] if snapshots else 0
+        if snapshots:
+            for op in decode_snapshot(self._path("snapshot", start).read_bytes()):
+                self.table.apply(op)
+        segments = [number for number in segments if number >= start]
+        self._since_snapshot = 0
+        for number in segments:
+            path = self._path("wal", number)
+            data = path.read_bytes()
+            ops, valid = decode_records(data)
+            if valid < len(data):
+                if number != segments[-1]:
+                    raise ValueError(f"{path} is damaged at offset {valid}")
+                # A crash interrupted the last append; drop the partial record.
+                os.truncate(path, valid)
+            for op in ops:
+                self.table.apply(op)
+            self._since_snapshot += valid
+        self.table.flush()
+        self.recovered = bool(snapshots) or self._since_snapshot > 0
+        self._open_segment(max([start, *segments]) + 1)
+        self._prune(start)
+
+    def _open_segment(self, number: int) -> None:
+        """Start appending to a new log segment; call with ``lock`` held."""
+        self._fd = os.open(
+            self._path("wal", number), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644
+        )
+        self._segment = number
+        if self.sync != "off":
+            self._sync_directory()
+
+    def _sync_directory(self) -> None:
+        """Make file creations and renames in the directory durable."""
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _prune(self, start: int) -> None:
+        """Delete snapshots and log segments older than snapshot ``start``."""
+        snapshots, segments = self._files()
+        for number in snapshots:
+            if number < start:
+                self._path("snapshot", number).unlink(missing_ok=True)
+        for number in segments:
+            if number < start:
+                self._path("wal", number).unlink(missing_ok=True)
+        for path in self.directory.glob("*.tmp"):
+            path.unlink(missing_ok=True)
+
+    @contextmanager
+    def _writing(self):
+        """Hold the write lock; afterwards wait until the writes are durable."""
+        with super()._writing():
+            yield
+            written = self._written
+        if self.sync == "commit":
+            self._flush(written)
+        if self._since_snapshot >= self.snapshot_bytes:
+            self._start_snapshot()
+
+    def _commit(self, op: dict):
+        """Apply an operation, then append it to the log."""
+        record = encode_record(op)
+        result = self.table.apply(op)
+        try:
+            data = memoryview(record)
+            while data:
+                data = data[os.write(self._fd, data) :]
+        except BaseException:
+            # The table is now ahead of the log; rebuild it from the log.
+            os.close(self._fd)
+            self._recover()
+            raise
+        self._written += len(record)
+        self._since_snapshot += len(record)
+        return result
+
+    def _flush(self, target: int) -> None:
+        """Fsync the log at least up to position ``target``.
+
+        One caller at a time runs the fsync and it covers everything
+        written so far, so writers queued behind it usually find their
+        records already durable and skip their own fsync.
+        """
+        while True:
+            with self._synced_cond:
+                while self._syncing and self._synced < target:
+                    self._synced_cond.wait()
+                if self._synced >= target:
+                    return
+                self._syncing = True
+            synced = None
+            try:
+                if self.commit_delay:
+                    time.sleep(self.commit_delay)
+                fd, end = self._fd, self._written
+                os.fsync(fd)
+                synced = end
+            finally:
+                with self._synced_cond:
+                    if synced is not None:
+                        self._synced = max(self._synced, synced)
+                    self._syncing = False
+                    self._synced_cond.notify_all()
+
+    def _sync_periodically(self, interval: float) -> None:
+        """Fsync new log records every ``interval`` seconds until closed."""
+        while not self._closed.wait(interval):
+            self._flush(self._written)
+
+    def _start_snapshot(self) -> None:
+        """Write a snapshot in the background unless one is in progress."""
+        # The thread releases the lock when the snapshot is done.
+        # pylint: disable-next=consider-using-with
+        if self._snapshotting.acquire(blocking=False):
+            threading.Thread(
+                target=self._snapshot_in_background,
+                name="users-snapshot",
+                daemon=True,
+            ).start()
+
+    def _snapshot_in_background(self) -> None:
+        """Run ``_snapshot`` and release the snapshot lock."""
+        try:
+            self._snapshot()
+        finally:
+            self._snapshotting.release()
+
+    def snapshot(self) -> None:
+        """Write a snapshot now and delete the log segments it replaces."""
+        with self._snapshotting:
+            self._snapshot()
+
+    def _snapshot(self) -> None:
+        """Write a snapshot; call with ``_snapshotting`` held.
+
+        Writers are only blocked while the table is cloned and the log
+        moves to a new segment; encoding and writing happen after.
+        """
+        with self.lock:
+            table = self.table.clone()
+            if self.sync != "off":
+                self._flush(self._written)
+            os.close(self._fd)
+            self._open_segment(self._segment + 1)
+            number = self._segment
+            self._since_snapshot = 0
+        self._write_file(
+            self._path("snapshot", number), encode_snapshot(table.export())
+        )
+        self._prune(number)
+
+    def _write_file(self, path: Path, data: bytes) -> None:
+        """Atomically replace ``path`` with ``data``, durably if syncing."""
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as tmp:
+            tmp.write(data)
+            if self.sync != "off":
+                tmp.flush()
+                os.fsync(tmp.fileno())
+        os.replace(tmp_path, path)
+        if self.sync != "off":
+            self._sync_directory()
+
+    def load(self, sample: list[dict]) -> None:
+        """Seed the store only if nothing was recovered from disk.
+
+        A store restored from disk keeps its state, even if it was cleared
+        before the restart.
+        """
+        if not self.recovered:
+            self.seed(sample)
+
+    def close(self) -> None:
+        """Stop background syncing, flush the log and close it."""
+        self._closed.set()
+        with self._snapshotting, self.lock:
+            if self._fd >= 0:
+                if self.sync != "off":
+                    self._flush(self._written)
+                os.close(self._fd)
+                self._fd = -1
@@ -0,0 +1,185 @@
+"""Secondary indexes for the in-memory users table."""
+
+from __future__ import annotations
+from bisect import bisect_left, insort
+from collections.abc import Iterator
+
+# Sorts after any character a field value can contain.
+_MAX = "\U0010ffff"
+
+# Entries per chunk of a ``SortedIndex``; chunks are split at twice this.
+_CHUNK = 512
+
+# Additions to one chunk up to this many are inserted one by one; more are
+# merged by sorting the chunk.
+_INSORT_MAX = 16
+
+
+def prefix_end(prefix: str) -> str:
+    """Get the exclusive upper bound of the values starting with ``prefix``.
+
+    Every value starting with ``prefix`` sorts in ``[prefix, prefix_end)``,
+    which turns a prefix match into a range scan over a sorted index.
+
+    Args:
+        prefix (str): The prefix to match.
+
+    Returns:
+        str: A string sorting after every value that starts with ``prefix``.
+    """
+    return prefix + _MAX
+
+
+class SortedIndex:
+    """Unique entry tuples kept in sorted order, for ordered and range scans.
+
+    Entries live in a list of sorted chunks of about ``_CHUNK`` entries plus
+    the last entry of each chunk, so finding a position is two bisections
+    and a write only copies the chunks it changes and the lists of chunks
+    rather than the whole index. The two lists are published together as ``layout``
+    and never changed once published, so readers scan a consistent
+    version without a lock. Writers must be serialized by the caller.
+    Additions and removals are buffered until ``flush`` publishes them
+    together, so readers never see an entry moved by an update missing,
+    and a batch of writes rebuilds each chunk it touches once.
+    """
+
+    __slots__ = ("layout", "added", "removed")
+
+    def __init__(self):
+        self.layout: tuple[list[list[tuple]], list[tuple]] = ([], [])
+        self.added: set[tuple] = set()
+        self.removed: set[tuple] = set()
+
+    def flush(self) -> None:
+        """Publish the buffered additions and removals.
+
+        Only the chunks they fall in are rebuilt; the others are shared
+        with the previous layout.
+        """
+        added, removed = self.added, self.removed
+        if not added and not removed:
+            return
+        self.added, self.removed = set(), set()
+        chunks, maxes = self.layout
+        last = max(len(chunks) - 1, 0)
+        changed: dict[int, tuple[list[tuple], list[tuple]]] = {}
+        for position, entries in ((0, added), (1, removed)):
+            for entry in entries:
+                slot = min(bisect_left(maxes, entry), last)
+                changed.setdefault(slot, ([], []))[position].append(entry)
+        chunks, maxes = list(chunks), list(maxes)
+        # From the end, so splitting a chunk leaves the slots before it.
+        for slot in sorted(changed, reverse=True):
+            adds, drops = changed[slot]
+            entries = list(chunks[slot]) if chunks else []
+            for entry in drops:
+                offset = bisect_left(entries, entry)
+                if offset < len(entries) and entries[offset] == entry:
+                    del entries[offset]
+            if len(adds) > _INSORT_MAX:
+                entries.extend(adds)
+                entries.sort()
+            else:
+                for entry in adds:
+                    insort(entries, entry)
+            if len(entries) > 2 * _CHUNK:
+                pieces = [
+                    entries[start : start + _CHUNK]
+                    for start in range(0, len(entries), _CHUNK)
+                ]
+            else:
+                pieces = [entries] if entries else []
+            chunks[slot : slot + 1] = pieces
+            maxes[slot : slot + 1] = [piece[-1] for piece in pieces]
+        self.layout = (chunks, maxes)
+
+    def add(self, entry: tuple) -> None:
+        """Add ``entry`` to the index once flushed."""
+        if self.removed and entry in self.removed:
+            self.removed.discard(entry)
+        else:
+            self.added.add(entry)
+
+    def remove(self, entry: tuple) -> None:
+        """Remove ``entry``, which must be in the index, once flushed."""
+        if entry in self.added:
+            self.added.discard(entry)
+        else:
+            self.removed.add(entry)
+
+    def rank(self, bound: tuple) -> int:
+        """Count the entries below ``bound``, without visiting them."""
+        chunks, maxes = self.layout
+        slot = bisect_left(maxes, bound)
+        below = sum(len(chunk) for chunk in chunks[:slot])
+        if slot < len(chunks):
+            below += bisect_left(chunks[slot], bound)
+        return below
+
+    def scan(self, bound: tuple | None = None, descending: bool = False) -> Iterator:
+        """Iterate over the entries from a bound, in either direction.
+
+        Args:
+            bound (tuple | None): Ascending, the scan starts at the first
+                entry not below ``bound``; descending, at the last entry
+                below it. None starts at the corresponding end.
+            descending (bool): Whether to walk from large to small.
+
+        Yields:
+            tuple: The entries, in order, as of the start of the scan.
+        """
+        chunks, maxes = self.layout
+        if not chunks:
+            return
+        if descending:
+            slot = len(chunks) - 1 if bound is None else bisect_left(maxes, bound)
+            slot = min(slot, len(chunks) - 1)
+            chunk = chunks[slot]
+            end = len(chunk) if bound is None else bisect_left(chunk, bound)
+            yield from reversed(chunk[:end])
+            for slot in range(slot - 1, -1, -1):
+                yield from reversed(chunks[slot])
+        else:
+            slot = 0 if bound is None else bisect_left(maxes, bound)
+            if slot == len(chunks):
+                return
+            chunk = chunks[slot]
+            yield from chunk[0 if bound is None else bisect_left(chunk, bound) :]
+            for slot in range(slot + 1, len(chunks)):
+                yield from chunks[slot]
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self.layout = ([], [])
+        self.added, self.removed = set(), set()
+
+    def copy(self):
+        """Copy the index; the copy shares the published chunks."""
+        other = type(self)()
+        other.layout = self.layout
+        other.added, other.removed = set(self.added), set(self.removed)
+        return other
+
+
+class PrefixIndex(SortedIndex):
+    """Sorted ``(value, uid)`` pairs of one field, for prefix lookups.
+
+    Values are stored normalized with ``normalize_term``.
+    """
+
+    __slots__ = ()
+
+    def match(self, prefix: str) -> set[str]:
+        """Get the ids whose value starts with the normalized ``prefix``."""
+        end = prefix_end(prefix)
+        matches = set()
+        for value, uid in self.scan((prefix,)):
+            if value >= end:
+                break
+            matches.add(uid)
+        return matches
+
+    def count(self, prefix: str) -> int:
+        """Count the values starting with the normalized ``prefix``."""
+        return self.rank((prefix_end(prefix),)) - self.rank((prefix,))
@@ -0,0 +1,897 @@
+"""In-process memory backend for the users store.
+
+``UserTable`` holds the records and their indexes; ``MemoryBackend`` wraps
+it with the store API. Every write is expressed as an operation dict that
+``UserTable.apply`` executes, which lets subclasses replicate or persist
+writes by hooking ``MemoryBackend._commit``.
+"""
+
+from __future__ import annotations
+from bisect import bisect_right
+from collections import deque
+from collections.abc import Callable, Collection, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import sys
+from threading import RLock
+import time
+from uuid import uuid4
+
+# pylint: disable=import-error
+from django.conf import settings
+from users.store import (
+    SEARCH_FIELDS,
+    SORT_FIELDS,
+    ChangesExpiredError,
+    DuplicateEmailError,
+    VersionConflictError,
+    normalize_email,
+    normalize_term,
+    now_iso,
+    sort_key,
+    update_changes,
+)
+from . import ITEM_ERRORS, StoreBackend
+from .indexes import PrefixIndex, SortedIndex
+from .records import UserRecords
+
+# Deleted slots are compacted away once they make up half of the order list
+# (and there are at least this many), keeping deletes amortized O(1).
+_COMPACT_MIN_DEAD = 1024
+
+# Sorts after every user id, for bisecting ``(seq, uid)`` pairs by seq.
+_MAX_ID = "\uffff"
+# Sorts after every sequence number, for bisecting sorted index entries.
+_MAX_SEQ = float("inf")
+
+
+def _matcher(prefixes: dict[str, str], terms: list[str]) -> Callable[[dict], bool]:
+    """Build the test a user must pass to be found by ``UserTable.filter_ids``."""
+
+    def matches(user: dict) -> bool:
+        values = {field: normalize_term(user[field]) for field in SEARCH_FIELDS}
+        return all(
+            values[field].startswith(prefix) for field, prefix in prefixes.items()
+        ) and all(
+            any(value.startswith(term) for value in values.values()) for term in terms
+        )
+
+    return matches
+
+
+class UserTable:  # pylint: disable=too-many-instance-attributes
+    """User records and their indexes.
+
+    Writers must be serialized by the caller; readers need no lock. To keep
+    lock-free reads consistent, records are copy-on-write (a published user
+    dict is never mutated, updates publish a replacement) and every write
+    publishes the record before bumping its version, so a version read
+    before a record is never newer than that record. The secondary indexes
+    are copy-on-write too, and a write's changes to them are published
+    by ``flush``, which writers call once per batch of operations.
+
+    Every mutation takes the time of the write as ``at`` rather than reading
+    the clock, so replaying the same operations elsewhere reproduces the
+    same state, generation and timestamps.
+
+    Args:
+        change_log_size (int): How many generations of changes to retain
+            for ``changes_since``.
+    """
+
+    def __init__(self, change_log_size: int = 10_000):
+        # Keyed by user id; dicts preserve insertion order, so iterating
+        # ``users.values()`` yields users in the order they were created.
+        self.users: dict[str, dict] = {}
+        # Normalized email -> user id, mirrors ``User.email`` being unique.
+        self.emails: dict[str, str] = {}
+        # Keyset index over insertion order used for cursor pagination, as
+        # an ``(order, seqs)`` pair swapped in one assignment on compaction.
+        # ``order[i]`` is the id inserted with sequence ``seqs[i]`` (None once
+        # deleted); ``seqs`` is strictly increasing so cursors can bisect it.
+        self.keyset: tuple[list[str | None], list[int]] = ([], [])
+        self.slots: dict[str, int] = {}
+        # Prefix indexes over the normalized values of ``SEARCH_FIELDS``.
+        self.indexes = {field: PrefixIndex() for field in SEARCH_FIELDS}
+        # ``(sort_key, seq, uid)`` entries ordering users by ``SORT_FIELDS``.
+        self.sorted = {field: SortedIndex() for field in SORT_FIELDS}
+        self.next_seq: int = 1
+        self.dead: int = 0
+        # Bumped on every write; ``versions`` records the generation at which
+        # each user was last written so per-user caches can be keyed on it.
+        self.generation: int = 0
+        self.versions: dict[str, int] = {}
+        # Wall-clock time of the last write, as a POSIX timestamp.
+        self.modified_at: float = time.time()
+        self.seeded: bool = False
+        # Change log for delta sync: one entry per user write, tagged with
+        # the generation it produced. Changes at or below ``changes_floor``
+        # have been discarded, so cursors older than that must resync.
+        self.changes: deque[dict] = deque()
+        self.changes_floor: int = 0
+        self.change_log_size = change_log_size
+        self._handlers = {
+            "add": lambda op: self.add(op["user"], op["at"]),
+            "replace": lambda op: self.replace(op["user"], op["at"]),
+            "remove": lambda op: self.remove(op["id"], op["at"]),
+            "clear": lambda op: self.clear(op["at"]),
+            "seeded": lambda op: setattr(self, "seeded", True),
+            "base": self._load_base,
+            "restore": self._restore,
+        }
+
+    def apply(self, op: dict):
+        """Execute a write operation.
+
+        Operations either raise before changing anything or apply fully.
+
+        Args:
+            op (dict): The operation; ``op["op"]`` names it and the other
+                keys are its arguments.
+
+        Returns:
+            The result of the underlying method, e.g. the removed user.
+        """
+        return self._handlers[op["op"]](op)
+
+    def flush(self) -> None:
+        """Publish the index changes of the operations applied so far."""
+        for index in (*self.indexes.values(), *self.sorted.values()):
+            index.flush()
+
+    def touch(self, at: float, uid: str | None = None) -> None:
+        """Advance the store generation after a write.
+
+        Args:
+            at (float): POSIX timestamp of the write.
+            uid (str | None): The user that was written, if any, whose
+                version is set to the new generation.
+        """
+        self.generation += 1
+        self.modified_at = at
+        if uid is not None:
+            self.versions[uid] = self.generation
+
+    def _log(self, kind: str, uid: str, user: dict | None, at: float) -> None:
+        """Record a user write in the change log; call after ``touch``.
+
+        Args:
+            kind (str): ``"created"``, ``"updated"`` or ``"deleted"``.
+            uid (str): The id of the user written.
+            user (dict | None): The user's new record; None for a delete.
+            at (float): POSIX timestamp of the write.
+        """
+        changes = self.changes
+        changes.append(
+            {
+                "seq": self.generation,
+                "type": kind,
+                "id": uid,
+                "at": datetime.fromtimestamp(at, timezone.utc).isoformat(),
+                "user": user,
+            }
+        )
+        cutoff = self.generation - self.change_log_size
+        if cutoff > self.changes_floor:
+            self.changes_floor = cutoff
+            while changes[0]["seq"] <= cutoff:
+                changes.popleft()
+
+    def changes_since(self, since: int, limit: int) -> tuple[list[dict], int, bool]:
+        """Get the changes made after generation ``since``, oldest first.
+
+        Like ``snapshot``, retries until no write changed the log while it
+        was read, so the changes are consistent without taking the write
+        lock.
+
+        Args:
+            since (int): The generation the client has seen.
+            limit (int): Maximum number of changes to return.
+
+        Returns:
+            tuple[list[dict], int, bool]: As for ``store.get_changes``.
+
+        Raises:
+            ChangesExpiredError: If changes after ``since`` were discarded.
+        """
+        while True:
+            if not self.changes_floor <= since <= self.generation:
+                raise ChangesExpiredError(since, self.generation)
+            newer = []
+            try:
+                for change in reversed(self.changes):
+                    if change["seq"] <= since:
+                        break
+                    newer.append(change)
+            except RuntimeError:
+                continue  # the deque changed during iteration
+            # Changes may have been dropped after the floor was checked.
+            if self.changes_floor <= since:
+                break
+        newer.reverse()
+        if len(newer) > limit:
+            return newer[:limit], newer[limit - 1]["seq"], True
+        # The generation is bumped before the change is logged, so the last
+        # change read, not the generation, is where the next read starts.
+        return newer, (newer[-1]["seq"] if newer else since), False
+
+    def snapshot(self, uid: str) -> tuple[dict | None, int | None]:
+        """Read a user together with the version it was written at.
+
+        Retries until the version is the same before and after reading the
+        record, so the pair is consistent without taking the write lock.
+
+        Args:
+            uid (str): The id of the user to read.
+
+        Returns:
+            tuple[dict | None, int | None]: The user and its version, or
+            ``(None, None)`` if the user does not exist.
+        """
+        while True:
+            version = self.versions.get(uid)
+            user = self.users.get(uid)
+            if self.versions.get(uid) == version:
+                if user is None or version is None:
+                    return None, None
+                return user, version
+
+    def find_by_email(self, email: str) -> dict | None:
+        """Get the user registered with an email address.
+
+        Args:
+            email (str): The email address to look up.
+
+        Returns:
+            dict | None: The owning user, or None if the email is free.
+        """
+        key = normalize_email(email)
+        uid = self.emails.get(key)
+        user = self.users.get(uid) if uid is not None else None
+        # The index and the record are updated separately; only report a match
+        # once the published record actually carries the address.
+        if user is None or normalize_email(user["email"]) != key:
+            return None
+        return user
+
+    def add(self, user: dict, at: float) -> None:
+        """Insert a user and index its email.
+
+        Args:
+            user (dict): The complete user record to store.
+            at (float): POSIX timestamp of the write.
+
+        Raises:
+            DuplicateEmailError: If another user already has the email.
+        """
+        key = normalize_email(user["email"])
+        if key in self.emails:
+            raise DuplicateEmailError(user["email"])
+        self._insert(user, key, self.next_seq)
+        self.next_seq += 1
+        self.touch(at, user["id"])
+        self._log("created", user["id"], user, at)
+
+    def _index_entries(self, user: dict, seq: int):
+        """Yield each secondary index with the entry ``user`` has in it."""
+        uid = user["id"]
+        for field, index in self.indexes.items():
+            yield index, (normalize_term(user[field]), uid)
+        for field, index in self.sorted.items():
+            yield index, (sort_key(field, user[field]), seq, uid)
+
+    def _insert(self, user: dict, key: str, seq: int) -> None:
+        """Publish a new record under the given keyset sequence number."""
+        uid = user["id"]
+        order, seqs = self.keyset
+        self.users[uid] = user
+        self.emails[key] = uid
+        for index, entry in self._index_entries(user, seq):
+            index.add(entry)
+        self.slots[uid] = len(order)
+        # ``seqs`` grows first so a reader that sees a slot in ``order``
+        # always finds its sequence number.
+        seqs.append(seq)
+        order.append(uid)
+
+    def replace(self, user: dict, at: float) -> None:
+        """Publish a new record for an existing user.
+
+        Args:
+            user (dict): The user's new record.
+            at (float): POSIX timestamp of the write.
+
+        Raises:
+            DuplicateEmailError: If another user already has the new email.
+        """
+        uid = user["id"]
+        old_key = normalize_email(self.users[uid]["email"])
+        new_key = normalize_email(user["email"])
+        if old_key != new_key and new_key in self.emails:
+            raise DuplicateEmailError(user["email"])
+        old = self.users[uid]
+        self.users[uid] = user
+        if old_key != new_key:
+            del self.emails[old_key]
+            self.emails[new_key] = uid
+        seq = self.keyset[1][self.slots[uid]]
+        for (index, old_entry), (_, new_entry) in zip(
+            self._index_entries(old, seq), self._index_entries(user, seq)
+        ):
+            if old_entry != new_entry:
+                index.remove(old_entry)
+                index.add(new_entry)
+        self.touch(at, uid)
+        self._log("updated", uid, user, at)
+
+    def remove(self, uid: str, at: float) -> dict | None:
+        """Remove a user and its email index entry.
+
+        Args:
+            uid (str): The id of the user to remove.
+            at (float): POSIX timestamp of the write.
+
+        Returns:
+            dict | None: The removed user, or None if it did not exist.
+        """
+        user = self.users.pop(uid, None)
+        if user is not None:
+            self.emails.pop(normalize_email(user["email"]), None)
+            slot = self.slots.pop(uid)
+            for index, entry in self._index_entries(user, self.keyset[1][slot]):
+                index.remove(entry)
+            self.keyset[0][slot] = None
+            self.dead += 1
+            self.versions.pop(uid, None)
+            self.touch(at)
+            self._log("deleted", uid, None, at)
+            if self.dead >= _COMPACT_MIN_DEAD and self.dead * 2 >= len(self.keyset[0]):
+                self._compact()
+        return user
+
+    def _compact(self) -> None:
+        """Drop deleted slots from the keyset index and renumber the rest."""
+        live = [(uid, seq) for uid, seq in zip(*self.keyset) if uid is not None]
+        order = [uid for uid, _ in live]
+        self.keyset = (order, [seq for _, seq in live])
+        self.slots = {uid: slot for slot, uid in enumerate(order)}
+        self.dead = 0
+
+    def page(
+        self,
+        after: int | None,
+        limit: int,
+        where: Callable[[dict], bool] | None = None,
+    ) -> tuple[list[dict], int | None]:
+        """Get a page of users in insertion order.
+
+        Args:
+            after (int | None): Sequence number of the last user on the
+                previous page, or None to start from the beginning.
+            limit (int): Maximum number of users to return.
+            where (Callable[[dict], bool] | None): If given, only users
+                passing this test are returned.
+
+        Returns:
+            tuple[list[dict], int | None]: The users on the page and the
+            sequence number to resume from, or None if this is the last page.
+        """
+        order, seqs = self.keyset
+        users = self.users
+        slot = 0 if after is None else bisect_right(seqs, after)
+        page: list[dict] = []
+        last_seq = None
+        while slot < len(order):
+            uid = order[slot]
+            # A user deleted after its slot was read is simply skipped.
+            user = users.get(uid) if uid is not None else None
+            if user is not None and (where is None or where(user)):
+                if len(page) == limit:
+                    return page, last_seq
+                page.append(user)
+                last_seq = seqs[slot]
+            slot += 1
+        return page, None
+
+    def filter_ids(self, prefixes: dict[str, str], terms: list[str]) -> set | None:
+        """Get the ids passing every filter, or None if there are none."""
+        candidates = [
+            self.indexes[field].match(prefix) for field, prefix in prefixes.items()
+        ]
+        for term in terms:
+            candidates.append(
+                set().union(*(index.match(term) for index in self.indexes.values()))
+            )
+        if not candidates:
+            return None
+        candidates.sort(key=len)
+        return candidates[0].intersection(*candidates[1:])
+
+    def search_page(
+        self,
+        prefixes: dict[str, str],
+        terms: list[str],
+        after: int | None,
+        limit: int,
+    ) -> tuple[list[dict], int | None]:
+        """Get a page of the users matching prefix filters, in insertion order.
+
+        Broad filters are applied while walking insertion order from the
+        cursor, until ``limit + 1`` users pass. Selective ones, which such
+        a walk would mostly skip through, take candidate sets from the prefix
+        indexes, intersect them smallest first and order the survivors by
+        sequence number.
+
+        Args:
+            prefixes (dict[str, str]): Field to normalized prefix.
+            terms (list[str]): Normalized prefixes each matching any field.
+            after (int | None): Sequence number to resume after.
+            limit (int): Maximum number of users to return.
+
+        Returns:
+            tuple[list[dict], int | None]: As for ``page``.
+        """
+        if not prefixes and not terms:
+            return self.page(after, limit)
+        counts = [self.indexes[field].count(value) for field, value in prefixes.items()]
+        for term in terms:
+            counts.append(sum(index.count(term) for index in self.indexes.values()))
+        # With m matches among n users, ordering them costs about m log m
+        # and the walk visits about (limit + 1) * n / m users.
+        estimate = min(counts)
+        if estimate * estimate > (limit + 1) * len(self.users):
+            return self.page(after, limit, _matcher(prefixes, terms))
+        ordered = sorted(self._positions(self.filter_ids(prefixes, terms)))
+        start = 0 if after is None else bisect_right(ordered, (after, _MAX_ID))
+        window = []
+        for seq, uid in ordered[start:]:
+            # A user deleted since the filter ran is simply skipped.
+            user = self.users.get(uid)
+            if user is not None:
+                window.append((seq, user))
+                if len(window) > limit:
+                    break
+        page = [user for _, user in window[:limit]]
+        return page, (window[limit - 1][0] if len(window) > limit else None)
+
+    def _positions(self, uids: set[str]) -> list[tuple[int, str]]:
+        """Get the ``(seq, uid)`` of each user in ``uids`` that still exists.
+
+        Compaction publishes a new keyset before the slots into it, so the
+        lookup is retried until every slot points back at its user.
+        """
+        while True:
+            order, seqs = self.keyset
+            slots = self.slots
+            positions = []
+            for uid in uids:
+                slot = slots.get(uid)
+                if slot is None:
+                    continue
+                if slot >= len(order) or order[slot] != uid:
+                    break
+                positions.append((seqs[slot], uid))
+            else:
+                return positions
+
+    def sorted_page(  # pylint: disable=too-many-arguments
+        self,
+        field: str,
+        after: tuple[float | str, int] | None,
+        limit: int,
+        *,
+        descending: bool = False,
+        start: float | str | None = None,
+        matches: set | None = None,
+    ) -> tuple[list[dict], tuple[float | str, int] | None]:
+        """Get a page of users ordered by a field of ``SORT_FIELDS``.
+
+        The page is found by bisecting the field's sorted index, so it costs
+        O(log n + limit) unless ``matches`` makes the scan skip entries.
+
+        Args:
+            field (str): The field to order by.
+            after (tuple[float | str, int] | None): ``(sort key, seq)`` of
+                the last user on the previous page.
+            limit (int): Maximum number of users to return.
+            descending (bool): Whether to walk the index backwards.
+            start (float | str | None): Sort key to begin at, inclusive.
+            matches (set | None): If given, only these ids are returned.
+
+        Returns:
+            tuple[list[dict], tuple[float | str, int] | None]: The users on
+            the page and the ``(sort key, seq)`` of the last one, or None
+            if this is the last page.
+        """
+        # Descending scans stop below an exclusive upper bound, ascending
+        # ones start at an inclusive lower bound; both tighten to the cursor.
+        bounds = []
+        if descending:
+            if start is not None:
+                bounds.append((start, _MAX_SEQ))
+            if after is not None:
+                bounds.append(tuple(after))
+            bound = min(bounds, default=None)
+        else:
+            if start is not None:
+                bounds.append((start,))
+            if after is not None:
+                bounds.append((after[0], after[1] + 1))
+            bound = max(bounds, default=None)
+        window = []
+        for entry in self.sorted[field].scan(bound, descending):
+            if matches is None or entry[2] in matches:
+                # A user deleted since the scan began is simply skipped.
+                user = self.users.get(entry[2])
+                if user is not None:
+                    window.append((entry[:2], user))
+                    if len(window) > limit:
+                        break
+        page = [user for _, user in window[:limit]]
+        return page, (window[limit - 1][0] if len(window) > limit else None)
+
+    def clear(self, at: float) -> None:
+        """Clear all users and reset seeded status.
+
+        The sequence counter and generation are kept so cursors and cache
+        keys issued before the clear never match data created after it.
+
+        Args:
+            at (float): POSIX timestamp of the write.
+        """
+        self.users.clear()
+        self.emails.clear()
+        self.keyset = ([], [])
+        self.slots.clear()
+        for index in (*self.indexes.values(), *self.sorted.values()):
+            index.clear()
+        self.dead = 0
+        self.versions.clear()
+        self.touch(at)
+        self.seeded = False
+        self.changes.clear()
+        self.changes_floor = self.generation
+
+    def clone(self) -> UserTable:
+        """Copy the table; call with writers serialized.
+
+        Records are copy-on-write, so the copy shares them and only the
+        containers are duplicated. The copy is a consistent view that later
+        writes to this table do not affect.
+
+        Returns:
+            UserTable: An independent table with the same state.
+        """
+        other = type(self)(self.change_log_size)
+        other.users = self.users.copy()
+        other.emails = dict(self.emails)
+        order, seqs = self.keyset
+        other.keyset = (list(order), list(seqs))
+        other.slots = dict(self.slots)
+        other.indexes = {field: index.copy() for field, index in self.indexes.items()}
+        other.sorted = {field: index.copy() for field, index in self.sorted.items()}
+        other.next_seq = self.next_seq
+        other.dead = self.dead
+        other.generation = self.generation
+        other.versions = dict(self.versions)
+        other.modified_at = self.modified_at
+        other.seeded = self.seeded
+        other.changes = deque(self.changes)
+        other.changes_floor = self.changes_floor
+        return other
+
+    def export(self) -> Iterator[dict]:
+        """Describe the current state as a sequence of operations.
+
+        Applying the operations to an empty table reproduces this one,
+        including generation, versions and keyset positions, which makes
+        them suitable for compacted logs and snapshots.
+
+        Yields:
+            dict: A ``base`` operation followed by one ``restore`` operation
+            per user, in insertion order.
+        """
+        yield {
+            "op": "base",
+            "generation": self.generation,
+            "next_seq": self.next_seq,
+            "at": self.modified_at,
+            "seeded": self.seeded,
+            "changes_floor": self.changes_floor,
+            "changes": list(self.changes),
+        }
+        users, versions = self.users, self.versions
+        for uid, seq in zip(*self.keyset):
+            if uid is not None:
+                yield {
+                    "op": "restore",
+                    "user": users[uid],
+                    "seq": seq,
+                    "version": versions[uid],
+                }
+
+    def _load_base(self, op: dict) -> None:
+        """Reset the table to the counters recorded by ``export``."""
+        self.clear(op["at"])
+        self.generation = op["generation"]
+        self.next_seq = op["next_seq"]
+        self.seeded = op["seeded"]
+        # Snapshots without a change log restart it at their generation.
+        self.changes = deque(op.get("changes", ()))
+        self.changes_floor = op.get("changes_floor", self.generation)
+
+    def _restore(self, op: dict) -> None:
+        """Re-insert a user recorded by ``export`` at its original position."""
+        user = op["user"]
+        self._insert(user, normalize_email(user["email"]), op["seq"])
+        self.versions[user["id"]] = op["version"]
+
+
+class CompactUserTable(UserTable):
+    """A ``UserTable`` keeping its records in ``UserRecords``.
+
+    Strings the record and the indexes would each hold a copy of are
+    shared: the email is stored as its normalized form when the two are
+    equal, index terms equal to the stored email or phone are the stored
+    string, and other terms (normalized names) are interned. This takes
+    less memory per user; in exchange, every read builds the user's dict
+    anew.
+    """
+
+    def __init__(self, change_log_size: int = 10_000):
+        super().__init__(change_log_size)
+        self.users = UserRecords()
+
+    def _index_entries(self, user: dict, seq: int):
+        for index, entry in super()._index_entries(user, seq):
+            term = entry[0]
+            if isinstance(term, str):
+                if term == user["email"]:
+                    term = user["email"]
+                elif term == user["phone"]:
+                    term = user["phone"]
+                else:
+                    term = sys.intern(term)
+                entry = (term, *entry[1:])
+            yield index, entry
+
+    def _insert(self, user: dict, key: str, seq: int) -> None:
+        if user["email"] == key:
+            user = {**user, "email": key}
+        super()._insert(user, key, seq)
+
+
+# Values of the USERS_STORE_RECORDS setting and the tables they select.
+TABLES = {"dict": UserTable, "compact": CompactUserTable}
+
+
+class MemoryBackend(StoreBackend):  # pylint: disable=too-many-public-methods
+    """Store backend keeping every user in this process's memory.
+
+    Writes are serialized by ``lock`` and applied through ``_commit``;
+    subclasses override ``_sync`` and ``_commit`` to share or persist them.
+
+    Args:
+        change_log_size (int | None): Generations of changes to retain.
+            Defaults to the ``USERS_CHANGE_LOG_SIZE`` setting.
+        records (str | None): How the table stores records, a key of
+            ``TABLES``. Defaults to the ``USERS_STORE_RECORDS`` setting.
+    """
+
+    inline_reads = True
+    inline_writes = True
+
+    def __init__(
+        self, change_log_size: int | None = None, *, records: str | None = None
+    ):
+        self.lock = RLock()
+        self.change_log_size = change_log_size or settings.USERS_CHANGE_LOG_SIZE
+        self.records = records or settings.USERS_STORE_RECORDS
+        if self.records not in TABLES:
+            raise ValueError(f"USERS_STORE_RECORDS must be one of {tuple(TABLES)}")
+        self.table = self._new_table()
+
+    def _new_table(self) -> UserTable:
+        """Create an empty table of the configured kind."""
+        return TABLES[self.records](self.change_log_size)
+
+    def _sync(self) -> None:
+        """Bring the table up to date before a read; nothing to do here."""
+
+    @contextmanager
+    def _writing(self):
+        """Hold the write lock with the table up to date.
+
+        The index changes of the writes made meanwhile are published on
+        the way out.
+        """
+        with self.lock:
+            self._sync()
+            try:
+                yield
+            finally:
+                self.table.flush()
+
+    def _commit(self, op: dict):
+        """Apply a write operation; must be called inside ``_writing``."""
+        return self.table.apply(op)
+
+    def _seed(self, sample: list[dict]) -> None:
+        """Load ``sample`` unless already seeded; call inside ``_writing``."""
+        if self.table.seeded:
+            return
+        for user in sample:
+            self._commit({"op": "add", "user": user, "at": time.time()})
+        self._commit({"op": "seeded"})
+
+    def seed(self, sample: list[dict]) -> None:
+        with self._writing():
+            self._seed(sample)
+
+    def list_users(self) -> list[dict]:
+        self._sync()
+        return list(self.table.users.values())
+
+    def count_users(self) -> int:
+        self._sync()
+        return len(self.table.users)
+
+    def list_users_page(
+        self, limit: int, after: int | None = None
+    ) -> tuple[list[dict], int | None]:
+        self._sync()
+        return self.table.page(after, limit)
+
+    def get_user(self, uid: str) -> dict | None:
+        self._sync()
+        return self.table.users.get(uid)
+
+    def search_users_page(
+        self,
+        prefixes: dict[str, str],
+        terms: list[str],
+        limit: int,
+        after: int | None = None,
+    ) -> tuple[list[dict], int | None]:
+        self._sync()
+        prefixes = {field: normalize_term(value) for field, value in prefixes.items()}
+        terms = [normalize_term(term) for term in terms]
+        return self.table.search_page(prefixes, terms, after, limit)
+
+    def sorted_users_page(  # pylint: disable=too-many-arguments
+        self,
+        field: str,
+        limit: int,
+        after: tuple[float | str, int] | None = None,
+        *,
+        descending: bool = False,
+        start: float | str | None = None,
+        prefixes: dict[str, str],
+        terms: list[str],
+    ) -> tuple[list[dict], tuple[float | str, int] | None]:
+        self._sync()
+        prefixes = {name: normalize_term(value) for name, value in prefixes.items()}
+        terms = [normalize_term(term) for term in terms]
+        table = self.table
+        return table.sorted_page(
+            field,
+            after,
+            limit,
+            descending=descending,
+            start=start,
+            matches=table.filter_ids(prefixes, terms),
+        )
+
+    def get_users(self, uids: list[str]) -> list[dict | None]:
+        self._sync()
+        users = self.table.users
+        return [users.get(uid) for uid in uids]
+
+    def get_user_snapshot(self, uid: str) -> tuple[dict | None, int | None]:
+        self._sync()
+        return self.table.snapshot(uid)
+
+    def find_user_by_email(self, email: str) -> dict | None:
+        self._sync()
+        return self.table.find_by_email(email)
+
+    def _create(self, data: dict) -> dict:
+        """Create a user; call inside ``_writing``."""
+        user = {
+            "id": str(uuid4()),
+            "firstName": data["firstName"],
+            "lastName": data.get("lastName", ""),
+            "email": data["email"],
+            "phone": data.get("phone", ""),
+            "createdAt": now_iso(),
+            "updatedAt": now_iso(),
+        }
+        self._commit({"op": "add", "user": user, "at": time.time()})
+        return user
+
+    def create_user(self, data: dict) -> dict:
+        with self._writing():
+            return self._create(data)
+
+    def create_users(self, items: list[dict]) -> list[dict | Exception]:
+        results = []
+        with self._writing():
+            for data in items:
+                try:
+                    results.append(self._create(data))
+                except (DuplicateEmailError, *ITEM_ERRORS) as exc:
+                    results.append(exc)
+        return results
+
+    def _update(
+        self, uid: str, data: dict, if_versions: Collection[int] | None = None
+    ) -> dict | None:
+        """Update a user; call inside ``_writing``."""
+        table = self.table
+        current = table.users.get(uid)
+        if current is None:
+            return None
+        if if_versions is not None and table.versions.get(uid) not in if_versions:
+            raise VersionConflictError(uid)
+        changes = update_changes(data)
+        user = {**current, **changes, "updatedAt": now_iso()}
+        self._commit({"op": "replace", "user": user, "at": time.time()})
+        return user
+
+    def update_user(
+        self, uid: str, data: dict, if_versions: Collection[int] | None = None
+    ) -> dict | None:
+        with self._writing():
+            return self._update(uid, data, if_versions)
+
+    def update_users(
+        self, items: list[tuple[str, dict]]
+    ) -> list[dict | Exception | None]:
+        results = []
+        with self._writing():
+            for uid, data in items:
+                try:
+                    results.append(self._update(uid, data))
+                except (DuplicateEmailError, *ITEM_ERRORS) as exc:
+                    results.append(exc)
+        return results
+
+    def _delete(self, uid: str) -> bool:
+        """Delete a user; call inside ``_writing``."""
+        if uid not in self.table.users:
+            return False
+        self._commit({"op": "remove", "id": uid, "at": time.time()})
+        return True
+
+    def delete_user(self, uid: str) -> bool:
+        with self._writing():
+            return self._delete(uid)
+
+    def delete_users(self, uids: list[str]) -> list[bool]:
+        with self._writing():
+            return [self._delete(uid) for uid in uids]
+
+    def get_changes(self, since: int, limit: int) -> tuple[list[dict], int, bool]:
+        self._sync()
+        return self.table.changes_since(since, limit)
+
+    def get_generation(self) -> int:
+        self._sync()
+        return self.table.generation
+
+    def get_user_version(self, uid: str) -> int | None:
+        self._sync()
+        return self.table.versions.get(uid)
+
+    def get_last_modified(self) -> float:
+        self._sync()
+        return self.table.modified_at
+
+    def clear_users(self) -> None:
+        with self._writing():
+            self._commit({"op": "clear", "at": time.time()})
+
+    def reset_and_seed(self, sample: list[dict]) -> None:
+        with self._writing():
+            self._commit({"op": "clear", "at": time.time()})
+            self._seed(sample)
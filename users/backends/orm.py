@@ -0,0 +1,438 @@
+"""Database backend for the users store, built on the ``User`` model.
+
+Users survive restarts and are shared by every process using the database.
+The backend sticks to single-statement, index-backed queries: ``values()``
+projections for reads, ``update()`` for PATCH without a read-modify-write
+round trip, ``bulk_create`` for seeding, and lookups on the unique ``uid``,
+the case-insensitive email index and the primary key (which doubles as the
+keyset cursor). Store-wide counters live in the ``UserStoreState`` row and
+are bumped inside each write transaction, which also appends the write to
+the ``UserChange`` log.
+"""
+
+from __future__ import annotations
+from collections.abc import Collection
+from datetime import datetime, timezone as dt_timezone
+from uuid import UUID, uuid4
+
+# pylint: disable=import-error,no-member
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from users.models import User, UserChange, UserStoreState
+from users.store import (
+    SEARCH_FIELDS,
+    SORT_FIELDS,
+    ChangesExpiredError,
+    DuplicateEmailError,
+    VersionConflictError,
+    normalize_email,
+    normalize_term,
+    update_changes,
+)
+from . import ITEM_ERRORS, StoreBackend
+from .indexes import prefix_end
+
+FIELDS = ("uid", "firstName", "lastName", "email", "phone", "createdAt", "updatedAt")
+STATE_PK = 1
+SEED_BATCH_SIZE = 1000
+# Changes that fell out of the retained window are deleted on every write
+# whose generation is a multiple of this.
+CHANGE_PRUNE_INTERVAL = 100
+
+
+def _to_user(values: dict) -> dict:
+    """Convert a ``values()`` row into the store's user dict."""
+    return {
+        "id": str(values["uid"]),
+        "firstName": values["firstName"],
+        "lastName": values["lastName"],
+        "email": values["email"],
+        "phone": values["phone"],
+        "createdAt": values["createdAt"].isoformat(),
+        "updatedAt": values["updatedAt"].isoformat(),
+    }
+
+
+def _parse_uid(uid: str) -> UUID | None:
+    """Parse a user id, returning None for strings that are not UUIDs."""
+    try:
+        return UUID(uid)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp, accepting a trailing ``Z``."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _by_email(email: str):
+    """Queryset of the user with ``email``, using the lowercase index."""
+    return User.objects.alias(email_lower=Lower("email")).filter(
+        email_lower=normalize_email(email)
+    )
+
+
+def _prefix_filter(field: str, prefix: str) -> Q:
+    """Match a lowercase alias against ``prefix`` as an index range scan."""
+    prefix = normalize_term(prefix)
+    return Q(
+        **{f"{field}_lower__gte": prefix, f"{field}_lower__lt": prefix_end(prefix)}
+    )
+
+
+def _change(seq: int, kind: str, uid: UUID, at: datetime, user=None) -> UserChange:
+    """Build a change log entry; see ``store.get_changes``."""
+    return UserChange(seq=seq, type=kind, uid=uid, at=at, user=user)
+
+
+def _log(change: UserChange) -> None:
+    """Append ``change`` to the log and prune it now and then."""
+    change.save(force_insert=True)
+    if change.seq % CHANGE_PRUNE_INTERVAL == 0:
+        UserChange.objects.filter(
+            seq__lte=change.seq - settings.USERS_CHANGE_LOG_SIZE
+        ).delete()
+
+
+def _to_change(change: UserChange) -> dict:
+    """Convert a change log row into the store's change dict."""
+    return {
+        "seq": change.seq,
+        "type": change.type,
+        "id": str(change.uid),
+        "at": change.at.isoformat(),
+        "user": change.user,
+    }
+
+
+def _filtered(prefixes: dict[str, str], terms: list[str]):
+    """Queryset of the users passing every prefix filter and search term."""
+    users = User.objects.alias(
+        **{f"{field}_lower": Lower(field) for field in SEARCH_FIELDS}
+    )
+    for field, prefix in prefixes.items():
+        users = users.filter(_prefix_filter(field, prefix))
+    for term in terms:
+        any_field = Q()
+        for field in SEARCH_FIELDS:
+            any_field |= _prefix_filter(field, term)
+        users = users.filter(any_field)
+    return users
+
+
+def _sort_value(field: str, key: float | str):
+    """Convert a sort key (see ``sort_key``) to a value of the column."""
+    if SORT_FIELDS[field] is str:
+        return key
+    return datetime.fromtimestamp(key, dt_timezone.utc)
+
+
+def _sort_key(field: str, value) -> float | str:
+    """Convert a value of the sort column to its sort key."""
+    return value if SORT_FIELDS[field] is str else value.timestamp()
+
+
+def _sorted(users, field: str, descending: bool, start, after):
+    """Order ``users`` by a field of ``SORT_FIELDS`` and seek past a position.
+
+    Names order case-insensitively, on the expression the lastName index is
+    built on; ties are broken by primary key, i.e. insertion order.
+    """
+    users = users.annotate(
+        sort_value=Lower(field) if SORT_FIELDS[field] is str else F(field)
+    )
+    sign, beyond = ("-", "lt") if descending else ("", "gt")
+    users = users.order_by(f"{sign}sort_value", f"{sign}pk")
+    if start is not None:
+        bound = "lte" if descending else "gte"
+        users = users.filter(**{f"sort_value__{bound}": _sort_value(field, start)})
+    if after is not None:
+        value = _sort_value(field, after[0])
+        users = users.filter(
+            Q(**{f"sort_value__{beyond}": value})
+            | Q(sort_value=value, **{f"pk__{beyond}": after[1]})
+        )
+    return users
+
+
+def _page(users, limit: int, after: int | None) -> tuple[list[dict], int | None]:
+    """Fetch one keyset page of the ``users`` queryset."""
+    users = users.order_by("pk")
+    if after is not None:
+        users = users.filter(pk__gt=after)
+    rows = list(users.values("pk", *FIELDS)[: limit + 1])
+    position = rows[limit - 1]["pk"] if len(rows) > limit else None
+    return [_to_user(row) for row in rows[:limit]], position
+
+
+class OrmBackend(StoreBackend):  # pylint: disable=too-many-public-methods
+    """Store backend keeping users in the database via the ``User`` model."""
+
+    @staticmethod
+    def _bump(count: int = 1) -> int:
+        """Advance the generation; call inside a transaction.
+
+        Args:
+            count (int): How many writes to account for.
+
+        Returns:
+            int: The new generation.
+        """
+        now = timezone.now()
+        state = UserStoreState.objects.filter(pk=STATE_PK)
+        if not state.update(generation=F("generation") + count, modifiedAt=now):
+            UserStoreState.objects.create(pk=STATE_PK, generation=count, modifiedAt=now)
+        return state.values_list("generation", flat=True).get()
+
+    @staticmethod
+    def _state(field: str, default):
+        """Read one field of the state row, or ``default`` if it is missing."""
+        value = (
+            UserStoreState.objects.filter(pk=STATE_PK)
+            .values_list(field, flat=True)
+            .first()
+        )
+        return default if value is None else value
+
+    def _seed(self, sample: list[dict]) -> None:
+        """Bulk-load ``sample`` unless seeded; call inside a transaction."""
+        if self._state("seeded", False):
+            return
+        first = self._bump(len(sample)) - len(sample) + 1
+        now = timezone.now()
+        UserChange.objects.bulk_create(
+            [
+                _change(first + offset, "created", UUID(user["id"]), now, user)
+                for offset, user in enumerate(sample)
+            ],
+            batch_size=SEED_BATCH_SIZE,
+        )
+        User.objects.bulk_create(
+            [
+                User(
+                    uid=UUID(user["id"]),
+                    firstName=user["firstName"],
+                    lastName=user["lastName"],
+                    email=user["email"],
+                    phone=user["phone"],
+                    createdAt=_parse_timestamp(user["createdAt"]),
+                    updatedAt=_parse_timestamp(user["updatedAt"]),
+                    version=first + offset,
+                )
+                for offset, user in enumerate(sample)
+            ],
+            batch_size=SEED_BATCH_SIZE,
+        )
+        UserStoreState.objects.filter(pk=STATE_PK).update(seeded=True)
+
+    def seed(self, sample: list[dict]) -> None:
+        with transaction.atomic():
+            self._seed(sample)
+
+    def list_users(self) -> list[dict]:
+        return [_to_user(row) for row in User.objects.order_by("pk").values(*FIELDS)]
+
+    def count_users(self) -> int:
+        return User.objects.count()
+
+    def list_users_page(
+        self, limit: int, after: int | None = None
+    ) -> tuple[list[dict], int | None]:
+        return _page(User.objects.all(), limit, after)
+
+    def search_users_page(
+        self,
+        prefixes: dict[str, str],
+        terms: list[str],
+        limit: int,
+        after: int | None = None,
+    ) -> tuple[list[dict], int | None]:
+        return _page(_filtered(prefixes, terms), limit, after)
+
+    def sorted_users_page(  # pylint: disable=too-many-arguments
+        self,
+        field: str,
+        limit: int,
+        after: tuple[float | str, int] | None = None,
+        *,
+        descending: bool = False,
+        start: float | str | None = None,
+        prefixes: dict[str, str],
+        terms: list[str],
+    ) -> tuple[list[dict], tuple[float | str, int] | None]:
+        users = _sorted(_filtered(prefixes, terms), field, descending, start, after)
+        rows = list(users.values("pk", "sort_value", *FIELDS)[: limit + 1])
+        position = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            position = (_sort_key(field, last["sort_value"]), last["pk"])
+        return [_to_user(row) for row in rows[:limit]], position
+
+    def get_user(self, uid: str) -> dict | None:
+        user, _ = self.get_user_snapshot(uid)
+        return user
+
+    def get_users(self, uids: list[str]) -> list[dict | None]:
+        parsed = [_parse_uid(uid) for uid in uids]
+        rows = User.objects.filter(uid__in={uid for uid in parsed if uid}).values(
+            *FIELDS
+        )
+        found = {row["uid"]: _to_user(row) for row in rows}
+        return [found.get(uid) for uid in parsed]
+
+    def get_user_snapshot(self, uid: str) -> tuple[dict | None, int | None]:
+        parsed = _parse_uid(uid)
+        row = (
+            User.objects.filter(uid=parsed).values(*FIELDS, "version").first()
+            if parsed
+            else None
+        )
+        if row is None:
+            return None, None
+        return _to_user(row), row["version"]
+
+    def find_user_by_email(self, email: str) -> dict | None:
+        row = _by_email(email).values(*FIELDS).first()
+        return _to_user(row) if row else None
+
+    def create_user(self, data: dict) -> dict:
+        with transaction.atomic():
+            if _by_email(data["email"]).exists():
+                raise DuplicateEmailError(data["email"])
+            now = timezone.now()
+            values = {
+                "uid": uuid4(),
+                "firstName": data["firstName"],
+                "lastName": data.get("lastName", ""),
+                "email": data["email"],
+                "phone": data.get("phone", ""),
+                "createdAt": now,
+                "updatedAt": now,
+            }
+            version = self._bump()
+            try:
+                User.objects.create(**values, version=version)
+            except IntegrityError as exc:
+                raise DuplicateEmailError(data["email"]) from exc
+            user = _to_user(values)
+            _log(_change(version, "created", values["uid"], now, user))
+        return user
+
+    def update_user(
+        self, uid: str, data: dict, if_versions: Collection[int] | None = None
+    ) -> dict | None:
+        parsed = _parse_uid(uid)
+        if parsed is None:
+            return None
+        changes = update_changes(data)
+        with transaction.atomic():
+            if "email" in changes:
+                if _by_email(changes["email"]).exclude(uid=parsed).exists():
+                    raise DuplicateEmailError(changes["email"])
+            target = User.objects.filter(uid=parsed)
+            if if_versions is not None:
+                target = target.filter(version__in=list(if_versions))
+            now, version = timezone.now(), self._bump()
+            try:
+                updated = target.update(**changes, updatedAt=now, version=version)
+            except IntegrityError as exc:
+                raise DuplicateEmailError(changes.get("email")) from exc
+            if not updated:
+                if if_versions is not None and User.objects.filter(uid=parsed).exists():
+                    raise VersionConflictError(uid)
+                transaction.set_rollback(True)
+                return None
+            user = _to_user(User.objects.filter(uid=parsed).values(*FIELDS).get())
+            _log(_change(version, "updated", parsed, now, user))
+        return user
+
+    def delete_user(self, uid: str) -> bool:
+        parsed = _parse_uid(uid)
+        if parsed is None:
+            return False
+        with transaction.atomic():
+            deleted, _ = User.objects.filter(uid=parsed).delete()
+            if deleted:
+                _log(_change(self._bump(), "deleted", parsed, timezone.now()))
+        return bool(deleted)
+
+    # The batch methods run the per-item methods in one transaction; each
+    # item's own atomic block becomes a savepoint, so a failed item is rolled
+    # back alone and the batch commits once.
+
+    def create_users(self, items: list[dict]) -> list[dict | Exception]:
+        results = []
+        with transaction.atomic():
+            for data in items:
+                try:
+                    results.append(self.create_user(data))
+                except (DuplicateEmailError, *ITEM_ERRORS) as exc:
+                    results.append(exc)
+        return results
+
+    def update_users(
+        self, items: list[tuple[str, dict]]
+    ) -> list[dict | Exception | None]:
+        results = []
+        with transaction.atomic():
+            for uid, data in items:
+                try:
+                    results.append(self.update_user(uid, data))
+                except (DuplicateEmailError, *ITEM_ERRORS) as exc:
+                    results.append(exc)
+        return results
+
+    def delete_users(self, uids: list[str]) -> list[bool]:
+        with transaction.atomic():
+            return [self.delete_user(uid) for uid in uids]
+
+    def get_changes(self, since: int, limit: int) -> tuple[list[dict], int, bool]:
+        state = (
+            UserStoreState.objects.filter(pk=STATE_PK)
+            .values("generation", "changesFloor")
+            .first()
+        ) or {"generation": 0, "changesFloor": 0}
+        generation = state["generation"]
+        floor = max(state["changesFloor"], generation - settings.USERS_CHANGE_LOG_SIZE)
+        if not floor <= since <= generation:
+            raise ChangesExpiredError(since, generation)
+        # Writers bump the generation and log their change in one
+        # transaction, so every change up to ``generation`` is visible.
+        rows = UserChange.objects.filter(seq__gt=since, seq__lte=generation)
+        changes = [_to_change(row) for row in rows.order_by("seq")[: limit + 1]]
+        if len(changes) > limit:
+            return changes[:limit], changes[limit - 1]["seq"], True
+        return changes, generation, False
+
+    def get_generation(self) -> int:
+        return self._state("generation", 0)
+
+    def get_user_version(self, uid: str) -> int | None:
+        _, version = self.get_user_snapshot(uid)
+        return version
+
+    def get_last_modified(self) -> float:
+        return self._state("modifiedAt", timezone.now()).timestamp()
+
+    def _clear(self) -> None:
+        """Delete every user; call inside a transaction."""
+        User.objects.all().delete()
+        UserChange.objects.all().delete()
+        generation = self._bump()
+        UserStoreState.objects.filter(pk=STATE_PK).update(
+            seeded=False, changesFloor=generation
+        )
+
+    def clear_users(self) -> None:
+        with transaction.atomic():
+            self._clear()
+
+    def reset_and_seed(self, sample: list[dict]) -> None:
+        with transaction.atomic():
+            self._clear()
+            self._seed(sample)
@@ -0,0 +1,179 @@
+"""Compact storage for the user records of the in-memory users table.
+
+A user dict costs a hash table plus a string per field. ``UserRecord``
+keeps the fields in ``__slots__`` instead, without the id (the key it is
+stored under already holds it), with names interned so users sharing a
+first or last name share the string, and with ISO 8601 timestamps packed
+into integers. ``UserRecords`` is a mapping of ids to records that packs
+user dicts as they are stored and builds them again as they are read, so
+``UserTable`` and everything above it keep working with plain dicts.
+"""
+
+from __future__ import annotations
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+import sys
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_EPOCH_DATE = _EPOCH.date()
+_MICROSECOND = timedelta(microseconds=1)
+_SUFFIXES = ("+00:00", "Z")
+
+# Days since the epoch -> ISO date, filled as timestamps are unpacked. Users
+# are written on a limited number of days, so this stays small.
+_DATES: dict[int, str] = {}
+
+
+def pack_timestamp(value: str) -> int | str:
+    """Pack an ISO 8601 UTC timestamp into an integer.
+
+    The integer holds the microseconds since the epoch and whether the
+    timestamp was spelled with ``+00:00`` or ``Z``, so ``unpack_timestamp``
+    reproduces it exactly. Values it could not reproduce are kept as they
+    are.
+
+    Args:
+        value (str): The timestamp, e.g. as written by ``now_iso``.
+
+    Returns:
+        int | str: The packed timestamp, or ``value`` itself.
+    """
+    try:
+        moment = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return value
+    if moment.utcoffset() != timedelta(0):
+        return value
+    micros = (moment - _EPOCH) // _MICROSECOND
+    for style in range(len(_SUFFIXES)):
+        packed = micros * 2 + style
+        if unpack_timestamp(packed) == value:
+            return packed
+    return value
+
+
+def unpack_timestamp(value: int | str) -> str:
+    """Get the ISO 8601 timestamp packed by ``pack_timestamp``.
+
+    Formats the timestamp as ``datetime.isoformat`` would, which is several
+    times slower.
+    """
+    if isinstance(value, str):
+        return value
+    micros, style = divmod(value, 2)
+    seconds, micro = divmod(micros, 1_000_000)
+    days, second = divmod(seconds, 86_400)
+    date = _DATES.get(days)
+    if date is None:
+        date = _DATES[days] = (_EPOCH_DATE + timedelta(days=days)).isoformat()
+    return "%sT%02d:%02d:%02d%s%s" % (  # pylint: disable=consider-using-f-string
+        date,
+        second // 3600,
+        second // 60 % 60,
+        second % 60,
+        ".%06d" % micro if micro else "",  # pylint: disable=consider-using-f-string
+        _SUFFIXES[style],
+    )
+
+
+def _intern(value):
+    """Intern ``value`` if it is a string."""
+    # sys.intern takes exact strings only.
+    exact = type(value) is str  # pylint: disable=unidiomatic-typecheck
+    return sys.intern(value) if exact else value
+
+
+class UserRecord:  # pylint: disable=too-few-public-methods
+    """The fields of one user, other than its id.
+
+    Records are never changed once stored; an update stores a new one.
+    """
+
+    __slots__ = (
+        "first_name",
+        "last_name",
+        "email",
+        "phone",
+        "created_at",
+        "updated_at",
+    )
+
+    def __init__(self, user: dict):
+        self.first_name = _intern(user["firstName"])
+        self.last_name = _intern(user["lastName"])
+        self.email = user["email"]
+        self.phone = user["phone"]
+        self.created_at = pack_timestamp(user["createdAt"])
+        self.updated_at = pack_timestamp(user["updatedAt"])
+
+    def as_dict(self, uid: str) -> dict:
+        """Build the user dict this record was packed from.
+
+        Args:
+            uid (str): The user's id.
+
+        Returns:
+            dict: The user, with its fields in ``USER_FIELDS`` order.
+        """
+        return {
+            "id": uid,
+            "firstName": self.first_name,
+            "lastName": self.last_name,
+            "email": self.email,
+            "phone": self.phone,
+            "createdAt": unpack_timestamp(self.created_at),
+            "updatedAt": unpack_timestamp(self.updated_at),
+        }
+
+
+class UserRecords:
+    """Mapping of user ids to users, stored as ``UserRecord`` objects.
+
+    Supports the subset of the dict API ``UserTable`` uses for its
+    ``users``. Every read builds a new dict, so callers may not rely on
+    getting the same object twice. Reads need no lock, as with a dict.
+    """
+
+    __slots__ = ("records",)
+
+    def __init__(self, records: dict[str, UserRecord] | None = None):
+        self.records = {} if records is None else records
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __contains__(self, uid) -> bool:
+        return uid in self.records
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.records))
+
+    def __getitem__(self, uid: str) -> dict:
+        return self.records[uid].as_dict(uid)
+
+    def __setitem__(self, uid: str, user: dict) -> None:
+        self.records[uid] = UserRecord(user)
+
+    def get(self, uid: str, default=None):
+        """Get a user by id, or ``default`` if there is none."""
+        record = self.records.get(uid)
+        return default if record is None else record.as_dict(uid)
+
+    def pop(self, uid: str, default=None):
+        """Remove a user and return it, or ``default`` if there is none."""
+        record = self.records.pop(uid, None)
+        return default if record is None else record.as_dict(uid)
+
+    def values(self) -> Iterator[dict]:
+        """Iterate over the users, in insertion order."""
+        # Copying the items is atomic, so a concurrent write cannot break
+        # the iteration.
+        return (record.as_dict(uid) for uid, record in list(self.records.items()))
+
+    def clear(self) -> None:
+        """Remove every user."""
+        self.records.clear()
+
+    def copy(self) -> UserRecords:
+        """Copy the mapping; the immutable records are shared."""
+        return UserRecords(dict(self.records))
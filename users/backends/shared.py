@@ -0,0 +1,200 @@
+"""Cross-process shared backend for the users store.
+
+Every gunicorn worker keeps its own ``UserTable`` replica, so reads are
+plain dict lookups with no locking or unpickling. Writes are appended as
+JSON operations to a log in a memory-mapped file (on ``/dev/shm`` where
+available) under an ``flock`` held across processes, and each process
+replays the operations it has not seen yet before serving a read or
+applying a write. Because replicas replay the same operations in the same
+order, generations, versions and cursors agree across workers.
+
+When the log outgrows ``USERS_SHARED_STORE_COMPACT_BYTES`` (and twice its
+size after the last compaction) the writer rewrites it as a snapshot of the
+current state, swaps it into place and flags the old file as superseded so
+other processes reload from the new one.
+
+The backend relies on ``fcntl`` and is therefore only available on Unix.
+"""
+
+from __future__ import annotations
+from contextlib import contextmanager
+import fcntl
+import json
+import mmap
+import os
+import struct
+
+# pylint: disable=import-error
+from django.conf import settings
+from .memory import MemoryBackend
+
+MAGIC = b"USRSHM01"
+# Header: magic, end of committed data, superseded flag, size after the
+# last compaction.
+_HEADER = struct.Struct("<8sQQQ")
+_LENGTH = struct.Struct("<I")
+_INITIAL_SIZE = 1 << 20
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def _record(op: dict) -> bytes:
+    """Encode an operation as a length-prefixed log record."""
+    payload = _encoder.encode(op).encode()
+    return _LENGTH.pack(len(payload)) + payload
+
+
+class SharedMemoryBackend(MemoryBackend):
+    """Store backend whose data is shared by every process on the host.
+
+    Args:
+        path (str | None): The shared log file. Defaults to the
+            ``USERS_SHARED_STORE_PATH`` setting.
+        compact_bytes (int | None): Log size that triggers compaction.
+            Defaults to the ``USERS_SHARED_STORE_COMPACT_BYTES`` setting.
+    """
+
+    # Writes wait for the file lock other processes may hold.
+    inline_writes = False
+
+    def __init__(self, path: str | None = None, compact_bytes: int | None = None):
+        super().__init__()
+        self.path = str(path or settings.USERS_SHARED_STORE_PATH)
+        self.compact_bytes = compact_bytes or settings.USERS_SHARED_STORE_COMPACT_BYTES
+        # The lock file is never replaced, unlike the log, so the lock stays
+        # valid across compactions.
+        self._lock_fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        self._fd = -1
+        self._map = None
+        self._applied = _HEADER.size
+        with self._process_lock():
+            self._open()
+
+    @contextmanager
+    def _process_lock(self):
+        """Hold the exclusive cross-process lock."""
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _open(self) -> None:
+        """Map the log file, creating it if needed, into a fresh replica.
+
+        Must be called with the process lock held.
+        """
+        if self._fd >= 0:
+            os.close(self._fd)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < _HEADER.size:
+            os.ftruncate(self._fd, _INITIAL_SIZE)
+            os.pwrite(self._fd, _HEADER.pack(MAGIC, _HEADER.size, 0, 0), 0)
+        # Old maps are left for the garbage collector rather than closed, as
+        # a concurrent reader may still be using them.
+        self._map = mmap.mmap(self._fd, 0)
+        if self._map[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a users store log")
+        self.table = self._new_table()
+        self._applied = _HEADER.size
+
+    def _header(self) -> tuple[int, int, int]:
+        """Read the end offset, superseded flag and compacted size."""
+        _, end, superseded, base = _HEADER.unpack_from(self._map, 0)
+        return end, superseded, base
+
+    def _write_header(self, end: int, superseded: int, base: int) -> None:
+        """Publish new header values."""
+        _HEADER.pack_into(self._map, 0, MAGIC, end, superseded, base)
+
+    def _sync(self) -> None:
+        """Replay operations written by other processes, if there are any."""
+        end, superseded, _ = self._header()
+        if end != self._applied or superseded:
+            with self.lock:
+                self._catch_up()
+
+    def _catch_up(self) -> None:
+        """Replay the log up to its current end; call with ``lock`` held.
+
+        A superseded log has been replaced by a compacted one, so the
+        replica is rebuilt from the new file.
+        """
+        while True:
+            end, superseded, _ = self._header()
+            if superseded:
+                self._open()
+                continue
+            if end > len(self._map):
+                self._map = mmap.mmap(self._fd, 0)
+            data, offset = self._map, self._applied
+            while offset < end:
+                (length,) = _LENGTH.unpack_from(data, offset)
+                offset += _LENGTH.size
+                self.table.apply(json.loads(data[offset : offset + length]))
+                offset += length
+            self.table.flush()
+            self._applied = end
+            return
+
+    @contextmanager
+    def _writing(self):
+        """Hold the local and cross-process locks with the replica current."""
+        with self.lock, self._process_lock():
+            self._catch_up()
+            try:
+                yield
+            finally:
+                self.table.flush()
+
+    def _commit(self, op: dict):
+        """Apply an operation locally, then append it to the shared log."""
+        result = self.table.apply(op)
+        try:
+            self._append(_record(op))
+        except BaseException:
+            # The replica is now ahead of the log; rebuild it from the log.
+            self._open()
+            raise
+        return result
+
+    def _append(self, record: bytes) -> None:
+        """Append a record and publish the new end offset."""
+        end, _, base = self._header()
+        needed = end + len(record)
+        if needed > len(self._map):
+            os.ftruncate(self._fd, max(needed, 2 * len(self._map)))
+            self._map = mmap.mmap(self._fd, 0)
+        self._map[end:needed] = record
+        self._write_header(needed, 0, base)
+        self._applied = needed
+        if needed > max(self.compact_bytes, 2 * base):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Replace the log with a snapshot of the current state."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as tmp:
+            tmp.write(bytes(_HEADER.size))
+            for op in self.table.export():
+                tmp.write(_record(op))
+            end = tmp.tell()
+            tmp.truncate(max(end, _INITIAL_SIZE))
+            tmp.seek(0)
+            tmp.write(_HEADER.pack(MAGIC, end, 0, end))
+        os.replace(tmp_path, self.path)
+        old_end, _, old_base = self._header()
+        self._write_header(old_end, 1, old_base)
+        table = self.table
+        self._open()
+        # The snapshot describes exactly this replica, so keep it rather
+        # than replaying the new file.
+        self.table = table
+        self._applied = end
+
+    def close(self) -> None:
+        """Release the file descriptors held by this backend."""
+        for fd in (self._fd, self._lock_fd):
+            if fd >= 0:
+                os.close(fd)
+        self._fd = self._lock_fd = -1
@@ -0,0 +1,132 @@
+"""Response caches for the users API.
+
+Holds already-encoded JSON bodies for the user list and user detail
+endpoints. Keys include the store generation (or a user's version), so a
+write never needs to invalidate anything: stale entries simply stop being
+requested and age out of the LRU.
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable
+
+# pylint: disable=import-error
+from django.conf import settings
+
+
+class LRUCache:  # pylint: disable=too-many-instance-attributes
+    """A thread-safe LRU cache bounded by entry count and total size.
+
+    Attributes:
+        name (str): Label used when reporting statistics.
+        hits (int): Number of lookups that found an entry.
+        misses (int): Number of lookups that did not.
+        evictions (int): Number of entries dropped to stay within bounds.
+    """
+
+    def __init__(self, name: str, max_entries: int, max_bytes: int):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """bool: Whether the cache is allowed to hold anything."""
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key: Hashable) -> Any | None:
+        """Look up an entry and mark it as most recently used.
+
+        Args:
+            key (Hashable): The cache key.
+
+        Returns:
+            Any | None: The cached value, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: int) -> None:
+        """Store an entry, evicting least recently used ones as needed.
+
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The value to cache.
+            size (int): The value's size in bytes, counted against
+                ``max_bytes``. Values larger than that are not cached.
+        """
+        if not self.enabled or size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Get the cache statistics.
+
+        Returns:
+            dict: Hit, miss and eviction counters plus current entry count
+            and size in bytes.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+list_cache = LRUCache(
+    "users-list",
+    settings.USERS_RESPONSE_CACHE_ENTRIES,
+    settings.USERS_RESPONSE_CACHE_MAX_BYTES,
+)
+detail_cache = LRUCache(
+    "user-detail",
+    settings.USERS_RESPONSE_CACHE_ENTRIES,
+    settings.USERS_RESPONSE_CACHE_MAX_BYTES,
+)
+
+
+def cache_stats() -> dict[str, dict]:
+    """Get the statistics of every response cache.
+
+    Returns:
+        dict[str, dict]: ``LRUCache.stats()`` keyed by cache name.
+    """
+    return {cache.name: cache.stats() for cache in (list_cache, detail_cache)}
+
+
+def clear_caches() -> None:
+    """Empty every response cache."""
+    list_cache.clear()
+    detail_cache.clear()
@@ -0,0 +1,124 @@
+"""Conditional request support for the users API.
+
+Builds strong ETags from store generations and user versions, and evaluates
+``If-None-Match``/``If-Modified-Since`` for reads and ``If-Match`` for
+updates.
+"""
+
+from __future__ import annotations
+from datetime import datetime
+
+# pylint: disable=import-error
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework.renderers import JSONRenderer
+from .pagination import is_ascii_digits
+
+LIST_ETAG_PREFIX = "g"
+USER_ETAG_PREFIX = "v"
+
+
+def make_etag(
+    prefix: str, number: int, request=None, variant: str | None = None
+) -> str:
+    """Build a strong ETag for a store generation or user version.
+
+    Representations other than plain JSON (such as the browsable API) get
+    the renderer format appended, and partial representations (such as a
+    sparse fieldset) their ``variant``, so each representation has its own
+    tag.
+
+    Args:
+        prefix (str): ``LIST_ETAG_PREFIX`` or ``USER_ETAG_PREFIX``.
+        number (int): The generation or version the response reflects.
+        request: The DRF request, used to find the negotiated renderer.
+        variant (str | None): Identifier of a partial representation.
+
+    Returns:
+        str: The quoted ETag, e.g. ``"v42"`` or ``"v42.f9"``.
+    """
+    parts = [f"{prefix}{number}"]
+    if variant is not None:
+        parts.append(variant)
+    renderer = getattr(request, "accepted_renderer", None)
+    if renderer is not None and not isinstance(renderer, JSONRenderer):
+        parts.append(renderer.format)
+    return quote_etag(".".join(parts))
+
+
+def user_timestamp(user: dict) -> float:
+    """Get a user's ``updatedAt`` as a POSIX timestamp.
+
+    Args:
+        user (dict): The user record.
+
+    Returns:
+        float: The timestamp of the user's last update.
+    """
+    return datetime.fromisoformat(user["updatedAt"].replace("Z", "+00:00")).timestamp()
+
+
+def not_modified(request, etag: str, last_modified: float):
+    """Evaluate the read preconditions of a GET request.
+
+    Args:
+        request: The DRF request.
+        etag (str): The current ETag of the resource.
+        last_modified (float): POSIX timestamp of the resource's last change.
+
+    Returns:
+        HttpResponse | None: A 304 (or 412) response carrying the validators
+        if a precondition applies, otherwise None.
+    """
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified)
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag: str, last_modified: float | None = None):
+    """Attach ``ETag`` and ``Last-Modified`` headers to a response.
+
+    Args:
+        response: The response to annotate.
+        etag (str): The quoted ETag.
+        last_modified (float | None): POSIX timestamp of the last change.
+
+    Returns:
+        The same response, for chaining.
+    """
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def if_match_versions(request) -> set[int] | None:
+    """Parse the user versions accepted by an ``If-Match`` header.
+
+    Args:
+        request: The DRF request.
+
+    Returns:
+        set[int] | None: The versions named by the header, or None when the
+        header is absent or ``*``. Tags that are not user ETags are ignored,
+        so a header naming none of them yields an empty set that no version
+        satisfies.
+    """
+    header = request.META.get("HTTP_IF_MATCH")
+    if not header:
+        return None
+    etags = parse_etags(header)
+    if etags == ["*"]:
+        return None
+    versions = set()
+    for etag in etags:
+        if etag.startswith("W/"):
+            continue  # Weak tags never match under If-Match.
+        # Any representation of a version identifies that version.
+        value = etag.strip('"').split(".", 1)[0]
+        if value[:1] == USER_ETAG_PREFIX and is_ascii_digits(value[1:]):
+            versions.add(int(value[1:]))
+    return versions
@@ -0,0 +1,326 @@
+"""Push delivery of user changes to connected clients.
+
+A ``ChangeHub`` per worker polls the store generation and, when it moves,
+reads the new changes from the change log once and fans them out to every
+subscriber. Each subscriber buffers at most ``USERS_EVENTS_QUEUE_SIZE``
+changes; one that falls further behind drops its buffer and catches up from
+the change log by itself, so a slow client never holds more than that in
+memory. An idle subscriber is a small object and an awaiting coroutine, so a
+worker serving ``GET /users/events`` through ASGI can keep thousands of them
+open. Responses are either Server-Sent Events or, as a fallback for clients
+without SSE, a long poll answered like ``GET /users/changes``.
+"""
+
+from __future__ import annotations
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+
+# pylint: disable=import-error
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from .renderers import encode_json
+from .store import ChangesExpiredError, aget_changes, aget_generation
+
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+
+
+def _settle(waiter: asyncio.Future | None, woken: bool) -> None:
+    """Resolve a subscriber's waiter unless it is already resolved."""
+    if waiter is not None and not waiter.done():
+        waiter.set_result(woken)
+
+
+class Subscriber:
+    """One client's position in the change stream and its pending changes.
+
+    Attributes:
+        position (int): The generation the queued changes lead up to; once
+            the queue is drained, the generation the client is at.
+        lagged (bool): Whether the subscriber must read the change log
+            before it can take changes from the hub again, because it is
+            new, overflowed its queue or missed a batch.
+    """
+
+    __slots__ = ("queue", "position", "lagged", "size", "_waiter")
+
+    def __init__(self, position: int, size: int, lagged: bool = True):
+        self.queue: deque[dict] = deque()
+        self.position = position
+        self.lagged = lagged
+        self.size = size
+        self._waiter: asyncio.Future | None = None
+
+    def _wake(self) -> None:
+        """Resume ``next_changes`` if it is waiting."""
+        _settle(self._waiter, True)
+
+    def push(self, start: int, changes: list[dict], end: int) -> None:
+        """Queue the changes the hub read between two generations.
+
+        Args:
+            start (int): The generation the hub read changes after.
+            changes (list[dict]): The changes, oldest first.
+            end (int): The generation the changes lead up to.
+        """
+        if self.lagged:
+            return
+        if start > self.position:
+            self.lag()
+            return
+        fresh = [change for change in changes if change["seq"] > self.position]
+        if len(self.queue) + len(fresh) > self.size:
+            self.lag()
+            return
+        self.queue.extend(fresh)
+        self.position = max(self.position, end)
+        self._wake()
+
+    def lag(self) -> None:
+        """Drop the queued changes and catch up from the change log instead."""
+        self.queue.clear()
+        self.lagged = True
+        self._wake()
+
+    async def _catch_up(self) -> list[dict]:
+        """Read the next page of changes from the change log."""
+        changes, position, more = await aget_changes(self.position, self.size)
+        self.position = position
+        self.lagged = more
+        return changes
+
+    async def next_changes(self, timeout: float) -> list[dict] | None:
+        """Wait for the next changes after ``position``.
+
+        Args:
+            timeout (float): Seconds to wait while nothing is pending.
+
+        Returns:
+            list[dict] | None: The changes, oldest first (possibly empty
+            while catching up), or None if the timeout passed first.
+
+        Raises:
+            ChangesExpiredError: If the changes the subscriber needs are no
+                longer in the change log.
+        """
+        if not self.lagged and not self.queue:
+            # A bare future and timer rather than wait_for, which would add
+            # a task per waiting subscriber.
+            loop = asyncio.get_running_loop()
+            self._waiter = waiter = loop.create_future()
+            timer = loop.call_later(timeout, _settle, waiter, False)
+            try:
+                if not await waiter:
+                    return None
+            finally:
+                timer.cancel()
+                self._waiter = None
+        if self.lagged:
+            return await self._catch_up()
+        changes = list(self.queue)
+        self.queue.clear()
+        return changes
+
+
+class ChangeHub:
+    """Fans the store's changes out to the subscribers of one worker.
+
+    A single pump task per event loop runs while anyone is subscribed, so
+    the cost of watching the store does not grow with the number of
+    connections.
+
+    Attributes:
+        position (int | None): The generation the pump has pushed changes
+            up to, or None while it is not running.
+        encoded (dict[int, tuple[dict, bytes]]): The changes of the last
+            batch and their SSE encoding by ``seq``, so each change is
+            encoded once rather than once per subscriber.
+    """
+
+    def __init__(self):
+        self.subscribers: set[Subscriber] = set()
+        self.position: int | None = None
+        self.encoded: dict[int, tuple[dict, bytes]] = {}
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self.subscribers)
+
+    async def current_position(self) -> int:
+        """Get the generation a client starting from now is up to date with.
+
+        Returns:
+            int: The pump's position, so the new subscriber needs no catch
+            up, or the store generation if the pump is not running.
+        """
+        if self.position is None:
+            return await aget_generation()
+        return self.position
+
+    def subscribe(self, position: int) -> Subscriber:
+        """Add a subscriber, starting the pump if it is not running.
+
+        Args:
+            position (int): The generation the client is up to date with.
+
+        Returns:
+            Subscriber: The new subscriber; pass it to ``unsubscribe`` once
+            the client is gone. Unless it starts at the pump's position, it
+            first catches up from the change log.
+        """
+        subscriber = Subscriber(
+            position,
+            settings.USERS_EVENTS_QUEUE_SIZE,
+            lagged=position != self.position,
+        )
+        self.subscribers.add(subscriber)
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._pump())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a subscriber; the pump stops after the last one leaves."""
+        self.subscribers.discard(subscriber)
+
+    async def _pump(self) -> None:
+        """Read new changes from the store and push them to the subscribers."""
+        interval = settings.USERS_EVENTS_POLL_INTERVAL_MS / 1000
+        try:
+            self.position = await aget_generation()
+            while self.subscribers:
+                await asyncio.sleep(interval)
+                while self.subscribers and await aget_generation() != self.position:
+                    try:
+                        changes, end, more = await aget_changes(
+                            self.position, settings.USERS_EVENTS_QUEUE_SIZE
+                        )
+                    except ChangesExpiredError as exc:
+                        for subscriber in list(self.subscribers):
+                            subscriber.lag()
+                        self.position = exc.generation
+                        continue
+                    self.encoded = {
+                        change["seq"]: (change, _encode_event(change))
+                        for change in changes
+                    }
+                    for subscriber in list(self.subscribers):
+                        subscriber.push(self.position, changes, end)
+                    self.position = end
+                    if not more:
+                        break
+        finally:
+            self.position = None
+            self.encoded = {}
+
+
+hub = ChangeHub()
+
+
+def _encode_event(change: dict) -> bytes:
+    """Encode a change as an SSE event named after the change type."""
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (
+        change["seq"],
+        change["type"].encode(),
+        encode_json(change),
+    )
+
+
+def _encode_events(changes: list[dict]) -> bytes:
+    """Encode changes as SSE events, reusing the hub's encoding if it has one."""
+    parts = []
+    for change in changes:
+        cached = hub.encoded.get(change["seq"])
+        parts.append(
+            cached[1] if cached and cached[0] is change else _encode_event(change)
+        )
+    return b"".join(parts)
+
+
+def _encode_resync(generation: int) -> bytes:
+    """Encode the SSE event telling a client to re-download every user."""
+    return b"event: resync\ndata: %s\n\n" % encode_json({"next": generation})
+
+
+async def _event_body(subscriber: Subscriber) -> AsyncIterator[bytes]:
+    """Yield SSE events for a subscriber until the client goes away."""
+    heartbeat = settings.USERS_EVENTS_HEARTBEAT_S
+    try:
+        yield b": connected\n\n"
+        while True:
+            try:
+                changes = await subscriber.next_changes(heartbeat)
+            except ChangesExpiredError as exc:
+                yield _encode_resync(exc.generation)
+                return
+            if changes is None:
+                yield b": keep-alive\n\n"
+            elif changes:
+                yield _encode_events(changes)
+    finally:
+        hub.unsubscribe(subscriber)
+
+
+def stream_changes(since: int) -> StreamingHttpResponse:
+    """Stream the changes after ``since`` as Server-Sent Events.
+
+    Each change is an event named ``created``, ``updated`` or ``deleted``
+    whose ``id`` is its ``seq`` (so a reconnecting client resumes through
+    ``Last-Event-ID``) and whose data is the change as returned by
+    ``get_changes``. If the changes after the client's position are no
+    longer retained, a ``resync`` event carrying ``{"next": n}`` ends the
+    stream. Comments are sent every ``USERS_EVENTS_HEARTBEAT_S`` seconds to
+    keep idle connections open.
+
+    Args:
+        since (int): The generation the client is up to date with.
+
+    Returns:
+        StreamingHttpResponse: The never-ending event stream.
+    """
+    response = StreamingHttpResponse(
+        _event_body(hub.subscribe(since)), content_type=EVENT_STREAM_MEDIA_TYPE
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def poll_changes(since: int, timeout: float) -> HttpResponse:
+    """Answer a long poll for the changes after ``since``.
+
+    Args:
+        since (int): The generation the client is up to date with.
+        timeout (float): Seconds to wait if there are no changes yet.
+
+    Returns:
+        HttpResponse: ``{"changes": [...], "next": n, "more": bool}`` as for
+        ``GET /users/changes`` as soon as there are changes, or with no
+        changes once the timeout passes; 410 Gone with ``"resync": true``
+        if the changes after ``since`` are no longer retained.
+    """
+    subscriber = hub.subscribe(since)
+    deadline = asyncio.get_running_loop().time() + timeout
+    try:
+        while True:
+            remaining = deadline - asyncio.get_running_loop().time()
+            changes = await subscriber.next_changes(max(remaining, 0))
+            if changes or changes is None or remaining <= 0:
+                break
+    except ChangesExpiredError as exc:
+        body = {
+            "detail": f"Changes since {since} are no longer available.",
+            "resync": True,
+            "next": exc.generation,
+        }
+        return HttpResponse(
+            encode_json(body), status=410, content_type="application/json"
+        )
+    finally:
+        hub.unsubscribe(subscriber)
+    body = {
+        "changes": changes or [],
+        "next": subscriber.position,
+        "more": subscriber.lagged,
+    }
+    return HttpResponse(encode_json(body), content_type="application/json")
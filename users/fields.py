@@ -0,0 +1,91 @@
+"""Sparse fieldsets for the users API.
+
+A ``fields`` query parameter such as ``?fields=id,email`` projects each user
+down to the listed keys before rendering. Projections are built once per
+field set and cached, so projecting a page is one ``itemgetter`` call and
+one ``dict(zip(...))`` per user.
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from operator import itemgetter
+
+# pylint: disable=import-error
+from rest_framework import serializers
+from .store import USER_FIELDS
+
+FIELDS_PARAM = "fields"
+
+
+class Projection:
+    """Projects user records onto a fixed subset of ``USER_FIELDS``.
+
+    Attributes:
+        fields (tuple[str, ...]): The kept fields, in schema order.
+        tag (str): Short identifier of the field set, used in cache keys
+            and ETags.
+    """
+
+    def __init__(self, fields: tuple[str, ...]):
+        self.fields = fields
+        self.tag = "f" + format(
+            sum(1 << USER_FIELDS.index(field) for field in fields), "x"
+        )
+        if len(fields) == 1:
+            (field,) = fields
+            self._values = lambda user: (user[field],)
+        else:
+            self._values = itemgetter(*fields)
+
+    def __call__(self, user: dict) -> dict:
+        """Project one user."""
+        return dict(zip(self.fields, self._values(user)))
+
+    def many(self, users: list[dict]) -> list[dict]:
+        """Project a list of users."""
+        fields, values = self.fields, self._values
+        return [dict(zip(fields, values(user))) for user in users]
+
+
+@lru_cache(maxsize=None)
+def _projection(fields: frozenset[str]) -> Projection:
+    """Get the shared projection for a set of fields."""
+    return Projection(tuple(field for field in USER_FIELDS if field in fields))
+
+
+def get_projection(request) -> Projection | None:
+    """Read the fieldset requested by the client.
+
+    Args:
+        request: DRF request with an optional ``fields`` query parameter
+            listing field names separated by commas.
+
+    Returns:
+        Projection | None: The projection to apply, or None when every
+        field is wanted.
+
+    Raises:
+        serializers.ValidationError: If the parameter is empty or names a
+            field users do not have.
+    """
+    raw = request.query_params.get(FIELDS_PARAM)
+    if raw is None:
+        return None
+    fields = {field.strip() for field in raw.split(",")} - {""}
+    if not fields:
+        raise serializers.ValidationError(
+            {FIELDS_PARAM: ["At least one field is required."]}
+        )
+    unknown = fields.difference(USER_FIELDS)
+    if unknown:
+        raise serializers.ValidationError(
+            {
+                FIELDS_PARAM: [
+                    f"Unknown field(s): {', '.join(sorted(unknown))}. "
+                    f"Choose from: {', '.join(USER_FIELDS)}."
+                ]
+            }
+        )
+    if len(fields) == len(USER_FIELDS):
+        return None
+    return _projection(frozenset(fields))
@@ -0,0 +1,120 @@
+"""Search, prefix filters and ordering for the users list.
+
+``?q=emm`` matches users whose first name, last name, email or phone starts
+with ``emm``; several whitespace-separated terms must all match. The
+``firstName``, ``lastName``, ``phone`` and ``emailPrefix`` parameters each
+restrict one field to a prefix. Every filter ignores case, and all of them
+combine with pagination and sparse fieldsets.
+
+``?sort=-updatedAt`` orders the list by one of ``SORT_FIELDS`` (descending
+with a leading ``-``), and ``from`` starts the walk at a value of that
+field, e.g. ``?sort=updatedAt&from=2024-01-01T00:00:00Z`` lists the users
+updated since.
+"""
+
+from __future__ import annotations
+from typing import NamedTuple
+
+# pylint: disable=import-error
+from rest_framework import serializers
+from .store import SORT_FIELDS, normalize_term, sort_key
+
+SEARCH_PARAM = "q"
+SORT_PARAM = "sort"
+START_PARAM = "from"
+
+# Query parameter to the field it filters by prefix. ``email`` itself keeps
+# its exact-match meaning, so the email prefix has its own parameter.
+PREFIX_PARAMS = {
+    "firstName": "firstName",
+    "lastName": "lastName",
+    "emailPrefix": "email",
+    "phone": "phone",
+}
+
+
+class Search(NamedTuple):
+    """A normalized search, hashable so it can be part of a cache key.
+
+    Attributes:
+        prefixes (tuple[tuple[str, str], ...]): ``(field, prefix)`` pairs,
+            sorted by field.
+        terms (tuple[str, ...]): Prefixes each matching any searchable field.
+    """
+
+    prefixes: tuple[tuple[str, str], ...]
+    terms: tuple[str, ...]
+
+
+def get_search(request) -> Search | None:
+    """Read the search and prefix filters requested by the client.
+
+    Args:
+        request: DRF request with optional ``q`` and prefix parameters.
+            Blank values are ignored.
+
+    Returns:
+        Search | None: The filters to apply, or None if there are none.
+    """
+    params = request.query_params
+    prefixes = {}
+    for param, field in PREFIX_PARAMS.items():
+        value = normalize_term(params.get(param, ""))
+        if value:
+            prefixes[field] = value
+    terms = tuple(dict.fromkeys(normalize_term(params.get(SEARCH_PARAM, "")).split()))
+    if not prefixes and not terms:
+        return None
+    return Search(tuple(sorted(prefixes.items())), terms)
+
+
+class Sort(NamedTuple):
+    """A requested ordering, hashable so it can be part of a cache key.
+
+    Attributes:
+        field (str): One of ``SORT_FIELDS``.
+        descending (bool): Whether the largest values come first.
+        start (float | str | None): Sort key of the ``from`` value, if any.
+    """
+
+    field: str
+    descending: bool
+    start: float | str | None
+
+
+def get_sort(request) -> Sort | None:
+    """Read the ordering requested by the client.
+
+    Args:
+        request: DRF request with optional ``sort`` and ``from`` query
+            parameters.
+
+    Returns:
+        Sort | None: The ordering, or None for insertion order.
+
+    Raises:
+        serializers.ValidationError: If the field cannot be sorted by, the
+            ``from`` value is not valid for it, or ``from`` is given
+            without ``sort``.
+    """
+    raw = request.query_params.get(SORT_PARAM)
+    start = request.query_params.get(START_PARAM)
+    if raw is None:
+        if start is not None:
+            raise serializers.ValidationError(
+                {START_PARAM: [f"Requires the {SORT_PARAM} parameter."]}
+            )
+        return None
+    field = raw.strip().removeprefix("-")
+    if field not in SORT_FIELDS:
+        raise serializers.ValidationError(
+            {SORT_PARAM: [f"Choose from: {', '.join(SORT_FIELDS)}."]}
+        )
+    if start is not None:
+        try:
+            start = sort_key(field, start)
+        except ValueError as exc:
+            raise serializers.ValidationError(
+                {START_PARAM: ["Enter a valid ISO 8601 timestamp."]}
+            ) from exc
+    return Sort(field, raw.strip().startswith("-"), start)
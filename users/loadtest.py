@@ -0,0 +1,368 @@
+"""HTTP load generator for a running users API.
+
+Drives a server (``runserver``, gunicorn, uvicorn, ...) with a weighted mix
+of operations on ``/users`` and ``/user/<uid>`` from many concurrent
+asyncio clients, each on a keep-alive HTTP/1.1 connection of its own, and
+collects the latency of every request. Used by ``manage.py loadtest``.
+
+Before the run the server is seeded with synthetic users from
+``users.sample_data`` through ``POST /users/bulk``, so the operations
+target a realistically sized store rather than the ten sample users.
+"""
+
+from __future__ import annotations
+import asyncio
+from dataclasses import dataclass, field
+import itertools
+import json
+import random
+import time
+
+from .sample_data import generate_users
+
+# What each operation sends, and the statuses that count as success.
+OPERATIONS = {
+    "list": ("GET", (200,)),
+    "get": ("GET", (200,)),
+    "create": ("POST", (201,)),
+    "patch": ("PATCH", (200,)),
+    "delete": ("DELETE", (204,)),
+}
+
+DEFAULT_MIX = "list=20,get=50,create=10,patch=15,delete=5"
+
+# Fields a client sends to create a user.
+CREATE_FIELDS = ("firstName", "lastName", "email", "phone")
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """Parse an operation mix such as ``"get=80,patch=20"``.
+
+    Args:
+        text (str): Comma-separated ``operation=weight`` pairs.
+
+    Returns:
+        dict[str, float]: Weight of each operation of ``OPERATIONS``; the
+        weights are relative and need not add up to 100.
+
+    Raises:
+        ValueError: If an operation is unknown or a weight is not a
+            non-negative number, or if every weight is zero.
+    """
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"unknown operation {name!r}; use {', '.join(OPERATIONS)}")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise ValueError(f"weight of {name!r} is not a number") from None
+        if mix[name] < 0:
+            raise ValueError(f"weight of {name!r} is negative")
+    if not any(mix.values()):
+        raise ValueError("at least one operation needs a positive weight")
+    return mix
+
+
+def http_request(method: str, path: str, body=None, host: str = "localhost") -> bytes:
+    """Encode an HTTP/1.1 request.
+
+    Args:
+        method (str): The request method.
+        path (str): The path and query string.
+        body: Data to send as JSON, or None for no body.
+        host (str): The ``Host`` header.
+
+    Returns:
+        bytes: The request, ready to write to the connection.
+    """
+    payload = json.dumps(body).encode() if body is not None else b""
+    head = f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+    if body is not None:
+        head += f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+    return head.encode() + b"\r\n" + payload
+
+
+async def _exchange(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, request: bytes
+) -> tuple[int, bytes, bool]:
+    """Send one request and read the response.
+
+    Returns:
+        tuple[int, bytes, bool]: The status code, the body and whether the
+        server closes the connection after it.
+    """
+    writer.write(request)
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, *lines = head.decode("latin-1").split("\r\n")
+    headers = dict(line.lower().split(": ", 1) for line in lines if line)
+    body = await reader.readexactly(int(headers.get("content-length", "0")))
+    return int(status_line.split()[1]), body, headers.get("connection") == "close"
+
+
+class Connection:
+    """A keep-alive connection that reconnects when the server closes it.
+
+    Args:
+        host (str): The server's address.
+        port (int): The server's port.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.streams: tuple | None = None
+
+    async def request(self, request: bytes) -> tuple[int, bytes]:
+        """Send a request, connecting first if needed.
+
+        Args:
+            request (bytes): The request, as built by ``http_request``.
+
+        Returns:
+            tuple[int, bytes]: The status code and the body.
+        """
+        if self.streams is None:
+            self.streams = await asyncio.open_connection(self.host, self.port)
+        try:
+            status, body, closed = await _exchange(*self.streams, request)
+        except (OSError, asyncio.IncompleteReadError):
+            self.close()
+            raise
+        if closed:
+            self.close()
+        return status, body
+
+    def close(self) -> None:
+        """Close the connection if it is open."""
+        if self.streams is not None:
+            self.streams[1].close()
+            self.streams = None
+
+
+@dataclass
+class OperationStats:
+    """Latencies and failures recorded for one operation.
+
+    Attributes:
+        latencies (list[float]): Seconds taken by each completed request.
+        errors (int): Requests answered with an unexpected status, or that
+            failed to get an answer.
+    """
+
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    def summary(self, elapsed: float) -> dict:
+        """Summarize the operation over a run.
+
+        Args:
+            elapsed (float): Duration of the run in seconds.
+
+        Returns:
+            dict: ``requests``, ``errors``, ``rps`` and ``p50_ms``,
+            ``p95_ms`` and ``p99_ms`` latency.
+        """
+        samples = sorted(self.latencies)
+
+        def percentile(fraction: float) -> float:
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1000
+
+        return {
+            "requests": len(samples),
+            "errors": self.errors,
+            "rps": len(samples) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+        }
+
+
+class LoadTest:  # pylint: disable=too-many-instance-attributes
+    """A load test against one server.
+
+    Args:
+        host (str): The server's address.
+        port (int): The server's port.
+        mix (dict[str, float]): Operation weights, as from ``parse_mix``.
+        seed (int): Seed for the users created and the operations chosen.
+        page_size (int): ``limit`` of the ``list`` operation.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        host: str,
+        port: int,
+        mix: dict[str, float],
+        *,
+        seed: int = 0,
+        page_size: int = 20,
+    ):
+        self.host = host
+        self.port = port
+        self.operations = [name for name, weight in mix.items() if weight > 0]
+        self.weights = [mix[name] for name in self.operations]
+        self.seed = seed
+        self.page_size = page_size
+        self.ids: list[str] = []
+        self.stats = {name: OperationStats() for name in self.operations}
+        # Emails embed the user's index; starting past every earlier run's
+        # keeps them unique on a server that is not reset between runs.
+        self._serial = time.time_ns() // 1000
+
+    def _request(self, method: str, path: str, body=None) -> bytes:
+        """Encode a request for the server."""
+        return http_request(method, path, body, host=f"{self.host}:{self.port}")
+
+    def _new_users(self, count: int) -> list[dict]:
+        """Generate create payloads for ``count`` new users."""
+        start = self._serial
+        self._serial += count
+        return [
+            {key: user[key] for key in CREATE_FIELDS}
+            for user in generate_users(count, self.seed, start)
+        ]
+
+    async def _seed_batch(self, connection: Connection, count: int) -> None:
+        """Create ``count`` users in one bulk request."""
+        request = self._request("POST", "/users/bulk", self._new_users(count))
+        status, body = await connection.request(request)
+        if status not in (201, 207):
+            raise RuntimeError(f"POST /users/bulk answered {status}: {body[:200]!r}")
+        results = json.loads(body)["results"]
+        self.ids.extend(item["user"]["id"] for item in results if "user" in item)
+
+    async def seed_users(self, count: int, batch_size: int, concurrency: int) -> int:
+        """Create ``count`` synthetic users on the server.
+
+        With ``count`` 0, the users on the server's first page are the
+        targets instead.
+
+        Args:
+            count (int): Number of users to create.
+            batch_size (int): Users per ``POST /users/bulk`` request, at
+                most the server's ``USERS_BULK_MAX_ITEMS``.
+            concurrency (int): Bulk requests in flight at once.
+
+        Returns:
+            int: The number of users the operations can target.
+        """
+        if count == 0:
+            connection = Connection(self.host, self.port)
+            try:
+                path = "/users?limit=1000&fields=id"
+                status, body = await connection.request(self._request("GET", path))
+            finally:
+                connection.close()
+            if status != 200:
+                raise RuntimeError(f"GET /users answered {status}")
+            self.ids = [user["id"] for user in json.loads(body)]
+            return len(self.ids)
+        batches = [batch_size] * (count // batch_size)
+        if count % batch_size:
+            batches.append(count % batch_size)
+        queue = iter(batches)
+
+        async def worker() -> None:
+            connection = Connection(self.host, self.port)
+            try:
+                for size in queue:
+                    await self._seed_batch(connection, size)
+            finally:
+                connection.close()
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(batches)))))
+        return len(self.ids)
+
+    def _next_request(self, rng: random.Random) -> tuple[str, bytes, str | None]:
+        """Choose the next operation and build its request.
+
+        Returns:
+            tuple[str, bytes, str | None]: The operation, the request and,
+            for ``create``, None, else the id of the user it targets.
+        """
+        operation = rng.choices(self.operations, self.weights)[0]
+        if operation in ("delete", "get", "patch") and not self.ids:
+            operation = "create"
+        if operation == "list":
+            return (
+                operation,
+                self._request("GET", f"/users?limit={self.page_size}"),
+                None,
+            )
+        if operation == "create":
+            return (
+                operation,
+                self._request("POST", "/user", self._new_users(1)[0]),
+                None,
+            )
+        index = rng.randrange(len(self.ids))
+        uid = self.ids[index]
+        if operation == "delete":
+            # Swap-remove, so no other client picks the user meanwhile.
+            self.ids[index] = self.ids[-1]
+            self.ids.pop()
+            return operation, self._request("DELETE", f"/user/{uid}"), uid
+        if operation == "patch":
+            change = {
+                "phone": f"+1-555-{rng.randrange(1000):03d}-{rng.randrange(10000):04d}"
+            }
+            return operation, self._request("PATCH", f"/user/{uid}", change), uid
+        return operation, self._request("GET", f"/user/{uid}"), uid
+
+    async def _client(self, number: int, deadline: float, budget) -> None:
+        """Send requests on one connection until the run ends."""
+        rng = random.Random(self.seed * 1_000_003 + number)
+        connection = Connection(self.host, self.port)
+        clock = time.perf_counter
+        try:
+            while clock() < deadline and next(budget, None) is not None:
+                operation, request, _ = self._next_request(rng)
+                stats = self.stats[operation]
+                start = clock()
+                try:
+                    status, body = await connection.request(request)
+                except (OSError, asyncio.IncompleteReadError):
+                    stats.errors += 1
+                    continue
+                stats.latencies.append(clock() - start)
+                if status not in OPERATIONS[operation][1]:
+                    stats.errors += 1
+                elif operation == "create":
+                    self.ids.append(json.loads(body)["id"])
+        finally:
+            connection.close()
+
+    async def run(
+        self, concurrency: int, duration: float, requests: int | None = None
+    ) -> dict[str, dict]:
+        """Run the load test.
+
+        Args:
+            concurrency (int): Number of clients sending requests at once.
+            duration (float): Seconds to run for.
+            requests (int | None): Stop after this many requests in all,
+                if that comes first.
+
+        Returns:
+            dict[str, dict]: ``OperationStats.summary`` of each operation,
+            plus ``total`` for all of them together.
+        """
+        budget = itertools.count() if requests is None else iter(range(requests))
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(
+            *(self._client(number, deadline, budget) for number in range(concurrency))
+        )
+        elapsed = time.perf_counter() - started
+        total = OperationStats()
+        for stats in self.stats.values():
+            total.latencies += stats.latencies
+            total.errors += stats.errors
+        summaries = {name: stats.summary(elapsed) for name, stats in self.stats.items()}
+        summaries["total"] = total.summary(elapsed)
+        return summaries
@@ -0,0 +1,151 @@
+"""``manage.py loadtest``: drive a running users API with concurrent clients.
+
+Usage::
+
+    python manage.py runserver --noreload &
+    python manage.py loadtest --concurrency 32 --duration 10 --seed-users 10000
+
+Seeds the server with ``--seed-users`` synthetic users, then keeps
+``--concurrency`` asyncio clients sending a ``--mix`` of list, get, create,
+patch and delete requests for ``--duration`` seconds, and prints throughput
+and p50/p95/p99 latency per operation. Works against any server speaking
+HTTP/1.1: ``runserver``, gunicorn or uvicorn.
+"""
+
+from __future__ import annotations
+import asyncio
+import json
+from urllib.parse import urlsplit
+
+# pylint: disable=import-error
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from users.loadtest import DEFAULT_MIX, LoadTest, parse_mix
+
+COLUMNS = ("requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+class Command(BaseCommand):
+    """Load-test a running users API server."""
+
+    help = (
+        "Seed a running users API with synthetic users, then load it with a "
+        "mix of operations and report throughput and latency per operation."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default="http://127.0.0.1:8000",
+            help="Base URL of the server (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=32,
+            help="Clients sending requests at once (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10.0,
+            help="Seconds to run for (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            help="Stop after this many requests, if that comes first.",
+        )
+        parser.add_argument(
+            "--mix",
+            default=DEFAULT_MIX,
+            help="Relative operation weights (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--seed-users",
+            type=int,
+            default=10_000,
+            help=(
+                "Users to create before the run; 0 targets the users already "
+                "on the server (default: %(default)s)."
+            ),
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Random seed of the users and the operations (default: 0).",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=20,
+            help="Page size of the list operation (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Print the results as JSON instead of a table.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options["mix"])
+        except ValueError as exc:
+            raise CommandError(f"--mix: {exc}") from exc
+        url = urlsplit(options["url"])
+        if url.scheme != "http" or not url.hostname or url.path not in ("", "/"):
+            raise CommandError("--url must be an http:// URL without a path")
+        if options["concurrency"] < 1 or options["seed_users"] < 0:
+            raise CommandError(
+                "--concurrency must be positive, --seed-users not negative"
+            )
+        test = LoadTest(
+            url.hostname,
+            url.port or 80,
+            mix,
+            seed=options["seed"],
+            page_size=options["page_size"],
+        )
+        try:
+            results = asyncio.run(self._run(test, options))
+        except (OSError, RuntimeError) as exc:
+            raise CommandError(f"{options['url']}: {exc}") from exc
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            self._print_table(results)
+
+    async def _run(self, test: LoadTest, options: dict) -> dict[str, dict]:
+        """Seed the server, then run the load test."""
+        targets = await test.seed_users(
+            options["seed_users"],
+            settings.USERS_BULK_MAX_ITEMS,
+            options["concurrency"],
+        )
+        if options["verbosity"]:
+            self.stderr.write(f"{targets} users to target")
+        return await test.run(
+            options["concurrency"], options["duration"], options["requests"]
+        )
+
+    def _print_table(self, results: dict[str, dict]) -> None:
+        """Print one row per operation, then the total."""
+        rows = [["operation", *COLUMNS]]
+        for operation, summary in results.items():
+            rows.append(
+                [
+                    operation,
+                    *(
+                        f"{value:.1f}" if isinstance(value, float) else str(value)
+                        for value in (summary[column] for column in COLUMNS)
+                    ),
+                ]
+            )
+        widths = [
+            max(len(row[index]) for row in rows) for index in range(len(COLUMNS) + 1)
+        ]
+        for row in rows:
+            cells = [row[0].ljust(widths[0])]
+            cells += [cell.rjust(width) for cell, width in zip(row[1:], widths[1:])]
+            self.stdout.write("  ".join(cells))
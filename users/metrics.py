@@ -0,0 +1,373 @@
+"""Latency and throughput metrics for the users API, in Prometheus format.
+
+``MetricsMiddleware`` times every request into a histogram labelled with
+the URL name (``users-list``, ``user-create``, ``user-detail``, ...), the
+method and the status code; its ``_count`` series count requests, so their
+rate is the throughput. ``TimedBackend`` times every store backend call and
+the users JSON renderer and parser time serialization. ``render_metrics``
+renders all of it together with the store size and the response cache
+statistics, read when scraped, for ``users.views.MetricsView`` to serve at
+``/metrics``.
+
+Recording takes no lock: each thread counts into a shard of its own, and a
+scrape adds the shards up. Set ``USERS_METRICS`` to 0 to record nothing.
+"""
+
+from __future__ import annotations
+from bisect import bisect_left
+from collections.abc import Callable
+import functools
+import threading
+from time import perf_counter
+import weakref
+
+# pylint: disable=import-error,too-few-public-methods
+from django.conf import settings
+from .cache import cache_stats
+from .middleware import OptionalMiddleware
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds of the histogram buckets, in seconds.
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Methods reported as such; anything else a client sends counts as "other",
+# so it cannot add series without bound.
+_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    """Format label names and values as ``{name="value",...}``."""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    """Format a sample value; integers without a fraction."""
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+class Histogram:  # pylint: disable=too-many-instance-attributes
+    """A Prometheus histogram whose threads record without locking.
+
+    Each thread observes into its own shard: a dict mapping label values to
+    a list of per-bucket counts (the last for values above every bound)
+    followed by the sum. Only a thread's first observation takes the lock,
+    to register its shard; shards of threads that have ended are folded
+    into ``_retired`` so they do not pile up.
+
+    Args:
+        name (str): The metric name.
+        documentation (str): The ``HELP`` text.
+        labelnames (tuple[str, ...]): Names of the labels, in the order
+            their values are passed to ``observe``.
+        buckets (tuple[float, ...]): Increasing upper bounds of the buckets.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._bounds = [*(_number(bound) for bound in buckets), "+Inf"]
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: list[tuple[weakref.ref, dict]] = []
+        self._retired: dict[tuple, list] = {}
+
+    def _new_entry(self) -> list:
+        """Create the counts and sum of a new series."""
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    def _register(self) -> dict:
+        """Create and register the calling thread's shard."""
+        shard: dict[tuple, list] = {}
+        self._local.shard = shard
+        with self._lock:
+            self._retire()
+            self._shards.append((weakref.ref(threading.current_thread()), shard))
+        return shard
+
+    def _retire(self) -> None:
+        """Fold the shards of ended threads into ``_retired``; hold the lock."""
+        live = []
+        for ref, shard in self._shards:
+            thread = ref()
+            if thread is not None and thread.is_alive():
+                live.append((ref, shard))
+            else:
+                self._merge(self._retired, shard)
+        self._shards = live
+
+    def _merge(self, totals: dict[tuple, list], shard: dict[tuple, list]) -> None:
+        """Add the series of ``shard`` to ``totals``."""
+        # Copying the items is atomic, so the owning thread may keep writing.
+        for labels, entry in list(shard.items()):
+            total = totals.get(labels)
+            if total is None:
+                total = totals[labels] = self._new_entry()
+            for index, value in enumerate(list(entry)):
+                total[index] += value
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        """Record one observation.
+
+        Args:
+            value (float): The observed value, e.g. a duration in seconds.
+            labels (tuple): The label values, in ``labelnames`` order.
+        """
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._register()
+        entry = shard.get(labels)
+        if entry is None:
+            entry = shard[labels] = self._new_entry()
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def totals(self) -> dict[tuple, list]:
+        """Add up every thread's shard.
+
+        Returns:
+            dict[tuple, list]: Per-bucket counts followed by the sum, keyed
+            by label values.
+        """
+        with self._lock:
+            self._retire()
+            totals = {labels: list(entry) for labels, entry in self._retired.items()}
+            for _, shard in self._shards:
+                self._merge(totals, shard)
+        return totals
+
+    def clear(self) -> None:
+        """Drop every observation."""
+        with self._lock:
+            for _, shard in self._shards:
+                shard.clear()
+            self._retired.clear()
+
+    def collect(self) -> list[str]:
+        """Render the histogram in the Prometheus text format.
+
+        Returns:
+            list[str]: The ``HELP`` and ``TYPE`` lines, then the cumulative
+            buckets, sum and count of each series.
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        names = (*self.labelnames, "le")
+        for labels, entry in sorted(self.totals().items()):
+            count = 0
+            for bound, bucket in zip(self._bounds, entry):
+                count += bucket
+                lines.append(
+                    f"{self.name}_bucket{_labels(names, (*labels, bound))} {count}"
+                )
+            series = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{series} {_number(entry[-1])}")
+            lines.append(f"{self.name}_count{series} {count}")
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    "users_http_request_duration_seconds",
+    "Time to respond to a request, by URL name, method and status.",
+    ("view", "method", "status"),
+)
+
+STORE_DURATION = Histogram(
+    "users_store_operation_duration_seconds",
+    "Time spent in store backend calls, by operation.",
+    ("operation",),
+)
+
+SERIALIZATION_DURATION = Histogram(
+    "users_serialization_duration_seconds",
+    "Time spent rendering and parsing JSON, by operation.",
+    ("operation",),
+)
+
+HISTOGRAMS = (REQUEST_DURATION, STORE_DURATION, SERIALIZATION_DURATION)
+
+
+def timed(histogram: Histogram, labels: tuple) -> Callable:
+    """Decorate a function to observe how long each call takes.
+
+    With ``USERS_METRICS`` off, the function is returned unchanged.
+
+    Args:
+        histogram (Histogram): Where to record the durations.
+        labels (tuple): The label values to record them under.
+
+    Returns:
+        Callable: The decorator.
+    """
+
+    def decorate(func: Callable) -> Callable:
+        if not settings.USERS_METRICS:
+            return func
+        observe = histogram.observe
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(perf_counter() - start, labels)
+
+        return wrapper
+
+    return decorate
+
+
+class TimedBackend:
+    """Store backend proxy recording the duration of each call.
+
+    Every method of the ``StoreBackend`` interface is timed into
+    ``STORE_DURATION``, labelled with its name; any other attribute is the
+    wrapped backend's.
+
+    Args:
+        backend (StoreBackend): The backend to time.
+    """
+
+    def __init__(self, backend):
+        # pylint: disable=import-outside-toplevel
+        from users.backends import StoreBackend
+
+        self.backend = backend
+        for name, member in vars(StoreBackend).items():
+            if callable(member) and not name.startswith("_"):
+                method = getattr(backend, name)
+                setattr(self, name, timed(STORE_DURATION, (name,))(method))
+
+    def __getattr__(self, name: str):
+        return getattr(self.backend, name)
+
+
+def _observe_request(request, response, elapsed: float) -> None:
+    """Record the duration of a request under its URL name."""
+    match = request.resolver_match
+    view = (match.url_name if match is not None else None) or "unmatched"
+    method = request.method if request.method in _METHODS else "other"
+    REQUEST_DURATION.observe(elapsed, (view, method, str(response.status_code)))
+
+
+class MetricsMiddleware(OptionalMiddleware):
+    """Time every request into ``REQUEST_DURATION``.
+
+    Runs sync or async, as the rest of the stack does, so it never adds a
+    thread hop. Streamed bodies are not included in the time. Removed from
+    the stack when ``USERS_METRICS`` is off.
+    """
+
+    SETTING = "USERS_METRICS"
+
+    def _call(self, request):
+        """Time a request through a sync stack."""
+        start = perf_counter()
+        response = self.get_response(request)
+        _observe_request(request, response, perf_counter() - start)
+        return response
+
+    async def _acall(self, request):
+        """Time a request through an async stack."""
+        start = perf_counter()
+        response = await self.get_response(request)
+        _observe_request(request, response, perf_counter() - start)
+        return response
+
+
+def _samples(name: str, kind: str, documentation: str, samples: list) -> list[str]:
+    """Render a counter or gauge from ``(labels dict, value)`` samples."""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        series = _labels(tuple(labels), tuple(labels.values()))
+        lines.append(f"{name}{series} {_number(value)}")
+    return lines
+
+
+def render_metrics(users: int, generation: int, subscribers: int) -> str:
+    """Render every metric in the Prometheus text format.
+
+    Args:
+        users (int): The number of users in the store.
+        generation (int): The store generation.
+        subscribers (int): Clients connected to the change feed.
+
+    Returns:
+        str: The exposition, ending in a newline.
+    """
+    lines = [
+        *_samples("users_store_users", "gauge", "Users in the store.", [({}, users)]),
+        *_samples(
+            "users_store_generation",
+            "gauge",
+            "Store generation; grows by one per write.",
+            [({}, generation)],
+        ),
+        *_samples(
+            "users_events_subscribers",
+            "gauge",
+            "Clients connected to the change feed.",
+            [({}, subscribers)],
+        ),
+    ]
+    caches = cache_stats()
+    for stat, kind, documentation in (
+        ("hits", "counter", "Response cache lookups that found an entry."),
+        ("misses", "counter", "Response cache lookups that did not."),
+        ("evictions", "counter", "Entries dropped to keep a cache in bounds."),
+        ("entries", "gauge", "Entries held by a response cache."),
+        ("bytes", "gauge", "Bytes held by a response cache."),
+    ):
+        suffix = "_total" if kind == "counter" else ""
+        lines += _samples(
+            f"users_response_cache_{stat}{suffix}",
+            kind,
+            documentation,
+            [({"cache": name}, stats[stat]) for name, stats in caches.items()],
+        )
+    for histogram in HISTOGRAMS:
+        lines += histogram.collect()
+    return "\n".join(lines) + "\n"
+
+
+def clear_metrics() -> None:
+    """Drop every recorded observation."""
+    for histogram in HISTOGRAMS:
+        histogram.clear()
@@ -0,0 +1,47 @@
+"""Base class of the users API's optional middleware.
+
+The metrics and profiling middleware both run sync or async, as the rest of
+the stack does, so they never add a thread hop, and both take themselves
+out of the stack when their setting is off.
+"""
+
+from __future__ import annotations
+
+# pylint: disable=import-error,too-few-public-methods
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+
+class OptionalMiddleware:
+    """Middleware running in the stack's mode, removed when ``SETTING`` is off.
+
+    Subclasses set ``SETTING`` and implement ``_call`` and ``_acall``, which
+    handle a request through a sync and an async stack.
+    """
+
+    SETTING = ""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, self.SETTING):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.asynchronous = iscoroutinefunction(get_response)
+        if self.asynchronous:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asynchronous:
+            return self._acall(request)
+        return self._call(request)
+
+    def _call(self, request):
+        """Handle a request through a sync stack."""
+        raise NotImplementedError
+
+    async def _acall(self, request):
+        """Handle a request through an async stack."""
+        raise NotImplementedError
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:13
+
+import django.db.models.functions.text
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="UserStoreState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("generation", models.PositiveBigIntegerField(default=0)),
+                ("modifiedAt", models.DateTimeField(default=django.utils.timezone.now)),
+                ("seeded", models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="User",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "uid",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                ("firstName", models.CharField(max_length=255)),
+                ("lastName", models.CharField(max_length=255)),
+                ("email", models.EmailField(max_length=254, unique=True)),
+                ("phone", models.CharField(max_length=50)),
+                ("createdAt", models.DateTimeField(default=django.utils.timezone.now)),
+                ("updatedAt", models.DateTimeField(default=django.utils.timezone.now)),
+                ("version", models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        django.db.models.functions.text.Lower("email"),
+                        name="users_user_email_ci_unique",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:30
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Lower("firstName"),
+                name="users_user_first_name_ci",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Lower("lastName"),
+                name="users_user_last_name_ci",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Lower("phone"),
+                name="users_user_phone_ci",
+            ),
+        ),
+    ]
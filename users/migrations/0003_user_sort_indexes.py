@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_user_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(fields=["createdAt", "id"], name="users_user_created"),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(fields=["updatedAt", "id"], name="users_user_updated"),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_user_sort_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserChange",
+            fields=[
+                (
+                    "seq",
+                    models.PositiveBigIntegerField(primary_key=True, serialize=False),
+                ),
+                ("type", models.CharField(max_length=7)),
+                ("uid", models.UUIDField()),
+                ("at", models.DateTimeField()),
+                ("user", models.JSONField(null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="userstorestate",
+            name="changesFloor",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
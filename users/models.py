@@ -1,31 +1,107 @@
 """
 User models for the API demo application.
 
-This module contains the User model which represents user data in the system.
+This module contains the User model which represents user data in the system,
+the UserStoreState singleton holding the store-wide counters used by the
+ORM store backend, and the UserChange log it keeps for delta sync.
 """
 
+from uuid import uuid4
+
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
 
 
 class User(models.Model):
     """
     User model representing a user in the system.
 
+    The auto-incrementing primary key doubles as the insertion sequence used
+    for keyset pagination; clients only ever see ``uid``.
+
     Attributes:
+        uid (UUIDField): Public identifier returned as the user's ``id``
         firstName (CharField): User's first name
         lastName (CharField): User's last name
         email (EmailField): User's unique email address
         phone (CharField): User's phone number
         createdAt (DateTimeField): Timestamp when user was created
         updatedAt (DateTimeField): Timestamp when user was last updated
+        version (PositiveBigIntegerField): Store generation of the last write
     """
 
+    uid = models.UUIDField(unique=True, default=uuid4, editable=False)
     firstName = models.CharField(max_length=255, null=False, blank=False)
     lastName = models.CharField(max_length=255, null=False)
     email = models.EmailField(unique=True, null=False)
     phone = models.CharField(max_length=50, null=False)
-    createdAt = models.DateTimeField(auto_now_add=True)
-    updatedAt = models.DateTimeField(auto_now=True)
+    # Set explicitly by the store so seeded and replayed users keep their
+    # original timestamps.
+    createdAt = models.DateTimeField(default=timezone.now)
+    updatedAt = models.DateTimeField(default=timezone.now)
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:  # pylint: disable=too-few-public-methods
+        """Model options."""
+
+        constraints = [
+            # Emails are unique regardless of case, matching the store API.
+            models.UniqueConstraint(Lower("email"), name="users_user_email_ci_unique"),
+        ]
+        indexes = [
+            # Back the case-insensitive prefix search; email prefixes use the
+            # unique constraint's index.
+            models.Index(Lower("firstName"), name="users_user_first_name_ci"),
+            models.Index(Lower("lastName"), name="users_user_last_name_ci"),
+            models.Index(Lower("phone"), name="users_user_phone_ci"),
+            # Keyset pages of the sorted views, ties broken by insertion.
+            models.Index(fields=["createdAt", "id"], name="users_user_created"),
+            models.Index(fields=["updatedAt", "id"], name="users_user_updated"),
+        ]
 
     def __str__(self):
         return f"{self.firstName} {self.lastName}"
+
+
+class UserStoreState(models.Model):
+    """
+    Singleton row with the store-wide state of the ORM store backend.
+
+    Attributes:
+        generation (PositiveBigIntegerField): Bumped by every write
+        modifiedAt (DateTimeField): Timestamp of the last write
+        seeded (BooleanField): Whether the sample users have been loaded
+        changesFloor (PositiveBigIntegerField): Generation up to which the
+            change log was discarded by a clear
+    """
+
+    generation = models.PositiveBigIntegerField(default=0)
+    modifiedAt = models.DateTimeField(default=timezone.now)
+    seeded = models.BooleanField(default=False)
+    changesFloor = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"generation {self.generation}"
+
+
+class UserChange(models.Model):
+    """
+    One entry of the ORM store backend's change log.
+
+    Attributes:
+        seq (PositiveBigIntegerField): Store generation the write produced
+        type (CharField): ``created``, ``updated`` or ``deleted``
+        uid (UUIDField): Public identifier of the user written
+        at (DateTimeField): Timestamp of the write
+        user (JSONField): The user's new record; null for a delete
+    """
+
+    seq = models.PositiveBigIntegerField(primary_key=True)
+    type = models.CharField(max_length=7)
+    uid = models.UUIDField()
+    at = models.DateTimeField()
+    user = models.JSONField(null=True)
+
+    def __str__(self):
+        return f"{self.seq} {self.type} {self.uid}"
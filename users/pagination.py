@@ -0,0 +1,192 @@
+"""Keyset pagination helpers for the users API.
+
+Cursors handed to clients are opaque tokens wrapping the store's insertion
+sequence number, so a page is resumed by position rather than by offset.
+Pages of a sorted view wrap the sort key and sequence number of their last
+user instead, along with the field they are sorted by.
+"""
+
+from __future__ import annotations
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+import binascii
+import json
+
+# pylint: disable=import-error
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.utils.urls import replace_query_param
+from .store import SORT_FIELDS
+
+CURSOR_PARAM = "cursor"
+LIMIT_PARAM = "limit"
+SINCE_PARAM = "since"
+TIMEOUT_PARAM = "timeout"
+LAST_EVENT_ID_HEADER = "Last-Event-ID"
+
+
+def encode_cursor(position, field: str | None = None) -> str:
+    """Encode a store position as an opaque cursor.
+
+    Args:
+        position (int | tuple[float | str, int]): Sequence number of the
+            last user on a page, or its ``(sort key, sequence)`` pair on a
+            page sorted by ``field``.
+        field (str | None): The field the page is sorted by, if any.
+
+    Returns:
+        str: URL-safe cursor token.
+    """
+    if field is None:
+        raw = f"s{position}"
+    else:
+        raw = "k" + json.dumps([field, *position], separators=(",", ":"))
+    return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _sort_position(raw: str, field: str) -> tuple[float | str, int] | None:
+    """Parse the body of a sorted-view cursor, or None if it does not fit."""
+    decoded = json.loads(raw)
+    if not isinstance(decoded, list) or len(decoded) != 3:
+        return None
+    name, key, seq = decoded
+    key_type = SORT_FIELDS[field]
+    # Exact types: isinstance would let booleans pass as sequence numbers.
+    # pylint: disable-next=unidiomatic-typecheck
+    if name != field or type(key) is not key_type or type(seq) is not int:
+        return None
+    return key, seq
+
+
+def decode_cursor(cursor: str, field: str | None = None):
+    """Decode a cursor produced by ``encode_cursor``.
+
+    Args:
+        cursor (str): The cursor token supplied by the client.
+        field (str | None): The field the requested page is sorted by, if
+            any; the cursor must come from a page sorted the same way.
+
+    Returns:
+        int | tuple[float | str, int]: The store position the cursor
+        refers to.
+
+    Raises:
+        serializers.ValidationError: If the cursor is malformed or belongs
+            to a differently sorted view.
+    """
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        if field is None and raw[:1] == "s" and raw[1:].isdigit():
+            return int(raw[1:])
+        if field is not None and raw[:1] == "k":
+            position = _sort_position(raw[1:], field)
+            if position is not None:
+                return position
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        pass
+    raise serializers.ValidationError({CURSOR_PARAM: ["Invalid cursor."]})
+
+
+def is_ascii_digits(value: str) -> bool:
+    """Check that a string is a non-empty run of the digits 0-9."""
+    # str.isdigit also accepts digits int() refuses, such as "²".
+    return value.isascii() and value.isdigit()
+
+
+def get_limit(request) -> int:
+    """Read the page size requested by the client.
+
+    Args:
+        request: DRF request with an optional ``limit`` query parameter.
+
+    Returns:
+        int: The requested page size, capped at ``USERS_MAX_PAGE_SIZE``, or
+        ``USERS_PAGE_SIZE`` when no limit was given.
+
+    Raises:
+        serializers.ValidationError: If the limit is not a positive integer.
+    """
+    try:
+        limit = parse_count(request.query_params.get(LIMIT_PARAM), LIMIT_PARAM)
+    except serializers.ValidationError:
+        limit = 0
+    if limit is None:
+        return settings.USERS_PAGE_SIZE
+    if limit < 1:
+        raise serializers.ValidationError(
+            {LIMIT_PARAM: ["A positive integer is required."]}
+        )
+    return min(limit, settings.USERS_MAX_PAGE_SIZE)
+
+
+def get_position(request, field: str | None = None):
+    """Read the store position to resume from.
+
+    Args:
+        request: DRF request with an optional ``cursor`` query parameter.
+        field (str | None): The field the page is sorted by, if any.
+
+    Returns:
+        int | tuple[float | str, int] | None: The decoded position, or None
+        for the first page.
+    """
+    cursor = request.query_params.get(CURSOR_PARAM)
+    return decode_cursor(cursor, field) if cursor else None
+
+
+def parse_count(raw: str | None, name: str) -> int | None:
+    """Parse an optional non-negative integer parameter.
+
+    Args:
+        raw (str | None): The parameter as sent by the client, if at all.
+        name (str): The parameter name, used in the error.
+
+    Returns:
+        int | None: The value, or None if the parameter is missing.
+
+    Raises:
+        serializers.ValidationError: If the value is not a non-negative
+            integer.
+    """
+    if raw is None:
+        return None
+    if not is_ascii_digits(raw):
+        raise serializers.ValidationError(
+            {name: ["A non-negative integer is required."]}
+        )
+    return int(raw)
+
+
+def get_since(request) -> int:
+    """Read the store generation a change feed client is up to date with.
+
+    Args:
+        request: DRF request with an optional ``since`` query parameter.
+
+    Returns:
+        int: The generation, or 0 to start from the oldest retained change.
+
+    Raises:
+        serializers.ValidationError: If ``since`` is not a non-negative
+            integer.
+    """
+    return parse_count(request.query_params.get(SINCE_PARAM, "0"), SINCE_PARAM)
+
+
+def next_link(request, position, field: str | None = None) -> str | None:
+    """Build the absolute URL of the next page.
+
+    Args:
+        request: The DRF request for the current page.
+        position (int | tuple[float | str, int] | None): Position returned
+            by the store for the next page, or None if the current page is
+            the last one.
+        field (str | None): The field the page is sorted by, if any.
+
+    Returns:
+        str | None: The next page URL, or None if there is no next page.
+    """
+    if position is None:
+        return None
+    return replace_query_param(
+        request.build_absolute_uri(), CURSOR_PARAM, encode_cursor(position, field)
+    )
@@ -0,0 +1,258 @@
+"""On-demand profiling of single requests with ``cProfile``.
+
+With ``USERS_PROFILING`` on, ``ProfilingMiddleware`` profiles a request that
+asks for it with an ``X-Profile`` header or a ``profile`` query parameter,
+and answers with the profile's id in ``X-Profile-Id``. If
+``USERS_PROFILING_TOKEN`` is set, the flag's value must be that token.
+``ProfileRing`` keeps the last ``USERS_PROFILING_KEEP`` profiles in
+``USERS_PROFILING_DIR`` as ``pstats`` dumps, for ``users.views.ProfilesView``
+to list and serve: as is, to load into ``pstats``, snakeviz or flameprof
+(which draws flame graphs), or rendered as a text report.
+
+Off, the middleware is taken out of the stack; on, a request that does not
+ask to be profiled costs a header and a query string lookup.
+"""
+
+from __future__ import annotations
+import cProfile
+from datetime import datetime, timezone
+import hmac
+import io
+import json
+import marshal
+import os
+from pathlib import Path
+import pstats
+import re
+import threading
+import time
+
+# pylint: disable=import-error,too-few-public-methods
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from .middleware import OptionalMiddleware
+
+HEADER = "HTTP_X_PROFILE"
+QUERY_PARAMETER = "profile"
+
+# Request attribute set by views whose profiles are not kept, such as those
+# serving the profiles, which are sent the flag to pass the token.
+EXEMPT = "profiling_exempt"
+
+# Formats a profile is served in: the pstats dump, or its text report.
+FORMATS = ("pstats", "text")
+
+_ID = re.compile(r"\d{20}-\d+")
+
+# cProfile profiles one thread, yet from Python 3.12 only one profiler may
+# run in the process at a time; a request flagged while another is being
+# profiled is served unprofiled.
+_ACTIVE = threading.Lock()
+
+
+def render_report(path: Path, sort: str = "cumulative", limit: int = 60) -> str:
+    """Render a ``pstats`` dump as the ``pstats`` text report.
+
+    Args:
+        path (Path): The dump.
+        sort (str): The ``pstats`` sort key, e.g. ``cumulative`` or
+            ``tottime``.
+        limit (int): Number of functions to list.
+
+    Returns:
+        str: The report.
+    """
+    stream = io.StringIO()
+    stats = pstats.Stats(str(path), stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+class ProfileRing:
+    """The most recent request profiles, kept in a directory.
+
+    Each profile is stored as a ``pstats`` dump, ``<id>.prof``, and a
+    ``<id>.json`` file describing the request, written second so a profile
+    is listed only once complete. Ids start with the time in nanoseconds, so
+    they sort oldest first; saving a profile deletes all but the newest
+    ``keep``. Several processes may share the directory.
+
+    Args:
+        directory (str | Path): Where the profiles are kept.
+        keep (int): How many profiles to keep.
+    """
+
+    def __init__(self, directory: str | Path, keep: int):
+        self.directory = Path(directory)
+        self.keep = keep
+
+    def _ids(self) -> list[str]:
+        """List the ids of the complete profiles, oldest first."""
+        if not self.directory.is_dir():
+            return []
+        return sorted(
+            path.stem
+            for path in self.directory.glob("*.json")
+            if _ID.fullmatch(path.stem)
+        )
+
+    def _write(self, path: Path, data: bytes) -> None:
+        """Write a file atomically."""
+        temporary = path.with_name(path.name + ".tmp")
+        temporary.write_bytes(data)
+        os.replace(temporary, path)
+
+    def save(self, profiler: cProfile.Profile, info: dict) -> str:
+        """Store a profile, dropping the oldest beyond ``keep``.
+
+        Args:
+            profiler (cProfile.Profile): The profiler, no longer running.
+            info (dict): What the index lists about the profile.
+
+        Returns:
+            str: The profile's id.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile_id = f"{time.time_ns():020d}-{os.getpid()}"
+        base = self.directory / profile_id
+        # The format of pstats.Stats.dump_stats.
+        stats = marshal.dumps(pstats.Stats(profiler).stats)
+        self._write(base.with_suffix(".prof"), stats)
+        self._write(base.with_suffix(".json"), json.dumps(info).encode())
+        for stale in self._ids()[: -max(self.keep, 1)]:
+            self.delete(stale)
+        return profile_id
+
+    def delete(self, profile_id: str) -> None:
+        """Delete a profile, unlisting it first."""
+        for suffix in (".json", ".prof"):
+            (self.directory / f"{profile_id}{suffix}").unlink(missing_ok=True)
+
+    def index(self) -> list[dict]:
+        """Describe the stored profiles.
+
+        Returns:
+            list[dict]: ``id`` and the ``info`` saved with each profile,
+            newest first.
+        """
+        profiles = []
+        for profile_id in reversed(self._ids()):
+            try:
+                info = json.loads((self.directory / f"{profile_id}.json").read_bytes())
+            except FileNotFoundError:
+                continue
+            profiles.append({"id": profile_id, **info})
+        return profiles
+
+    def path(self, profile_id: str) -> Path | None:
+        """Get the ``pstats`` dump of a stored profile.
+
+        Args:
+            profile_id (str): The profile's id.
+
+        Returns:
+            Path | None: The dump, or None if there is no such profile.
+        """
+        if not _ID.fullmatch(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.prof"
+        return path if path.is_file() else None
+
+
+def get_ring() -> ProfileRing:
+    """Get the ring configured by ``USERS_PROFILING_DIR`` and ``_KEEP``."""
+    return ProfileRing(settings.USERS_PROFILING_DIR, settings.USERS_PROFILING_KEEP)
+
+
+def authorized(value: str | None) -> bool:
+    """Check a profiling flag or index request against the token.
+
+    Args:
+        value (str | None): The ``X-Profile`` header or ``profile`` query
+            parameter, if sent.
+
+    Returns:
+        bool: Whether it was sent and, with ``USERS_PROFILING_TOKEN`` set,
+        is that token.
+    """
+    if value is None:
+        return False
+    token = settings.USERS_PROFILING_TOKEN
+    return not token or hmac.compare_digest(value.encode(), token.encode())
+
+
+def requested_flag(request) -> str | None:
+    """Get the ``X-Profile`` header or ``profile`` query parameter."""
+    value = request.META.get(HEADER)
+    if value is None and QUERY_PARAMETER in request.META.get("QUERY_STRING", ""):
+        value = request.GET.get(QUERY_PARAMETER)
+    return value
+
+
+def _start_profiling(request) -> bool:
+    """Check whether to profile a request.
+
+    If so, ``_ACTIVE`` is held, and the caller must release it when done.
+    """
+    if not authorized(requested_flag(request)):
+        return False
+    return _ACTIVE.acquire(blocking=False)  # pylint: disable=consider-using-with
+
+
+def _info(request, response, elapsed: float) -> dict:
+    """Describe a profiled request for the index."""
+    return {
+        "method": request.method,
+        "path": request.path,
+        "status": response.status_code,
+        "durationMs": round(elapsed * 1000, 3),
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+class ProfilingMiddleware(OptionalMiddleware):
+    """Profile the requests that ask for it.
+
+    Runs sync or async, as the rest of the stack does. In an async stack
+    the profile covers the event loop thread only, including whatever
+    else runs on the loop while the request awaits, but not views run in
+    worker threads. Streamed bodies are not profiled. Removed from the
+    stack when ``USERS_PROFILING`` is off.
+    """
+
+    SETTING = "USERS_PROFILING"
+
+    def _call(self, request):
+        """Profile a request through a sync stack, if it asks for it."""
+        if not _start_profiling(request):
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            response = profiler.runcall(self.get_response, request)
+        finally:
+            _ACTIVE.release()
+        if getattr(request, EXEMPT, False):
+            return response
+        info = _info(request, response, time.perf_counter() - start)
+        response["X-Profile-Id"] = get_ring().save(profiler, info)
+        return response
+
+    async def _acall(self, request):
+        """Profile a request through an async stack, if it asks for it."""
+        if not _start_profiling(request):
+            return await self.get_response(request)
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiler.disable()
+            _ACTIVE.release()
+        if getattr(request, EXEMPT, False):
+            return response
+        info = _info(request, response, time.perf_counter() - start)
+        save = sync_to_async(get_ring().save, thread_sensitive=False)
+        response["X-Profile-Id"] = await save(profiler, info)
+        return response
@@ -0,0 +1,167 @@
+"""Renderers and parsers for the users API.
+
+Provides a newline-delimited JSON renderer so clients can ask for user lists
+as one JSON document per line, and the JSON renderer and parser the API is
+configured with (``REST_FRAMEWORK`` in ``config/settings.py``). Those encode
+and decode with ``orjson`` when it is installed and with a single, reused
+stdlib encoder otherwise; either way their output matches DRF's. Both
+are timed into ``users.metrics.SERIALIZATION_DURATION``.
+"""
+
+from __future__ import annotations
+import io
+
+# orjson is a C extension, whose members pylint cannot see.
+# pylint: disable=import-error,too-few-public-methods,no-member
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+from .metrics import SERIALIZATION_DURATION, timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Strict, as DRF renders: NaN and infinities are not JSON.
+_encoder = encoders.JSONEncoder(
+    ensure_ascii=False, separators=(",", ":"), allow_nan=False
+)
+
+# Types orjson would serialize differently from DRF's encoder are passed to
+# the encoder's ``default``; keys that are not strings make orjson fail, and
+# the stdlib encoder takes over. (orjson writes NaN and infinities as null;
+# user records hold no floats.)
+_ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson is not None
+    else 0
+)
+
+# orjson reads integers beyond 64 bits as floats, the stdlib as exact ints.
+# A body with 20 digits in a row may hold one; finding the run in a copy with
+# every digit mapped to "0" is much faster than a regular expression.
+_DIGITS_TO_ZEROS = bytes(
+    ord("0") if byte in b"0123456789" else ord(" ") for byte in range(256)
+)
+_LONG_DIGITS = b"0" * 20
+
+# DRF escapes these for JavaScript; as UTF-8 they are rare in user data.
+_LINE_SEPARATOR = "\u2028".encode()
+_PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+
+def _dumps(item) -> bytes:
+    """Encode one object as compact UTF-8 JSON."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(item, default=_encoder.default, option=_ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            pass
+    return _encoder.encode(item).encode()
+
+
+def encode_json(item) -> bytes:
+    """Encode one object as compact JSON.
+
+    Args:
+        item: A JSON-serializable object.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON document.
+    """
+    return _dumps(item)
+
+
+def encode_ndjson(items) -> bytes:
+    """Encode items as newline-delimited JSON.
+
+    Args:
+        items: Iterable of JSON-serializable objects.
+
+    Returns:
+        bytes: One compact JSON document per item, each ending in a newline.
+    """
+    return b"".join(_dumps(item) + b"\n" for item in items)
+
+
+def encode_json_items(items) -> bytes:
+    """Encode items as the comma-separated body of a JSON array.
+
+    Args:
+        items: Iterable of JSON-serializable objects.
+
+    Returns:
+        bytes: The compact JSON documents joined by commas, without the
+        surrounding brackets.
+    """
+    return b",".join(_dumps(item) for item in items)
+
+
+class UsersJSONRenderer(JSONRenderer):
+    """DRF's ``JSONRenderer``, encoding straight to bytes.
+
+    Compact, non-ASCII-escaped output (DRF's defaults) is encoded by
+    ``encode_json``; indented output and other JSON settings are left to
+    DRF.
+    """
+
+    @timed(SERIALIZATION_DURATION, ("render",))
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render ``data`` into JSON bytes, as ``JSONRenderer.render``."""
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        body = encode_json(data)
+        if _LINE_SEPARATOR in body:
+            body = body.replace(_LINE_SEPARATOR, b"\\u2028")
+        if _PARAGRAPH_SEPARATOR in body:
+            body = body.replace(_PARAGRAPH_SEPARATOR, b"\\u2029")
+        return body
+
+
+class UsersJSONParser(JSONParser):
+    """DRF's ``JSONParser``, decoding UTF-8 bodies with ``orjson``.
+
+    Bodies orjson rejects or may read differently (other charsets, integers
+    too long for 64 bits) are parsed by DRF, so results and errors match.
+    """
+
+    @timed(SERIALIZATION_DURATION, ("parse",))
+    def parse(self, stream, media_type=None, parser_context=None):
+        """Parse the JSON request body, as ``JSONParser.parse``."""
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        body = stream.read()
+        utf8 = encoding.lower() in ("utf-8", "utf8")
+        if utf8 and _LONG_DIGITS not in body.translate(_DIGITS_TO_ZEROS):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Render lists as newline-delimited JSON, one element per line.
+
+    Anything other than a list, such as an error payload, is rendered as a
+    single line.
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render ``data`` into NDJSON bytes."""
+        if data is None:
+            return b""
+        return encode_ndjson(data if isinstance(data, list) else [data])
@@ -0,0 +1,70 @@
+"""Synthetic user data for benchmarks and load tests.
+
+Generates realistic-looking users in bulk, deterministically for a given
+seed, in the same shape as the records held by ``users.store``.
+"""
+
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+import random
+from uuid import UUID
+
+FIRST_NAMES = (
+    "Emma", "Liam", "Sophia", "Noah", "Olivia", "Ethan", "Ava", "Mason",
+    "Isabella", "William", "Mia", "James", "Charlotte", "Benjamin", "Amelia",
+    "Lucas", "Harper", "Henry", "Evelyn", "Alexander",
+)  # fmt: skip
+LAST_NAMES = (
+    "Johnson", "Williams", "Brown", "Davis", "Miller", "Wilson", "Moore",
+    "Taylor", "Anderson", "Thomas", "Jackson", "White", "Harris", "Martin",
+    "Thompson", "Garcia", "Martinez", "Robinson", "Clark", "Lewis",
+)  # fmt: skip
+EMAIL_DOMAINS = ("email.com", "example.com", "mail.test", "inbox.test")
+
+_EPOCH = datetime(2023, 1, 1, tzinfo=timezone.utc)
+_SPAN_SECONDS = 2 * 365 * 24 * 3600
+
+
+def _timestamp(rng: random.Random, after: datetime = _EPOCH) -> datetime:
+    """Pick a random second between ``after`` and the end of the range."""
+    latest = _EPOCH + timedelta(seconds=_SPAN_SECONDS)
+    return after + timedelta(
+        seconds=rng.randrange(max(1, int((latest - after).total_seconds())))
+    )
+
+
+def generate_users(count: int, seed: int = 0, start: int = 0) -> list[dict]:
+    """Generate unique synthetic users.
+
+    Args:
+        count (int): Number of users to generate.
+        seed (int): Random seed; the same seed gives the same users.
+        start (int): Index of the first user, so successive batches can be
+            generated without email collisions.
+
+    Returns:
+        list[dict]: Complete user records, including ``id`` and ISO 8601
+        ``createdAt``/``updatedAt`` timestamps.
+    """
+    rng = random.Random(seed * 1_000_003 + start)
+    users = []
+    for index in range(start, start + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created = _timestamp(rng)
+        users.append(
+            {
+                "id": str(UUID(int=rng.getrandbits(128), version=4)),
+                "firstName": first,
+                "lastName": last,
+                "email": (
+                    f"{first.lower()}.{last.lower()}.{index}@"
+                    f"{EMAIL_DOMAINS[index % len(EMAIL_DOMAINS)]}"
+                ),
+                "phone": f"+1-555-{rng.randrange(1000):03d}-{rng.randrange(10000):04d}",
+                "createdAt": created.isoformat().replace("+00:00", "Z"),
+                "updatedAt": _timestamp(rng, created)
+                .isoformat()
+                .replace("+00:00", "Z"),
+            }
+        )
+    return users
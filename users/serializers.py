@@ -5,11 +5,126 @@ using Django REST Framework.
 """
 
 # pylint: disable=import-error
+from __future__ import annotations
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
+from rest_framework.fields import empty
+from rest_framework.serializers import as_serializer_error
 from users import store
+from users.validation import compile_serializer
 
+DUPLICATE_EMAIL_MESSAGE = "A user with this email already exists."
 
-class UserCreateSerializer(serializers.Serializer):
+
+def _ensure_email_available(email: str, uid: str | None = None) -> str:
+    """Reject an email address already registered to another user.
+
+    Args:
+        email (str): The email address being validated.
+        uid (str | None): The id of the user being updated, if any. The
+            user's own current address is not treated as a duplicate.
+
+    Returns:
+        str: The email address, unchanged.
+
+    Raises:
+        serializers.ValidationError: If another user has the email.
+    """
+    owner = store.find_user_by_email(email)
+    if owner is not None and owner["id"] != uid:
+        raise serializers.ValidationError(DUPLICATE_EMAIL_MESSAGE)
+    return email
+
+
+class CompiledValidationMixin:  # pylint: disable=too-few-public-methods
+    """Validate with ``users.validation`` when ``USERS_FAST_VALIDATION`` is on.
+
+    The compiled rules stand in for ``to_internal_value`` and the
+    serializer's field validators; ``validate`` still runs. Serializers
+    whose fields cannot be compiled, or that are given extra validators,
+    fall back to DRF.
+    """
+
+    def run_validation(self, data=empty):
+        """Validate ``data`` as ``Serializer.run_validation`` does."""
+        validator = (
+            compile_serializer(type(self)) if settings.USERS_FAST_VALIDATION else None
+        )
+        if validator is None or self.validators:
+            return super().run_validation(data)
+        is_empty_value, data = self.validate_empty_values(data)
+        if is_empty_value:
+            return data
+        value = validator.validate(self, data)
+        try:
+            value = self.validate(value)
+        except (serializers.ValidationError, DjangoValidationError) as exc:
+            raise serializers.ValidationError(detail=as_serializer_error(exc)) from exc
+        return value
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """List serializer that validates each item on its own.
+
+    The payload as a whole must still be a list within the ``allow_empty``
+    and ``max_length`` bounds, but invalid items do not fail validation.
+    Instead ``validated_data`` holds None for them and ``item_errors`` the
+    errors of each item (None for valid ones), so bulk endpoints can apply
+    the valid items and report the rest.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.item_errors: list[dict | None] = []
+
+    def _is_valid_list(self, data) -> bool:
+        """Check that ``data`` is a list of an acceptable length."""
+        if not isinstance(data, list):
+            return False
+        minimum = self.min_length or (0 if self.allow_empty else 1)
+        return minimum <= len(data) <= (self.max_length or len(data))
+
+    def to_internal_value(self, data):
+        """Validate every item, collecting per-item errors."""
+        if not self._is_valid_list(data):
+            # The base class raises the matching error for the list itself.
+            return super().to_internal_value(data)
+        validated, self.item_errors = [], []
+        for item in data:
+            try:
+                validated.append(self.run_child_validation(item))
+                self.item_errors.append(None)
+            except serializers.ValidationError as exc:
+                validated.append(None)
+                self.item_errors.append(exc.detail)
+        return validated
+
+    def update(self, instance, validated_data):
+        """Update method required by ListSerializer base class."""
+        raise NotImplementedError("Bulk writes go through the store directly")
+
+
+class BulkUpdateListSerializer(BulkListSerializer):  # pylint: disable=abstract-method
+    """Bulk list serializer for updates, where each item names its user.
+
+    Each item carries the user's ``id`` next to the fields to change. The
+    id becomes the child's ``instance`` while the item is validated, and is
+    kept in the validated data.
+    """
+
+    def run_child_validation(self, data):
+        """Validate one item against the user named by its ``id``."""
+        uid = data.get("id") if isinstance(data, dict) else None
+        if not isinstance(uid, str) or not uid:
+            raise serializers.ValidationError(
+                {"id": [serializers.Field.default_error_messages["required"]]}
+            )
+        self.child.instance = uid
+        return {"id": uid, **super().run_child_validation(data)}
+
+
+class UserCreateSerializer(CompiledValidationMixin, serializers.Serializer):
     """Serializer for creating new users.
 
     Validates and creates new user instances with required firstName and email,
@@ -21,6 +136,15 @@ class UserCreateSerializer(serializers.Serializer):
     email = serializers.EmailField()
     phone = serializers.CharField(max_length=50, required=False)
 
+    class Meta:  # pylint: disable=too-few-public-methods
+        """Use ``BulkListSerializer`` when validating with ``many=True``."""
+
+        list_serializer_class = BulkListSerializer
+
+    def validate_email(self, value):
+        """Reject emails that already belong to another user."""
+        return _ensure_email_available(value)
+
     def create(self, validated_data):
         """Create method required by Serializer base class."""
         return store.create_user(validated_data)
@@ -31,7 +155,7 @@ class UserCreateSerializer(serializers.Serializer):
         raise NotImplementedError("Use UserUpdateSerializer for updates")
 
 
-class UserUpdateSerializer(serializers.Serializer):
+class UserUpdateSerializer(CompiledValidationMixin, serializers.Serializer):
     """Serializer for updating existing users.
 
     Validates and updates user instances with optional firstName, lastName,
@@ -43,6 +167,21 @@ class UserUpdateSerializer(serializers.Serializer):
     email = serializers.EmailField(required=False)
     phone = serializers.CharField(max_length=50, required=False)
 
+    class Meta:  # pylint: disable=too-few-public-methods
+        """Use ``BulkUpdateListSerializer`` when validating with ``many=True``."""
+
+        list_serializer_class = BulkUpdateListSerializer
+
+    def validate_email(self, value):
+        """Reject emails that already belong to a different user.
+
+        The user being updated is taken from ``instance``, which may be the
+        user dict or its id.
+        """
+        instance = self.instance
+        uid = instance.get("id") if isinstance(instance, dict) else instance
+        return _ensure_email_available(value, uid)
+
     def create(self, validated_data):
         """Create method required by Serializer base class."""
         # Not used for update serializer but required by base class
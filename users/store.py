@@ -1,41 +1,134 @@
-"""User store module for managing in-memory user data.
-
-This module provides a simple in-memory store for user data with CRUD operations.
-It includes functionality for seeding sample data and managing user lifecycle.
+"""User store module for managing user data.
+
+This module provides the store API used by the views: CRUD operations on
+users plus the keyset, generation and version helpers built on them. The
+data itself lives in a pluggable backend (see ``users.backends``) selected
+by the ``USERS_STORE_BACKEND`` setting; the default keeps users in memory.
+It also includes functionality for seeding sample data and managing the
+user lifecycle. Async code uses the ``a``-prefixed twins of the functions,
+which skip the thread handoff when the backend never waits on I/O.
 """
 
 from __future__ import annotations
+from collections.abc import Callable, Collection, Iterator
 from datetime import datetime, timezone
-from uuid import uuid4
+from typing import Any
+
+# pylint: disable=import-error
+from asgiref.sync import sync_to_async
+
+# Fields of a user record, in the order they are stored and rendered.
+USER_FIELDS = (
+    "id",
+    "firstName",
+    "lastName",
+    "email",
+    "phone",
+    "createdAt",
+    "updatedAt",
+)
+
+# Fields with prefix indexes, searchable with search_users_page.
+SEARCH_FIELDS = ("firstName", "lastName", "email", "phone")
 
+# Fields with sorted indexes, orderable with sorted_users_page, mapped to
+# the type of their sort keys (see sort_key).
+SORT_FIELDS = {"createdAt": float, "updatedAt": float, "lastName": str}
 
-class _UserStore:
-    """Internal user store class to encapsulate state."""
+# Fields a client may change with update_user.
+UPDATABLE_FIELDS = frozenset({"firstName", "lastName", "email", "phone"})
 
-    def __init__(self):
-        self.users: list[dict] = []
-        self.seeded: bool = False
 
-    def is_seeded(self) -> bool:
-        """Check if the store has been seeded with initial data.
+class DuplicateEmailError(ValueError):
+    """Raised when a write would give two users the same email address."""
 
-        Returns:
-            bool: True if seeded, False otherwise.
-        """
-        return self.seeded
 
-    def mark_seeded(self) -> None:
-        """Mark the store as seeded."""
-        self.seeded = True
+class VersionConflictError(Exception):
+    """Raised when a conditional write finds the user at another version."""
 
-    def clear(self) -> None:
-        """Clear all users and reset seeded status."""
-        self.users.clear()
-        self.seeded = False
 
+class ChangesExpiredError(Exception):
+    """Raised when the changes after a cursor are no longer in the change log.
+
+    Attributes:
+        generation (int): The current store generation; a client that
+            re-downloads every user can continue from it.
+    """
+
+    def __init__(self, since: int, generation: int):
+        super().__init__(since)
+        self.generation = generation
 
-# Global store instance
-_store = _UserStore()
+
+def normalize_email(email: str) -> str:
+    """Normalize an email address for case-insensitive comparison.
+
+    Args:
+        email (str): The email address as supplied by the client.
+
+    Returns:
+        str: The lower-cased email with surrounding whitespace removed.
+    """
+    return email.strip().lower()
+
+
+def normalize_term(value: str) -> str:
+    """Normalize a field value or search prefix for prefix matching.
+
+    Args:
+        value (str): The value as stored or as supplied by the client.
+
+    Returns:
+        str: The lower-cased value with surrounding whitespace removed.
+    """
+    return value.strip().lower()
+
+
+def update_changes(data: dict) -> dict:
+    """Pick the fields an update sets from its data.
+
+    Args:
+        data (dict): The update data as supplied by the caller.
+
+    Returns:
+        dict: The items of ``data`` whose keys are ``UPDATABLE_FIELDS``.
+
+    Raises:
+        TypeError: If ``data`` is not a dict or sets a field to something
+            other than a string.
+    """
+    if not isinstance(data, dict):
+        raise TypeError(f"update data must be a dict, not {type(data).__name__}")
+    changes = {key: value for key, value in data.items() if key in UPDATABLE_FIELDS}
+    for key, value in changes.items():
+        if not isinstance(value, str):
+            raise TypeError(f"{key} must be a string, not {type(value).__name__}")
+    return changes
+
+
+def sort_key(field: str, value: str) -> float | str:
+    """Get the key a field value sorts by.
+
+    Timestamps sort as POSIX seconds, so values written with different ISO
+    8601 spellings (``Z`` or ``+00:00``, with or without fractions) compare
+    correctly; names sort by their ``normalize_term`` form.
+
+    Args:
+        field (str): One of ``SORT_FIELDS``.
+        value (str): The field value, or a bound supplied by the client.
+
+    Returns:
+        float | str: The sort key, of type ``SORT_FIELDS[field]``.
+
+    Raises:
+        ValueError: If a timestamp is not valid ISO 8601.
+    """
+    if SORT_FIELDS[field] is str:
+        return normalize_term(value)
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
 
 
 def now_iso() -> str:
@@ -47,113 +140,212 @@ def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+SAMPLE_USERS = [
+    {
+        "id": "4b1335f4-788b-4e8d-9ed5-04b99ce430a4",
+        "firstName": "Emma",
+        "lastName": "Johnson",
+        "email": "emma.johnson@email.com",
+        "phone": "+1-555-555-0123",
+        "createdAt": "2023-01-15T08:30:00Z",
+        "updatedAt": "2023-08-22T14:15:30Z",
+    },
+    {
+        "id": "c27d2af0-b713-4092-a73b-024d1313233f",
+        "firstName": "Liam",
+        "lastName": "Williams",
+        "email": "liam.williams@email.com",
+        "phone": "+1-555-555-0456",
+        "createdAt": "2023-02-03T12:45:15Z",
+        "updatedAt": "2023-09-10T09:22:45Z",
+    },
+    {
+        "id": "02ad7f8d-9a4d-4f00-b101-7744851880a2",
+        "firstName": "Sophia",
+        "lastName": "Brown",
+        "email": "sophia.brown@email.com",
+        "phone": "+1-555-555-0789",
+        "createdAt": "2023-03-22T16:20:30Z",
+        "updatedAt": "2023-07-18T11:33:20Z",
+    },
+    {
+        "id": "a3fdef38-b254-4139-b93c-7e576baf9536",
+        "firstName": "Noah",
+        "lastName": "Davis",
+        "email": "noah.davis@email.com",
+        "phone": "+1-555-555-0321",
+        "createdAt": "2023-04-07T10:15:45Z",
+        "updatedAt": "2023-09-25T15:40:10Z",
+    },
+    {
+        "id": "872afdbd-639e-495f-94f0-c008799f7914",
+        "firstName": "Olivia",
+        "lastName": "Miller",
+        "email": "olivia.miller@email.com",
+        "phone": "+1-555-555-0654",
+        "createdAt": "2023-05-12T13:25:20Z",
+        "updatedAt": "2023-08-30T16:55:35Z",
+    },
+    {
+        "id": "3415a2d7-8f54-4e17-8966-55d1b0219ee4",
+        "firstName": "Ethan",
+        "lastName": "Wilson",
+        "email": "ethan.wilson@email.com",
+        "phone": "+1-555-555-0987",
+        "createdAt": "2023-01-28T09:40:10Z",
+        "updatedAt": "2023-06-14T12:28:50Z",
+    },
+    {
+        "id": "a81f014a-efea-40d1-9a53-ff7f329b653c",
+        "firstName": "Ava",
+        "lastName": "Moore",
+        "email": "ava.moore@email.com",
+        "phone": "+1-555-555-0147",
+        "createdAt": "2023-06-05T14:55:25Z",
+        "updatedAt": "2023-09-12T10:18:40Z",
+    },
+    {
+        "id": "3d4c5f82-909d-474c-95ee-0ab44fec640e",
+        "firstName": "Mason",
+        "lastName": "Taylor",
+        "email": "mason.taylor@email.com",
+        "phone": "+1-555-555-0258",
+        "createdAt": "2023-07-19T11:30:50Z",
+        "updatedAt": "2023-09-28T13:42:15Z",
+    },
+    {
+        "id": "8b5fac60-b246-4601-81e7-a517ceea1c6d",
+        "firstName": "Isabella",
+        "lastName": "Anderson",
+        "email": "isabella.anderson@email.com",
+        "phone": "+1-555-555-0369",
+        "createdAt": "2023-08-01T07:15:35Z",
+        "updatedAt": "2023-09-05T08:50:25Z",
+    },
+    {
+        "id": "798ada0b-a752-449c-9138-551a4850fb03",
+        "firstName": "William",
+        "lastName": "Thomas",
+        "email": "william.thomas@email.com",
+        "phone": "+1-555-555-0741",
+        "createdAt": "2023-09-14T15:20:10Z",
+        "updatedAt": "2023-09-20T17:35:55Z",
+    },
+]
+
+
+_backend = None  # pylint: disable=invalid-name
+
+
+def get_backend():
+    """Get the active store backend, creating it on first use.
+
+    Returns:
+        StoreBackend: The backend named by ``USERS_STORE_BACKEND``, wrapped
+        in a ``users.metrics.TimedBackend`` when ``USERS_METRICS`` is on.
+    """
+    global _backend  # pylint: disable=global-statement
+    if _backend is None:
+        # pylint: disable=import-outside-toplevel
+        from django.conf import settings
+        from users.backends import load_backend
+
+        _backend = load_backend(settings.USERS_STORE_BACKEND)
+        if settings.USERS_METRICS:
+            from users.metrics import TimedBackend
+
+            _backend = TimedBackend(_backend)
+    return _backend
+
+
+def set_backend(backend):
+    """Replace the active store backend.
+
+    Args:
+        backend (StoreBackend | None): The backend to use from now on, or
+            None to load the configured one again on next use.
+
+    Returns:
+        StoreBackend | None: The previously active backend.
+    """
+    global _backend  # pylint: disable=global-statement
+    previous, _backend = _backend, backend
+    return previous
+
+
+def load_store() -> None:
+    """Prepare the store when the app starts.
+
+    Persistent backends restore their users, e.g. the durable backend loads
+    its newest snapshot and replays the log written after it; a store that
+    has never held data is seeded with the sample users.
+    """
+    get_backend().load(SAMPLE_USERS)
+
+
 def seed_once() -> None:
     """Seed the store with sample data if not already seeded."""
-    if _store.is_seeded():
-        return
-    sample = [
-        {
-            "id": "4b1335f4-788b-4e8d-9ed5-04b99ce430a4",
-            "firstName": "Emma",
-            "lastName": "Johnson",
-            "email": "emma.johnson@email.com",
-            "phone": "+1-555-555-0123",
-            "createdAt": "2023-01-15T08:30:00Z",
-            "updatedAt": "2023-08-22T14:15:30Z",
-        },
-        {
-            "id": "c27d2af0-b713-4092-a73b-024d1313233f",
-            "firstName": "Liam",
-            "lastName": "Williams",
-            "email": "liam.williams@email.com",
-            "phone": "+1-555-555-0456",
-            "createdAt": "2023-02-03T12:45:15Z",
-            "updatedAt": "2023-09-10T09:22:45Z",
-        },
-        {
-            "id": "02ad7f8d-9a4d-4f00-b101-7744851880a2",
-            "firstName": "Sophia",
-            "lastName": "Brown",
-            "email": "sophia.brown@email.com",
-            "phone": "+1-555-555-0789",
-            "createdAt": "2023-03-22T16:20:30Z",
-            "updatedAt": "2023-07-18T11:33:20Z",
-        },
-        {
-            "id": "a3fdef38-b254-4139-b93c-7e576baf9536",
-            "firstName": "Noah",
-            "lastName": "Davis",
-            "email": "noah.davis@email.com",
-            "phone": "+1-555-555-0321",
-            "createdAt": "2023-04-07T10:15:45Z",
-            "updatedAt": "2023-09-25T15:40:10Z",
-        },
-        {
-            "id": "872afdbd-639e-495f-94f0-c008799f7914",
-            "firstName": "Olivia",
-            "lastName": "Miller",
-            "email": "olivia.miller@email.com",
-            "phone": "+1-555-555-0654",
-            "createdAt": "2023-05-12T13:25:20Z",
-            "updatedAt": "2023-08-30T16:55:35Z",
-        },
-        {
-            "id": "3415a2d7-8f54-4e17-8966-55d1b0219ee4",
-            "firstName": "Ethan",
-            "lastName": "Wilson",
-            "email": "ethan.wilson@email.com",
-            "phone": "+1-555-555-0987",
-            "createdAt": "2023-01-28T09:40:10Z",
-            "updatedAt": "2023-06-14T12:28:50Z",
-        },
-        {
-            "id": "a81f014a-efea-40d1-9a53-ff7f329b653c",
-            "firstName": "Ava",
-            "lastName": "Moore",
-            "email": "ava.moore@email.com",
-            "phone": "+1-555-555-0147",
-            "createdAt": "2023-06-05T14:55:25Z",
-            "updatedAt": "2023-09-12T10:18:40Z",
-        },
-        {
-            "id": "3d4c5f82-909d-474c-95ee-0ab44fec640e",
-            "firstName": "Mason",
-            "lastName": "Taylor",
-            "email": "mason.taylor@email.com",
-            "phone": "+1-555-555-0258",
-            "createdAt": "2023-07-19T11:30:50Z",
-            "updatedAt": "2023-09-28T13:42:15Z",
-        },
-        {
-            "id": "8b5fac60-b246-4601-81e7-a517ceea1c6d",
-            "firstName": "Isabella",
-            "lastName": "Anderson",
-            "email": "isabella.anderson@email.com",
-            "phone": "+1-555-555-0369",
-            "createdAt": "2023-08-01T07:15:35Z",
-            "updatedAt": "2023-09-05T08:50:25Z",
-        },
-        {
-            "id": "798ada0b-a752-449c-9138-551a4850fb03",
-            "firstName": "William",
-            "lastName": "Thomas",
-            "email": "william.thomas@email.com",
-            "phone": "+1-555-555-0741",
-            "createdAt": "2023-09-14T15:20:10Z",
-            "updatedAt": "2023-09-20T17:35:55Z",
-        },
-    ]
-    _store.users.extend(sample)
-    _store.mark_seeded()
+    get_backend().seed(SAMPLE_USERS)
 
 
 def list_users() -> list[dict]:
     """Get all users from the store.
 
     Returns:
-        list[dict]: List of all user dictionaries.
+        list[dict]: List of all user dictionaries, in insertion order.
+    """
+    return get_backend().list_users()
+
+
+def count_users() -> int:
+    """Get the number of users in the store.
+
+    Returns:
+        int: The number of users, counted without reading them.
+    """
+    return get_backend().count_users()
+
+
+def list_users_page(
+    limit: int, after: int | None = None
+) -> tuple[list[dict], int | None]:
+    """Get a page of users in insertion order.
+
+    Pages are addressed by keyset rather than offset, so fetching a deep
+    page costs O(log n + limit) regardless of how far in it starts.
+
+    Args:
+        limit (int): Maximum number of users to return.
+        after (int | None): Position returned with the previous page, or
+            None for the first page.
+
+    Returns:
+        tuple[list[dict], int | None]: The users on the page and the
+        position of the next page, or None if there are no more users.
+    """
+    return get_backend().list_users_page(limit, after)
+
+
+def iter_users(chunk_size: int) -> Iterator[list[dict]]:
+    """Iterate over all users in insertion order, a chunk at a time.
+
+    Each chunk is fetched with ``list_users_page``, so only one chunk is
+    held at a time and writes made while iterating do not invalidate it.
+
+    Args:
+        chunk_size (int): Maximum number of users per chunk.
+
+    Yields:
+        list[dict]: The next non-empty chunk of users.
     """
-    return _store.users
+    backend = get_backend()
+    position = None
+    while True:
+        users, position = backend.list_users_page(chunk_size, position)
+        if users:
+            yield users
+        if position is None:
+            return
 
 
 def get_user(uid: str) -> dict | None:
@@ -165,53 +357,158 @@ def get_user(uid: str) -> dict | None:
     Returns:
         dict | None: User dictionary if found, None otherwise.
     """
-    return next((u for u in _store.users if u["id"] == uid), None)
+    return get_backend().get_user(uid)
+
+
+def search_users_page(
+    prefixes: dict[str, str],
+    terms: list[str],
+    limit: int,
+    after: int | None = None,
+) -> tuple[list[dict], int | None]:
+    """Get a page of the users matching prefix filters, in insertion order.
+
+    Matches come from the store's prefix indexes rather than a scan, and
+    page like ``list_users_page``.
+
+    Args:
+        prefixes (dict[str, str]): Maps fields of ``SEARCH_FIELDS`` to a
+            prefix their value must start with.
+        terms (list[str]): Prefixes that must each match at least one of
+            ``SEARCH_FIELDS``.
+        limit (int): Maximum number of users to return.
+        after (int | None): Position returned with the previous page.
+
+    Returns:
+        tuple[list[dict], int | None]: The matching users on the page and
+        the position to resume from, or None if this is the last page.
+        Matching ignores case and surrounding whitespace.
+    """
+    return get_backend().search_users_page(prefixes, terms, limit, after)
+
+
+def sorted_users_page(  # pylint: disable=too-many-arguments
+    field: str,
+    limit: int,
+    after: tuple[float | str, int] | None = None,
+    *,
+    descending: bool = False,
+    start: float | str | None = None,
+    prefixes: dict[str, str] | None = None,
+    terms: list[str] | None = None,
+) -> tuple[list[dict], tuple[float | str, int] | None]:
+    """Get a page of users ordered by a field, from its sorted index.
+
+    A page costs a binary search plus the users on it rather than a sort
+    of the whole store. Ties are broken by insertion order.
+
+    Args:
+        field (str): One of ``SORT_FIELDS``.
+        limit (int): Maximum number of users to return.
+        after (tuple[float | str, int] | None): Position returned with the
+            previous page.
+        descending (bool): Whether to order from the largest value down.
+        start (float | str | None): Sort key (see ``sort_key``) to begin
+            at; with ``descending`` only keys up to it are returned,
+            otherwise only keys from it on. E.g. the ``updatedAt`` key of
+            the last sync, to fetch the users changed since.
+        prefixes (dict[str, str] | None): Prefix filters, as for
+            ``search_users_page``.
+        terms (list[str] | None): Search terms, as for
+            ``search_users_page``.
+
+    Returns:
+        tuple[list[dict], tuple[float | str, int] | None]: The users on the
+        page and the position to resume from, or None if this is the last
+        page.
+    """
+    return get_backend().sorted_users_page(
+        field,
+        limit,
+        after,
+        descending=descending,
+        start=start,
+        prefixes=prefixes or {},
+        terms=terms or [],
+    )
+
+
+def get_users(uids: list[str]) -> list[dict | None]:
+    """Get several users by id in one pass over the store.
+
+    Args:
+        uids (list[str]): The user IDs to look up.
+
+    Returns:
+        list[dict | None]: The user for each id, in the same order, or None
+        where no user has that id.
+    """
+    return get_backend().get_users(uids)
+
+
+def get_user_snapshot(uid: str) -> tuple[dict | None, int | None]:
+    """Get a user together with its version, read consistently.
+
+    Args:
+        uid (str): The user ID to search for.
+
+    Returns:
+        tuple[dict | None, int | None]: The user and the version it was
+        written at, or ``(None, None)`` if not found.
+    """
+    return get_backend().get_user_snapshot(uid)
+
+
+def find_user_by_email(email: str) -> dict | None:
+    """Get a user by email address, ignoring case.
+
+    Args:
+        email (str): The email address to search for.
+
+    Returns:
+        dict | None: User dictionary if found, None otherwise.
+    """
+    return get_backend().find_user_by_email(email)
 
 
 def create_user(data: dict) -> dict:
     """Create a new user with the provided data.
 
     Args:
-        data (dict): User data containing firstName, lastName, email, and phone.
+        data (dict): User data containing firstName and email, and
+            optionally lastName and phone, which default to empty strings.
 
     Returns:
         dict: The created user with generated ID and timestamps.
+
+    Raises:
+        DuplicateEmailError: If another user already has the email.
     """
-    user = {
-        "id": str(uuid4()),
-        "firstName": data["firstName"],
-        "lastName": data["lastName"],
-        "email": data["email"],
-        "phone": data["phone"],
-        "createdAt": now_iso(),
-        "updatedAt": now_iso(),
-    }
-    _store.users.append(user)
-    return user
+    return get_backend().create_user(data)
 
 
-def update_user(uid: str, data: dict) -> dict | None:
+def update_user(
+    uid: str, data: dict, if_versions: Collection[int] | None = None
+) -> dict | None:
     """Update an existing user with new data.
 
     Args:
         uid (str): The user ID to update.
         data (dict): New user data (firstName, lastName, email, phone).
+        if_versions (Collection[int] | None): If given, only apply the
+            update while the user is at one of these versions.
 
     Returns:
-        dict | None: Updated user dictionary if found, None otherwise.
+        dict | None: The user's new record if found, None otherwise. The
+        previous record is left untouched for concurrent readers.
+
+    Raises:
+        DuplicateEmailError: If another user already has the new email.
+        VersionConflictError: If the user's version is not in
+            ``if_versions``.
+        TypeError: If ``data`` is not a dict of strings.
     """
-    user = get_user(uid)
-    if not user:
-        return None
-    user.update(
-        {
-            key: value
-            for key, value in data.items()
-            if key in {"firstName", "lastName", "email", "phone"}
-        }
-    )
-    user["updatedAt"] = now_iso()
-    return user
+    return get_backend().update_user(uid, data, if_versions)
 
 
 def delete_user(uid: str) -> bool:
@@ -223,21 +520,231 @@ def delete_user(uid: str) -> bool:
     Returns:
         bool: True if user was deleted, False if not found.
     """
-    user_list = len(_store.users)
-    new_user_list = [user for user in _store.users if user["id"] != uid]
-    if len(new_user_list) == user_list:
-        return False
-    _store.users.clear()
-    _store.users.extend(new_user_list)
-    return True
+    return get_backend().delete_user(uid)
+
+
+def create_users(items: list[dict]) -> list[dict | Exception]:
+    """Create several users in one pass over the store.
+
+    Items are applied in order under a single write lock (or transaction),
+    and one failing item does not stop the others.
+
+    Args:
+        items (list[dict]): User data for each new user, as for
+            ``create_user``.
+
+    Returns:
+        list[dict | Exception]: For each item, the created user or the error
+        that rejected it: ``DuplicateEmailError``, or one of
+        ``users.backends.ITEM_ERRORS`` for malformed data.
+    """
+    return get_backend().create_users(items)
+
+
+def update_users(
+    items: list[tuple[str, dict]],
+) -> list[dict | Exception | None]:
+    """Update several users in one pass over the store.
+
+    Items are applied in order under a single write lock (or transaction),
+    and one failing item does not stop the others.
+
+    Args:
+        items (list[tuple[str, dict]]): ``(id, data)`` pairs, as for
+            ``update_user``.
+
+    Returns:
+        list[dict | Exception | None]: For each item, the user's new record,
+        None if not found, or the error that rejected it:
+        ``DuplicateEmailError``, or one of ``users.backends.ITEM_ERRORS``
+        for malformed data.
+    """
+    return get_backend().update_users(items)
+
+
+def delete_users(uids: list[str]) -> list[bool]:
+    """Delete several users in one pass over the store.
+
+    Args:
+        uids (list[str]): The ids of the users to delete.
+
+    Returns:
+        list[bool]: For each id, True if the user was deleted, False if not
+        found.
+    """
+    return get_backend().delete_users(uids)
+
+
+def get_changes(since: int, limit: int) -> tuple[list[dict], int, bool]:
+    """Get the user changes made after a store generation, oldest first.
+
+    Every create, update and delete is recorded in a bounded change log as
+    ``{"seq", "type", "id", "at", "user"}``, where ``seq`` is the generation
+    the write produced, ``type`` is ``"created"``, ``"updated"`` or
+    ``"deleted"``, ``at`` is the ISO 8601 time of the write and ``user`` is
+    the new record, or None for a delete (a tombstone).
+
+    Args:
+        since (int): The generation the client is up to date with.
+        limit (int): Maximum number of changes to return.
+
+    Returns:
+        tuple[list[dict], int, bool]: The changes, the generation to pass as
+        ``since`` next time, and whether more changes are already waiting.
+
+    Raises:
+        ChangesExpiredError: If changes after ``since`` have been dropped
+            from the log (or ``since`` is from another store), so the
+            client has to re-download every user.
+    """
+    return get_backend().get_changes(since, limit)
+
+
+def get_generation() -> int:
+    """Get the store generation.
+
+    The generation increases on every create, update, delete and clear, so
+    two reads at the same generation are guaranteed to see the same data.
+
+    Returns:
+        int: The current generation.
+    """
+    return get_backend().get_generation()
+
+
+def get_user_version(uid: str) -> int | None:
+    """Get the generation at which a user was last written.
+
+    Args:
+        uid (str): The user ID to look up.
+
+    Returns:
+        int | None: The user's version, or None if the user does not exist.
+    """
+    return get_backend().get_user_version(uid)
+
+
+def get_last_modified() -> float:
+    """Get the time of the most recent write to the store.
+
+    Returns:
+        float: POSIX timestamp of the last create, update, delete or clear.
+    """
+    return get_backend().get_last_modified()
 
 
 def clear_users() -> None:
     """Clear all users from the store."""
-    _store.clear()
+    get_backend().clear_users()
 
 
 def reset_and_seed() -> None:
     """Reset the store and reseed with initial data."""
-    clear_users()
-    seed_once()
+    get_backend().reset_and_seed(SAMPLE_USERS)
+
+
+async def arun(func: Callable, *args, write: bool = False, **kwargs) -> Any:
+    """Call synchronous code that uses the store from async code.
+
+    Backends whose reads (or writes) never wait on I/O, such as the
+    in-memory one, are called directly on the event loop; the others, such
+    as the ORM backend, in a worker thread through ``sync_to_async``.
+
+    Args:
+        func (Callable): The function to call, e.g. a store function or a
+            serializer's ``is_valid``.
+        *args: Positional arguments for ``func``.
+        write (bool): Whether ``func`` writes to the store.
+        **kwargs: Keyword arguments for ``func``.
+
+    Returns:
+        Any: What ``func`` returns.
+    """
+    backend = get_backend()
+    if backend.inline_writes if write else backend.inline_reads:
+        return func(*args, **kwargs)
+    return await sync_to_async(func)(*args, **kwargs)
+
+
+async def alist_users_page(
+    limit: int, after: int | None = None
+) -> tuple[list[dict], int | None]:
+    """Async ``list_users_page``."""
+    return await arun(list_users_page, limit, after)
+
+
+async def asearch_users_page(
+    prefixes: dict[str, str], terms: list[str], limit: int, after: int | None = None
+) -> tuple[list[dict], int | None]:
+    """Async ``search_users_page``."""
+    return await arun(search_users_page, prefixes, terms, limit, after)
+
+
+async def asorted_users_page(  # pylint: disable=too-many-arguments
+    field: str,
+    limit: int,
+    after: tuple[float | str, int] | None = None,
+    *,
+    descending: bool = False,
+    start: float | str | None = None,
+    prefixes: dict[str, str] | None = None,
+    terms: list[str] | None = None,
+) -> tuple[list[dict], tuple[float | str, int] | None]:
+    """Async ``sorted_users_page``."""
+    return await arun(
+        sorted_users_page,
+        field,
+        limit,
+        after,
+        descending=descending,
+        start=start,
+        prefixes=prefixes,
+        terms=terms,
+    )
+
+
+async def aget_users(uids: list[str]) -> list[dict | None]:
+    """Async ``get_users``."""
+    return await arun(get_users, uids)
+
+
+async def aget_user_snapshot(uid: str) -> tuple[dict | None, int | None]:
+    """Async ``get_user_snapshot``."""
+    return await arun(get_user_snapshot, uid)
+
+
+async def afind_user_by_email(email: str) -> dict | None:
+    """Async ``find_user_by_email``."""
+    return await arun(find_user_by_email, email)
+
+
+async def acreate_user(data: dict) -> dict:
+    """Async ``create_user``."""
+    return await arun(create_user, data, write=True)
+
+
+async def aupdate_user(
+    uid: str, data: dict, if_versions: Collection[int] | None = None
+) -> dict | None:
+    """Async ``update_user``."""
+    return await arun(update_user, uid, data, if_versions, write=True)
+
+
+async def adelete_user(uid: str) -> bool:
+    """Async ``delete_user``."""
+    return await arun(delete_user, uid, write=True)
+
+
+async def aget_changes(since: int, limit: int) -> tuple[list[dict], int, bool]:
+    """Async ``get_changes``."""
+    return await arun(get_changes, since, limit)
+
+
+async def aget_generation() -> int:
+    """Async ``get_generation``."""
+    return await arun(get_generation)
+
+
+async def aget_last_modified() -> float:
+    """Async ``get_last_modified``."""
+    return await arun(get_last_modified)
@@ -0,0 +1,80 @@
+"""Streaming export of the full user list.
+
+Builds ``StreamingHttpResponse`` bodies that pull users from the store in
+bounded chunks and encode them lazily, so peak memory depends on the chunk
+size rather than on the number of users. Async views get bodies that
+pull each chunk through ``arun``, so ASGI streams them without buffering.
+"""
+
+from __future__ import annotations
+from collections.abc import AsyncIterator, Iterator
+
+# pylint: disable=import-error
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from .fields import Projection
+from .renderers import NDJSON_MEDIA_TYPE, encode_json_items, encode_ndjson
+from .store import arun, iter_users
+
+STREAM_FORMATS = ("ndjson", "json")
+
+
+def _chunks(chunk_size: int, projection: Projection | None) -> Iterator[list[dict]]:
+    """Yield chunks of users, projected if a projection is given."""
+    if projection is None:
+        yield from iter_users(chunk_size)
+    else:
+        for users in iter_users(chunk_size):
+            yield projection.many(users)
+
+
+def _ndjson_body(
+    chunk_size: int, projection: Projection | None = None
+) -> Iterator[bytes]:
+    """Yield NDJSON-encoded chunks of users."""
+    for users in _chunks(chunk_size, projection):
+        yield encode_ndjson(users)
+
+
+def _json_body(
+    chunk_size: int, projection: Projection | None = None
+) -> Iterator[bytes]:
+    """Yield the user list as a JSON array, split into chunks."""
+    separator = b"["
+    for users in _chunks(chunk_size, projection):
+        yield separator + encode_json_items(users)
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
+
+
+async def _async_body(body: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """Yield the chunks of a body, reading the store through ``arun``."""
+    while (chunk := await arun(next, body, None)) is not None:
+        yield chunk
+
+
+def stream_users(
+    fmt: str, projection: Projection | None = None, asynchronous: bool = False
+) -> StreamingHttpResponse:
+    """Stream every user in the store.
+
+    Args:
+        fmt (str): ``"ndjson"`` for one user per line, or ``"json"`` for a
+            single JSON array sent in chunks.
+        projection (Projection | None): Sparse fieldset to apply to each
+            user, if any.
+        asynchronous (bool): Whether to build an async body, for views
+            served through ASGI.
+
+    Returns:
+        StreamingHttpResponse: Response whose body is generated lazily in
+        chunks of ``USERS_STREAM_CHUNK_SIZE`` users.
+    """
+    chunk_size = settings.USERS_STREAM_CHUNK_SIZE
+    if fmt == "ndjson":
+        body, content_type = _ndjson_body(chunk_size, projection), NDJSON_MEDIA_TYPE
+    else:
+        body, content_type = _json_body(chunk_size, projection), "application/json"
+    if asynchronous:
+        body = _async_body(body)
+    return StreamingHttpResponse(body, content_type=content_type)
@@ -0,0 +1,5 @@
+"""URL configuration serving the users API through its async views."""
+
+from users.urls import user_urlpatterns
+
+urlpatterns = user_urlpatterns(asynchronous=True)
@@ -0,0 +1,5 @@
+"""URL configuration serving the users API and the request profiles."""
+
+from users.urls import profile_urlpatterns, user_urlpatterns
+
+urlpatterns = user_urlpatterns(asynchronous=False) + profile_urlpatterns()
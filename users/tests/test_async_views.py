@@ -0,0 +1,186 @@
+"""Tests for the async variants of the user endpoints.
+
+This module runs the main API tests again against the async views, except
+those reading streamed bodies, which the async views only produce for ASGI
+clients, and checks that the async views stay on the event loop under ASGI
+where the store backend allows it.
+"""
+
+# pylint: disable=import-error,unused-import
+import asyncio
+import json
+import threading
+import pytest
+from django.test import AsyncClient
+from rest_framework import status
+from users import store
+from users.asgi import get_asgi_application, is_users_path
+from users.async_views import AsyncUsersListView
+from users.tests.test_users_api import (
+    test_conditional_get_returns_not_modified,
+    test_create_user,
+    test_create_user_rejects_duplicate_email,
+    test_list_users,
+    test_list_users_cursor_pagination,
+    test_list_users_filtered_by_email,
+    test_list_users_rejects_bad_pagination_params,
+    test_list_users_search_and_prefix_filters,
+    test_list_users_sorted,
+    test_lookup_users_by_ids,
+    test_patch_with_if_match,
+    test_responses_served_from_cache_until_a_write,
+    test_sparse_fieldsets_reject_unknown_fields,
+    test_update_user_email_uniqueness,
+)
+
+pytestmark = pytest.mark.urls("users.tests.async_urls")
+
+NEW_USER = {
+    "firstName": "Async",
+    "lastName": "User",
+    "email": "async.user@example.com",
+    "phone": "+1234567890",
+}
+
+
+@pytest.mark.unit
+def test_arun_runs_inline_only_where_the_backend_allows(monkeypatch):
+    """Test that ``arun`` hops to a thread only for backends that block.
+
+    Args:
+        monkeypatch: pytest monkeypatch fixture.
+    """
+
+    async def threads(write: bool) -> int:
+        return await store.arun(threading.get_ident, write=write)
+
+    loop_thread = threading.get_ident()
+    assert asyncio.run(threads(False)) == loop_thread
+    assert asyncio.run(threads(True)) == loop_thread
+
+    monkeypatch.setattr(store.get_backend(), "inline_writes", False)
+    assert asyncio.run(threads(False)) == loop_thread
+    assert asyncio.run(threads(True)) != loop_thread
+
+
+@pytest.mark.unit
+def test_async_store_functions():
+    """Test that the async store functions match their sync counterparts."""
+
+    async def scenario():
+        generation = await store.aget_generation()
+        created = await store.acreate_user(NEW_USER)
+        assert await store.afind_user_by_email(NEW_USER["email"]) == created
+        assert (await store.aget_user_snapshot(created["id"]))[0] == created
+        assert await store.aget_users([created["id"]]) == [created]
+        updated = await store.aupdate_user(created["id"], {"phone": "+1999"})
+        assert updated["phone"] == "+1999"
+        changes, position, more = await store.aget_changes(generation, 10)
+        assert [change["type"] for change in changes] == ["created", "updated"]
+        assert (position, more) == (generation + 2, False)
+        page, _ = await store.asearch_users_page({}, ["async"], 10)
+        assert page == [updated]
+        assert await store.adelete_user(created["id"])
+        assert await store.alist_users_page(100) == store.list_users_page(100)
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.api
+def test_async_views_through_asgi(settings):
+    """Test a create, read, update, stream and delete through the ASGI handler.
+
+    Args:
+        settings: pytest-django settings fixture.
+    """
+    settings.USERS_STREAM_CHUNK_SIZE = 3
+    assert asyncio.iscoroutinefunction(AsyncUsersListView.as_view())
+
+    async def scenario():
+        client = AsyncClient()
+        response = await client.post("/user", NEW_USER, content_type="application/json")
+        assert response.status_code == status.HTTP_201_CREATED
+        uid = response.json()["id"]
+        assert response["ETag"]
+
+        response = await client.get(f"/user/{uid}", {"fields": "email"})
+        assert response.json() == {"email": "async.user@example.com"}
+        response = await client.patch(
+            f"/user/{uid}",
+            {"firstName": "Changed"},
+            content_type="application/json",
+            headers={"if-match": response["ETag"]},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["firstName"] == "Changed"
+
+        response = await client.get("/users", {"email": "ASYNC.user@example.com"})
+        assert [user["id"] for user in response.json()] == [uid]
+        response = await client.get("/users", {"limit": "2"})
+        assert len(response.json()) == 2 and "Link" in response
+        expected = (await client.get("/users", {"limit": "100"})).json()
+        response = await client.get("/users", {"stream": "json"})
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        assert json.loads(body) == expected
+        response = await client.get("/users", {"stream": "1", "fields": "id"})
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        assert [json.loads(line) for line in body.splitlines()] == [
+            {"id": user["id"]} for user in expected
+        ]
+
+        assert (await client.delete(f"/user/{uid}")).status_code == (
+            status.HTTP_204_NO_CONTENT
+        )
+        response = await client.get(f"/user/{uid}")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        response = await client.put(f"/user/{uid}")
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.api
+def test_asgi_application_serves_users_api_with_lean_middleware(settings):
+    """Test that only users API requests skip the full middleware stack.
+
+    Args:
+        settings: pytest-django settings fixture.
+    """
+    settings.USERS_ASYNC_VIEWS = True
+    settings.ALLOWED_HOSTS = ["testserver"]
+    middleware = list(settings.MIDDLEWARE)
+    application = get_asgi_application()
+    assert settings.MIDDLEWARE == middleware
+
+    async def get(path: str) -> dict:
+        """Get the status and headers of the response to ``GET path``."""
+        messages = []
+        requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            await asyncio.Event().wait()  # the client never disconnects
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": b"",
+            "headers": [(b"host", b"testserver")],
+        }
+        await application(scope, receive, send)
+        return {
+            "status": messages[0]["status"],
+            **{key.decode(): value for key, value in messages[0]["headers"]},
+        }
+
+    assert is_users_path("/users") and is_users_path("/user/abc")
+    assert not is_users_path("/usersx") and not is_users_path("/admin/")
+    assert "X-Frame-Options" in asyncio.run(get("/admin/"))
+    users = asyncio.run(get("/users"))
+    assert users["status"] == status.HTTP_200_OK
+    assert "X-Frame-Options" not in users
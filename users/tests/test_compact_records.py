@@ -0,0 +1,143 @@
+"""Tests for the compact record storage of the in-memory users table.
+
+The same writes are applied to a dict table and a compact one, and every
+read must give the same users.
+"""
+
+# pylint: disable=import-error
+from datetime import datetime, timedelta, timezone
+import random
+import pytest
+from users import store
+from users.backends.durable import DurableMemoryBackend
+from users.backends.memory import CompactUserTable, MemoryBackend, UserTable
+from users.backends.records import UserRecords, pack_timestamp, unpack_timestamp
+from users.sample_data import generate_users
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "value",
+    [
+        store.now_iso(),
+        "2023-01-15T08:30:00Z",
+        "2023-01-15T08:30:00+00:00",
+        "2023-01-15T08:30:00.000001Z",
+        "2023-01-15T08:30:00.120000+00:00",
+        "1969-12-31T23:59:59.999999+00:00",
+    ],
+)
+def test_utc_timestamps_are_packed_exactly(value):
+    """Test that UTC timestamps pack into integers and back unchanged.
+
+    Args:
+        value: An ISO 8601 UTC timestamp.
+    """
+    packed = pack_timestamp(value)
+    assert isinstance(packed, int)
+    assert unpack_timestamp(packed) == value
+
+
+@pytest.mark.unit
+def test_unpacked_timestamps_match_isoformat():
+    """Test that unpacking formats timestamps exactly as ``isoformat``."""
+    rng = random.Random(0)
+    for _ in range(2000):
+        moment = datetime(1900, 1, 1, tzinfo=timezone.utc) + timedelta(
+            microseconds=rng.randrange(300 * 365 * 86_400 * 10**6)
+        )
+        for value in (moment, moment.replace(microsecond=0)):
+            text = value.isoformat()
+            assert unpack_timestamp(pack_timestamp(text)) == text
+            text = text.replace("+00:00", "Z")
+            assert unpack_timestamp(pack_timestamp(text)) == text
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2023-01-15T08:30:00.12Z",
+        "2023-01-15T09:30:00+01:00",
+        "2023-01-15T08:30:00",
+        "2023-01-15",
+        "not a timestamp",
+        "",
+    ],
+)
+def test_other_timestamps_are_kept(value):
+    """Test that timestamps that would not round-trip are stored as given.
+
+    Args:
+        value: A timestamp in another spelling, or not a timestamp.
+    """
+    assert pack_timestamp(value) == value
+    assert unpack_timestamp(pack_timestamp(value)) == value
+
+
+def _writes(users):
+    """Operations creating, updating and deleting some of ``users``."""
+    ops = [{"op": "add", "user": user, "at": 1.0} for user in users]
+    for index, user in enumerate(users[::7]):
+        changed = {**user, "lastName": "Changed", "updatedAt": store.now_iso()}
+        ops.append({"op": "replace", "user": changed, "at": 2.0 + index})
+    ops.extend({"op": "remove", "id": user["id"], "at": 3.0} for user in users[3::5])
+    return ops
+
+
+def _reads(table):
+    """Everything the backends read from a table."""
+    users = list(table.users.values())
+    return (
+        users,
+        [table.snapshot(user["id"]) for user in users],
+        table.find_by_email(users[1]["email"].upper()),
+        table.page(None, 10),
+        table.page(table.page(None, 10)[1], 10),
+        table.search_page({"lastName": "changed"}, [], None, 5),
+        table.sorted_page("createdAt", None, 5, descending=True),
+        table.sorted_page("lastName", None, 5),
+        table.changes_since(table.generation - 5, 10),
+        list(table.export()),
+    )
+
+
+@pytest.mark.unit
+def test_compact_table_reads_like_dict_table():
+    """Test that a compact table returns exactly what a dict table does."""
+    ops = _writes(generate_users(200))
+    tables = UserTable(), CompactUserTable()
+    for table in tables:
+        for op in ops:
+            table.apply(op)
+        table.flush()
+        assert isinstance(table.clone().users, type(table.users))
+    assert isinstance(tables[1].users, UserRecords)
+    assert _reads(tables[1]) == _reads(tables[0])
+    assert _reads(tables[1].clone()) == _reads(tables[0])
+    assert len(tables[1].users) == len(tables[0].users)
+
+
+@pytest.mark.unit
+def test_backends_use_the_configured_records(settings, tmp_path):
+    """Test that the in-memory backends build the configured table.
+
+    Args:
+        settings: pytest-django settings fixture.
+        tmp_path: Temporary directory for the durable backend.
+    """
+    assert isinstance(MemoryBackend(records="compact").table, CompactUserTable)
+    with pytest.raises(ValueError):
+        MemoryBackend(records="columns")
+    settings.USERS_STORE_RECORDS = "compact"
+    backend = DurableMemoryBackend(str(tmp_path))
+    created = backend.create_user(
+        {"firstName": "Ada", "lastName": "L", "email": "ada@example.com", "phone": ""}
+    )
+    backend.close()
+    backend = DurableMemoryBackend(str(tmp_path))
+    try:
+        assert isinstance(backend.table, CompactUserTable)
+        assert backend.get_user(created["id"]) == created
+    finally:
+        backend.close()
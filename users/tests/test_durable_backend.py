@@ -0,0 +1,161 @@
+"""Tests for the durable in-memory store backend.
+
+This module checks that users written through the backend survive a
+restart, whether they come back from the log, a snapshot or both.
+"""
+
+# pylint: disable=import-error,redefined-outer-name
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from users import store
+from users.backends.durable import DurableMemoryBackend
+
+
+def _user(n):
+    """Build the create payload for the n-th test user."""
+    return {
+        "firstName": f"User{n}",
+        "lastName": "Durable",
+        "email": f"user{n}@example.com",
+        "phone": str(n),
+    }
+
+
+def _state(backend):
+    """Everything a client can observe about the backend's users."""
+    users = backend.list_users()
+    return (
+        users,
+        [backend.get_user_snapshot(user["id"]) for user in users],
+        backend.get_generation(),
+        backend.get_last_modified(),
+        backend.list_users_page(3, 4),
+        backend.get_changes(backend.get_generation() - 3, 10),
+    )
+
+
+@pytest.fixture
+def open_backend(tmp_path):
+    """Provide a factory opening backends on one data directory."""
+    backends = []
+
+    def make(**kwargs):
+        backend = DurableMemoryBackend(str(tmp_path), **kwargs)
+        backends.append(backend)
+        return backend
+
+    yield make
+    for backend in backends:
+        backend.close()
+
+
+def _write_some(backend):
+    """Apply a mix of creates, updates and deletes."""
+    ids = [backend.create_user(_user(n))["id"] for n in range(12)]
+    for uid in ids[::3]:
+        backend.delete_user(uid)
+    for uid in ids[1::3]:
+        backend.update_user(uid, {"lastName": "Updated"})
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("sync", ["commit", "interval", "off"])
+def test_restart_replays_the_log(open_backend, sync):
+    """Test that a reopened backend has the same users, versions and cursors.
+
+    Args:
+        open_backend: Fixture opening backends on one directory.
+        sync (str): The sync mode under test.
+    """
+    backend = open_backend(sync=sync)
+    backend.load(store.SAMPLE_USERS)
+    _write_some(backend)
+    expected = _state(backend)
+    backend.close()
+
+    reopened = open_backend(sync=sync)
+    assert reopened.recovered
+    assert _state(reopened) == expected
+
+
+@pytest.mark.unit
+def test_snapshot_and_log_tail(open_backend, tmp_path):
+    """Test recovery from a snapshot followed by later log records.
+
+    Verifies that a snapshot deletes the log it covers, that writes made
+    after it are replayed on top of it and that the change log survives.
+    """
+    backend = open_backend()
+    backend.seed(store.SAMPLE_USERS)
+    _write_some(backend)
+    backend.snapshot()
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "snapshot-0000000002.bin",
+        "wal-0000000002.log",
+    ]
+    backend.update_user(store.SAMPLE_USERS[0]["id"], {"phone": "after snapshot"})
+    backend.create_user(_user(99))
+    expected = _state(backend)
+    changes = backend.get_changes(0, 100)
+    backend.close()
+
+    reopened = open_backend()
+    assert _state(reopened) == expected
+    assert reopened.find_user_by_email("USER99@example.com")["phone"] == "99"
+    assert reopened.get_changes(0, 100) == changes
+
+
+@pytest.mark.unit
+def test_snapshots_are_taken_automatically(open_backend, tmp_path):
+    """Test that the log is compacted into snapshots as it grows."""
+    backend = open_backend(snapshot_bytes=2048)
+    _write_some(backend)
+    expected = _state(backend)
+    backend.close()
+    assert list(tmp_path.glob("snapshot-*.bin"))
+    assert _state(open_backend()) == expected
+
+
+@pytest.mark.unit
+def test_torn_record_is_discarded(open_backend, tmp_path):
+    """Test that a partial record left by a crash is dropped on recovery."""
+    backend = open_backend()
+    _write_some(backend)
+    expected = _state(backend)
+    backend.close()
+    (segment,) = tmp_path.glob("wal-*.log")
+    with open(segment, "ab") as log:
+        log.write(b"\x40\x00\x00\x00\x00\x00\x00\x00{partial")
+
+    reopened = open_backend()
+    assert _state(reopened) == expected
+    created = reopened.create_user(_user(100))
+    reopened.close()
+    assert open_backend().get_user(created["id"]) == created
+
+
+@pytest.mark.unit
+def test_load_only_seeds_a_new_store(open_backend):
+    """Test that a cleared store stays empty after a restart."""
+    backend = open_backend()
+    backend.load(store.SAMPLE_USERS)
+    assert len(backend.list_users()) == len(store.SAMPLE_USERS)
+    backend.clear_users()
+    backend.close()
+
+    reopened = open_backend()
+    reopened.load(store.SAMPLE_USERS)
+    assert not reopened.list_users()
+
+
+@pytest.mark.unit
+def test_concurrent_commits(open_backend):
+    """Test that concurrent writers sharing fsyncs all reach the log."""
+    backend = open_backend(sync="commit", commit_delay=0.001)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        created = list(pool.map(backend.create_user, map(_user, range(64))))
+    backend.close()
+    reopened = open_backend()
+    assert sorted(user["id"] for user in reopened.list_users()) == sorted(
+        user["id"] for user in created
+    )
@@ -0,0 +1,187 @@
+"""Tests for the pushed change feed at ``/users/events``.
+
+This module drives the async view through Django's ASGI test client and
+checks how subscribers buffer, overflow and catch up.
+"""
+
+# pylint: disable=import-error
+import asyncio
+import json
+import threading
+import pytest
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, Client
+from rest_framework import status
+from users import store
+from users.events import Subscriber, hub
+
+NEW_USER = {
+    "firstName": "Event",
+    "lastName": "User",
+    "email": "event.user@example.com",
+    "phone": "+1234567890",
+}
+
+
+@pytest.fixture(autouse=True)
+def fast_events(settings):
+    """Poll the store often and keep subscriber queues small.
+
+    Args:
+        settings: pytest-django settings fixture.
+    """
+    settings.USERS_EVENTS_POLL_INTERVAL_MS = 5
+    settings.USERS_EVENTS_QUEUE_SIZE = 4
+    settings.USERS_EVENTS_HEARTBEAT_S = 60
+
+
+def _events(chunk: bytes) -> list[tuple[str, dict]]:
+    """Parse the SSE events in a chunk into ``(event, data)`` pairs."""
+    events = []
+    for block in chunk.decode().split("\n\n"):
+        fields = dict(
+            line.split(": ", 1) for line in block.splitlines() if ": " in line
+        )
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.mark.unit
+def test_subscriber_catches_up_after_overflow_or_gap():
+    """Test that a subscriber reads the change log when it cannot keep up."""
+
+    async def scenario():
+        start = store.get_generation()
+        subscriber = Subscriber(start, 2)
+        assert await subscriber.next_changes(0) == []
+        assert not subscriber.lagged
+
+        created = store.create_user(NEW_USER)
+        change = store.get_changes(start, 10)[0][0]
+        subscriber.push(start, [change], start + 1)
+        assert await subscriber.next_changes(0) == [change]
+        assert await subscriber.next_changes(0) is None
+
+        for phone in ("1", "2", "3"):
+            store.update_user(created["id"], {"phone": phone})
+        changes, end, _ = store.get_changes(start + 1, 10)
+        subscriber.push(start + 1, changes, end)
+        assert subscriber.lagged and not subscriber.queue
+        assert [c["seq"] for c in await subscriber.next_changes(0)] == [
+            start + 2,
+            start + 3,
+        ]
+        assert [c["seq"] for c in await subscriber.next_changes(0)] == [start + 4]
+        assert subscriber.position == end and not subscriber.lagged
+
+        store.delete_user(created["id"])
+        subscriber.push(end + 1, [], end + 1)
+        assert subscriber.lagged
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.api
+def test_event_stream():
+    """Test that writes reach an SSE client and that it can resume."""
+
+    async def scenario():
+        seeded = store.get_generation() - len(store.SAMPLE_USERS)
+        response = await AsyncClient().get(
+            "/users/events",
+            {"since": seeded + 8},
+            headers={"accept": "text/event-stream"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "text/event-stream"
+        body = aiter(response.streaming_content)
+        assert await anext(body) == b": connected\n\n"
+        assert [data["user"] for _, data in _events(await anext(body))] == (
+            store.SAMPLE_USERS[8:]
+        )
+
+        created = await sync_to_async(store.create_user)(NEW_USER)
+        events = _events(await asyncio.wait_for(anext(body), 5))
+        assert events == [("created", store.get_changes(seeded + 10, 1)[0][0])]
+        assert events[0][1]["user"] == created
+        assert len(hub) == 1
+        reader = asyncio.create_task(anext(body))
+        await asyncio.sleep(0.01)
+        reader.cancel()  # what the ASGI handler does when the client leaves
+        with pytest.raises(asyncio.CancelledError):
+            await reader
+        assert len(hub) == 0
+
+        await sync_to_async(store.clear_users)()
+        response = await AsyncClient().get(
+            "/users/events",
+            headers={"accept": "text/event-stream", "last-event-id": str(seeded)},
+        )
+        body = aiter(response.streaming_content)
+        await anext(body)
+        assert _events(await anext(body)) == [
+            ("resync", {"next": store.get_generation()})
+        ]
+        with pytest.raises(StopAsyncIteration):
+            await anext(body)
+        assert len(hub) == 0
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.api
+def test_long_poll():
+    """Test the long-poll fallback of ``GET /users/events``."""
+
+    async def scenario():
+        client = AsyncClient()
+        generation = store.get_generation()
+        response = await client.get("/users/events", {"timeout": "0"})
+        assert response.json() == {"changes": [], "next": generation, "more": False}
+
+        async def write_later():
+            await asyncio.sleep(0.05)
+            return await sync_to_async(store.create_user)(NEW_USER)
+
+        writer = asyncio.create_task(write_later())
+        response = await client.get(
+            "/users/events", {"since": generation, "timeout": "5"}
+        )
+        created = await writer
+        assert [change["user"] for change in response.json()["changes"]] == [created]
+        assert response.json()["next"] == generation + 1
+
+        response = await client.get("/users/events", {"since": "0"})
+        assert response.status_code == status.HTTP_410_GONE
+        assert response.json()["resync"] is True
+        for query in ({"timeout": "soon"}, {"since": "\u00b2", "timeout": "0"}):
+            response = await client.get("/users/events", query)
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert len(hub) == 0
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.api
+def test_wsgi_requests_are_refused():
+    """Test that ``GET /users/events`` answers 501 at once outside ASGI.
+
+    Under WSGI, Django would drain the endless event stream before sending
+    anything, so the request runs in a thread that must finish.
+    """
+    responses = []
+
+    def request():
+        client = Client(HTTP_HOST="localhost")
+        responses.append(client.get("/users/events", HTTP_ACCEPT="text/event-stream"))
+        responses.append(client.get("/users/events", {"timeout": "5"}))
+
+    thread = threading.Thread(target=request, daemon=True)
+    thread.start()
+    thread.join(timeout=2)
+    assert not thread.is_alive()
+    assert [response.status_code for response in responses] == [
+        status.HTTP_501_NOT_IMPLEMENTED
+    ] * 2
+    assert len(hub) == 0
@@ -0,0 +1,58 @@
+"""Tests for the ``loadtest`` management command and its load generator."""
+
+# pylint: disable=import-error
+import json
+from io import StringIO
+import pytest
+from django.core.management import CommandError, call_command
+from users import store
+from users.loadtest import parse_mix
+
+
+@pytest.mark.unit
+def test_parse_mix():
+    """Test that mixes parse into weights and bad ones are refused."""
+    assert parse_mix("get=80, patch=20,delete=0") == {
+        "get": 80.0,
+        "patch": 20.0,
+        "delete": 0.0,
+    }
+    for mix in ("get=80,put=20", "get=x", "get=-1", "get=0,list=0"):
+        with pytest.raises(ValueError):
+            parse_mix(mix)
+
+
+@pytest.mark.unit
+def test_command_refuses_bad_options():
+    """Test that a bad mix or URL stops the command before any request."""
+    with pytest.raises(CommandError, match="--mix"):
+        call_command("loadtest", mix="get")
+    with pytest.raises(CommandError, match="--url"):
+        call_command("loadtest", url="https://localhost/api")
+
+
+@pytest.mark.api
+def test_command_loads_live_server(live_server):
+    """Test a seeded run against a live server, every operation succeeding.
+
+    Args:
+        live_server: pytest-django fixture serving the application.
+    """
+    out = StringIO()
+    call_command(
+        "loadtest",
+        url=live_server.url,
+        seed_users=1500,
+        requests=200,
+        concurrency=4,
+        json=True,
+        stdout=out,
+        stderr=StringIO(),
+    )
+    results = json.loads(out.getvalue())
+    assert set(results) == {"list", "get", "create", "patch", "delete", "total"}
+    assert results["total"]["requests"] == 200
+    assert results["total"]["errors"] == 0
+    assert all(results[name]["requests"] > 0 for name in ("get", "create", "patch"))
+    created = 1500 + results["create"]["requests"] - results["delete"]["requests"]
+    assert store.count_users() == len(store.SAMPLE_USERS) + created
@@ -0,0 +1,165 @@
+"""Tests for the users API metrics and their ``/metrics`` endpoint."""
+
+# pylint: disable=import-error,redefined-outer-name
+import asyncio
+import threading
+import pytest
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory
+from users import metrics, store
+from users.cache import clear_caches
+from users.backends.memory import MemoryBackend
+from users.metrics import Histogram, MetricsMiddleware, TimedBackend
+
+
+@pytest.fixture
+def cleared():
+    """Start the test with no observations and empty response caches."""
+    metrics.clear_metrics()
+    clear_caches()
+
+
+def _samples(text: str) -> dict[str, float]:
+    """Parse a Prometheus exposition into ``{series: value}``."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            series, value = line.rsplit(" ", 1)
+            samples[series] = float(value)
+    return samples
+
+
+@pytest.mark.unit
+def test_histogram_adds_up_every_thread():
+    """Test that observations from many threads, live or ended, are summed."""
+    histogram = Histogram("test_seconds", "Test.", ("kind",), buckets=(0.1, 1.0))
+    ready, release = threading.Barrier(5), threading.Event()
+
+    def record(kind):
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, (kind,))
+        ready.wait()
+        release.wait()
+
+    threads = [threading.Thread(target=record, args=(kind,)) for kind in "aabb"]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    expected = pytest.approx([2, 2, 2, 11.1])
+    assert histogram.totals() == {("a",): expected, ("b",): expected}
+    release.set()
+    for thread in threads:
+        thread.join()
+    histogram.observe(0.1, ("a",))
+    totals = histogram.totals()
+    assert totals == {("a",): pytest.approx([3, 2, 2, 11.2]), ("b",): expected}
+    assert len(histogram._shards) == 1  # pylint: disable=protected-access
+
+    lines = histogram.collect()
+    assert lines[:2] == ["# HELP test_seconds Test.", "# TYPE test_seconds histogram"]
+    assert lines[2:5] == [
+        'test_seconds_bucket{kind="a",le="0.1"} 3',
+        'test_seconds_bucket{kind="a",le="1"} 5',
+        'test_seconds_bucket{kind="a",le="+Inf"} 7',
+    ]
+    assert _samples("\n".join(lines[5:7])) == {
+        'test_seconds_sum{kind="a"}': pytest.approx(11.2),
+        'test_seconds_count{kind="a"}': 7,
+    }
+
+
+@pytest.mark.unit
+def test_label_values_are_escaped():
+    """Test that label values cannot break the exposition format."""
+    histogram = Histogram("test_seconds", "Test.", ("view",), buckets=())
+    histogram.observe(1.0, ('a"b\\c\nd',))
+    assert 'test_seconds_count{view="a\\"b\\\\c\\nd"} 1' in histogram.collect()
+
+
+@pytest.mark.unit
+def test_timed_backend_times_store_calls(cleared):
+    """Test that the backend proxy times calls and passes the rest through.
+
+    Args:
+        cleared: Fixture dropping earlier observations and cached responses.
+    """
+    assert cleared is None
+    backend = MemoryBackend()
+    timed = TimedBackend(backend)
+    timed.seed(store.SAMPLE_USERS)
+    assert timed.count_users() == len(store.SAMPLE_USERS)
+    assert timed.get_user(store.SAMPLE_USERS[0]["id"]) == store.SAMPLE_USERS[0]
+    assert timed.table is backend.table and timed.inline_reads
+    totals = metrics.STORE_DURATION.totals()
+    assert sum(totals[("get_user",)][:-1]) == 1
+    assert set(totals) == {("seed",), ("count_users",), ("get_user",)}
+
+
+@pytest.mark.unit
+def test_middleware_times_async_requests(cleared):
+    """Test that the middleware stays async in an async stack.
+
+    Args:
+        cleared: Fixture dropping earlier observations and cached responses.
+    """
+    assert cleared is None
+
+    async def get_response(_request):
+        return HttpResponse(status=204)
+
+    middleware = MetricsMiddleware(get_response)
+    assert asyncio.iscoroutinefunction(middleware)
+    response = asyncio.run(middleware(RequestFactory().generic("BREW", "/pot")))
+    assert response.status_code == 204
+    assert list(metrics.REQUEST_DURATION.totals()) == [("unmatched", "other", "204")]
+
+
+@pytest.mark.unit
+def test_middleware_is_removed_when_disabled(settings):
+    """Test that ``USERS_METRICS`` off takes the middleware out of the stack.
+
+    Args:
+        settings: pytest-django settings fixture.
+    """
+    settings.USERS_METRICS = False
+    with pytest.raises(MiddlewareNotUsed):
+        MetricsMiddleware(HttpResponse)
+
+
+@pytest.mark.api
+def test_metrics_endpoint(api_client, cleared):
+    """Test that requests, store calls and serialization show in /metrics.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+        cleared: Fixture dropping earlier observations and cached responses.
+    """
+    assert cleared is None
+    uid = store.SAMPLE_USERS[0]["id"]
+    api_client.get("/users")
+    api_client.get(f"/user/{uid}")
+    api_client.get(f"/user/{uid}")
+    api_client.post(
+        "/user",
+        {"firstName": "A", "lastName": "B", "email": "a@b.com", "phone": "1"},
+        format="json",
+    )
+    response = api_client.get("/metrics")
+    assert response.status_code == 200
+    assert response["Content-Type"] == metrics.CONTENT_TYPE
+    samples = _samples(response.content.decode())
+
+    request = "users_http_request_duration_seconds_count"
+    assert samples[f'{request}{{view="users-list",method="GET",status="200"}}'] == 1
+    assert samples[f'{request}{{view="user-detail",method="GET",status="200"}}'] == 2
+    assert samples[f'{request}{{view="user-create",method="POST",status="201"}}'] == 1
+    operation = "users_store_operation_duration_seconds_count"
+    assert samples[f'{operation}{{operation="create_user"}}'] == 1
+    serialization = "users_serialization_duration_seconds_count"
+    assert samples[f'{serialization}{{operation="parse"}}'] == 1
+    assert samples[f'{serialization}{{operation="render"}}'] >= 3
+    assert samples["users_store_users"] == len(store.SAMPLE_USERS) + 1
+    assert samples["users_events_subscribers"] == 0
+    assert samples['users_response_cache_hits_total{cache="user-detail"}'] == 1
+    assert samples['users_response_cache_entries{cache="users-list"}'] == 1
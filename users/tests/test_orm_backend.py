@@ -0,0 +1,180 @@
+"""Tests for the database-backed store backend.
+
+This module runs the store operations and the user endpoints against the
+ORM backend to check it behaves like the in-memory one.
+"""
+
+# pylint: disable=import-error,redefined-outer-name
+import pytest
+from rest_framework import status
+from users import store
+from users.backends.orm import OrmBackend
+
+pytestmark = pytest.mark.django_db
+
+NEW_USER = {
+    "firstName": "John",
+    "lastName": "Doe",
+    "email": "john.doe@example.com",
+    "phone": "+1234567890",
+}
+
+
+@pytest.fixture
+def orm_backend():
+    """Make the ORM backend the active store backend, seeded with samples."""
+    backend = OrmBackend()
+    backend.reset_and_seed(store.SAMPLE_USERS)
+    previous = store.set_backend(backend)
+    yield backend
+    store.set_backend(previous)
+
+
+@pytest.mark.unit
+def test_crud_and_versions(orm_backend):
+    """Test create, read, update and delete through the ORM backend.
+
+    Verifies that versions follow the store generation and that email
+    uniqueness ignores case.
+    """
+    created = orm_backend.create_user(NEW_USER)
+    user, version = orm_backend.get_user_snapshot(created["id"])
+    assert user == created
+    assert version == orm_backend.get_generation()
+    assert orm_backend.find_user_by_email("JOHN.DOE@example.com") == created
+    assert orm_backend.get_users(["not-a-uuid", created["id"]]) == [None, created]
+    with pytest.raises(store.DuplicateEmailError):
+        orm_backend.create_user({**NEW_USER, "email": "John.Doe@Example.com"})
+
+    updated = orm_backend.update_user(
+        created["id"], {"phone": "+1987654321"}, if_versions={version}
+    )
+    assert updated["phone"] == "+1987654321"
+    assert orm_backend.get_user_version(created["id"]) > version
+    with pytest.raises(store.VersionConflictError):
+        orm_backend.update_user(created["id"], {"phone": "x"}, if_versions={version})
+    with pytest.raises(store.DuplicateEmailError):
+        orm_backend.update_user(created["id"], {"email": "emma.johnson@email.com"})
+
+    assert orm_backend.delete_user(created["id"]) is True
+    assert orm_backend.get_user(created["id"]) is None
+    assert orm_backend.delete_user(created["id"]) is False
+    assert orm_backend.update_user("not-a-uuid", {"phone": "x"}) is None
+
+
+@pytest.mark.unit
+def test_keyset_pages(orm_backend):
+    """Test that keyset pages, plain or searched, follow insertion order."""
+    expected = [user["id"] for user in orm_backend.list_users()]
+    assert expected == [user["id"] for user in store.SAMPLE_USERS]
+
+    seen, position = [], None
+    while True:
+        page, position = orm_backend.list_users_page(4, position)
+        seen.extend(user["id"] for user in page)
+        if position is None:
+            break
+    assert seen == expected
+
+    users, position = orm_backend.search_users_page({}, ["WIL"], 2)
+    assert [user["firstName"] for user in users] == ["Liam", "Ethan"]
+    users, position = orm_backend.search_users_page({}, ["wil"], 2, position)
+    assert [user["firstName"] for user in users] == ["William"]
+    assert position is None
+    users, _ = orm_backend.search_users_page({"lastName": "w", "firstName": "e"}, [], 5)
+    assert [user["firstName"] for user in users] == ["Ethan"]
+
+
+@pytest.mark.unit
+def test_sorted_pages(orm_backend):
+    """Test that sorted pages match the in-memory backend's order."""
+    names, position = [], None
+    while True:
+        users, position = orm_backend.sorted_users_page(
+            "updatedAt", 3, position, descending=True, prefixes={}, terms=[]
+        )
+        names.extend(user["firstName"] for user in users)
+        if position is None:
+            break
+    assert names[:4] == ["Mason", "Noah", "William", "Ava"]
+    assert len(names) == len(store.SAMPLE_USERS)
+
+    since = store.sort_key("updatedAt", "2023-09-12T10:18:40Z")
+    users, _ = orm_backend.sorted_users_page(
+        "updatedAt", 10, start=since, prefixes={}, terms=[]
+    )
+    assert [user["firstName"] for user in users] == ["Ava", "William", "Noah", "Mason"]
+    users, _ = orm_backend.sorted_users_page(
+        "lastName", 10, descending=True, prefixes={}, terms=["wil"]
+    )
+    assert [user["lastName"] for user in users] == ["Wilson", "Williams", "Thomas"]
+
+
+@pytest.mark.api
+def test_api_with_orm_backend(api_client, orm_backend):
+    """Test the user endpoints end to end on the ORM backend.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+        orm_backend: Fixture activating the ORM backend.
+    """
+    response = api_client.post("/user", data=NEW_USER)
+    assert response.status_code == status.HTTP_201_CREATED
+    uid = response.json()["id"]
+
+    detail = api_client.get(f"/user/{uid}")
+    assert detail.json()["email"] == NEW_USER["email"]
+    response = api_client.patch(
+        f"/user/{uid}", data={"lastName": "Smith"}, HTTP_IF_MATCH=detail["ETag"]
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert orm_backend.get_user(uid)["lastName"] == "Smith"
+
+    assert len(api_client.get("/users").json()) == len(store.SAMPLE_USERS) + 1
+    assert api_client.delete(f"/user/{uid}").status_code == 204
+
+
+@pytest.mark.unit
+def test_change_log(orm_backend, settings):
+    """Test the ORM change log, including its bound and resync signal."""
+    generation = orm_backend.get_generation()
+    created = orm_backend.create_user(NEW_USER)
+    orm_backend.update_user(created["id"], {"phone": "+1987654321"})
+    orm_backend.delete_user(created["id"])
+    changes, position, more = orm_backend.get_changes(generation, 10)
+    assert [change["type"] for change in changes] == ["created", "updated", "deleted"]
+    assert changes[0]["user"] == created and changes[2]["user"] is None
+    assert (position, more) == (generation + 3, False)
+    assert orm_backend.get_changes(generation, 1)[1:] == (generation + 1, True)
+
+    settings.USERS_CHANGE_LOG_SIZE = 2
+    with pytest.raises(store.ChangesExpiredError):
+        orm_backend.get_changes(generation, 10)
+    orm_backend.clear_users()
+    with pytest.raises(store.ChangesExpiredError):
+        orm_backend.get_changes(generation + 3, 10)
+
+
+@pytest.mark.unit
+def test_batches_roll_back_failed_items_only(orm_backend):
+    """Test that a failing item in a batch leaves the other items applied."""
+    results = orm_backend.create_users(
+        [NEW_USER, {**NEW_USER, "email": "JOHN.DOE@example.com"}, {"firstName": "X"}]
+    )
+    assert isinstance(results[1], store.DuplicateEmailError)
+    assert isinstance(results[2], KeyError)
+    assert orm_backend.count_users() == len(store.SAMPLE_USERS) + 1
+    uid = results[0]["id"]
+    assert orm_backend.get_user(uid) == results[0]
+
+    results = orm_backend.update_users(
+        [
+            (uid, {"email": "emma.johnson@email.com"}),
+            (uid, {"phone": 1}),
+            (uid, {"phone": "+1987654321"}),
+        ]
+    )
+    assert isinstance(results[0], store.DuplicateEmailError)
+    assert isinstance(results[1], TypeError)
+    assert orm_backend.get_user(uid)["phone"] == "+1987654321"
+    assert orm_backend.delete_users([uid, uid]) == [True, False]
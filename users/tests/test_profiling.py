@@ -0,0 +1,151 @@
+"""Tests for request profiling and the ``/profiles`` endpoints."""
+
+# pylint: disable=import-error,redefined-outer-name
+import asyncio
+import cProfile
+import marshal
+import pytest
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import Client, RequestFactory
+from users import store
+from users.profiling import ProfileRing, ProfilingMiddleware
+
+pytestmark = pytest.mark.urls("users.tests.profiling_urls")
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    """Turn profiling on, keeping three profiles in a temporary directory.
+
+    Args:
+        settings: pytest-django settings fixture.
+        tmp_path: pytest temporary directory fixture.
+
+    Returns:
+        Client: A test client whose middleware includes the profiler.
+    """
+    settings.USERS_PROFILING = True
+    settings.USERS_PROFILING_DIR = str(tmp_path)
+    settings.USERS_PROFILING_KEEP = 3
+    return Client(HTTP_HOST="localhost")
+
+
+def _work():
+    return sum(range(1000))
+
+
+@pytest.mark.unit
+def test_ring_keeps_the_newest_profiles(tmp_path):
+    """Test that saving beyond ``keep`` drops the oldest profiles.
+
+    Args:
+        tmp_path: pytest temporary directory fixture.
+    """
+    ring = ProfileRing(tmp_path, keep=2)
+    ids = []
+    for number in range(3):
+        profiler = cProfile.Profile()
+        profiler.runcall(_work)
+        ids.append(ring.save(profiler, {"number": number}))
+    assert [profile["number"] for profile in ring.index()] == [2, 1]
+    assert ring.path(ids[0]) is None
+    assert len(list(tmp_path.iterdir())) == 2 * 2
+    stats = marshal.loads(ring.path(ids[2]).read_bytes())
+    assert any(func[2] == "_work" for func in stats)
+    assert ring.path("../x") is None
+
+
+@pytest.mark.unit
+def test_middleware_is_removed_when_disabled():
+    """Test that ``USERS_PROFILING`` off, the default, leaves no middleware."""
+    with pytest.raises(MiddlewareNotUsed):
+        ProfilingMiddleware(HttpResponse)
+
+
+@pytest.mark.unit
+def test_middleware_profiles_async_requests(profiling):
+    """Test that the middleware stays async and profiles flagged requests.
+
+    Args:
+        profiling: Fixture turning profiling on.
+    """
+    assert profiling is not None
+
+    async def get_response(_request):
+        await asyncio.sleep(0)
+        return HttpResponse(status=204)
+
+    middleware = ProfilingMiddleware(get_response)
+    assert asyncio.iscoroutinefunction(middleware)
+    factory = RequestFactory()
+    response = asyncio.run(middleware(factory.get("/pot")))
+    assert not response.has_header("X-Profile-Id")
+    response = asyncio.run(middleware(factory.get("/pot", HTTP_X_PROFILE="1")))
+    assert response.has_header("X-Profile-Id")
+
+
+@pytest.mark.api
+def test_profiled_requests_are_listed_and_served(profiling):
+    """Test the profiles of flagged requests in ``/profiles``.
+
+    Args:
+        profiling: Fixture turning profiling on.
+    """
+    uid = store.SAMPLE_USERS[0]["id"]
+    assert not profiling.get(f"/user/{uid}").has_header("X-Profile-Id")
+    assert profiling.get("/profiles").json() == {"profiles": []}
+
+    ids = [
+        profiling.get("/users", {"profile": "1"})["X-Profile-Id"],
+        *(
+            profiling.get(f"/user/{uid}", HTTP_X_PROFILE="1")["X-Profile-Id"]
+            for _ in range(3)
+        ),
+    ]
+    profiles = profiling.get("/profiles").json()["profiles"]
+    assert [profile["id"] for profile in profiles] == ids[:0:-1]
+    newest = profiles[0]
+    assert newest["method"] == "GET" and newest["path"] == f"/user/{uid}"
+    assert newest["status"] == 200 and newest["durationMs"] > 0
+
+    report = profiling.get(newest["text"], {"sort": "tottime"})
+    assert report["Content-Type"].startswith("text/plain")
+    assert "(get)" in report.content.decode()
+    assert profiling.get(newest["text"], {"sort": "nope"}).status_code == 400
+    dump = profiling.get(newest["pstats"])
+    assert dump["Content-Disposition"].startswith("attachment")
+    stats = marshal.loads(b"".join(dump.streaming_content))
+    assert any(func[2] == "get" for func in stats)
+    assert profiling.get(f"/profiles/{ids[0]}/text").status_code == 404
+    assert profiling.get(f"/profiles/{ids[1]}/svg").status_code == 404
+
+
+@pytest.mark.api
+def test_token_guards_profiling_and_profiles(profiling, settings):
+    """Test that with a token, only requests sending it are profiled or listed.
+
+    Requests for the profiles, which send the token, are not profiled.
+
+    Args:
+        profiling: Fixture turning profiling on.
+        settings: pytest-django settings fixture.
+    """
+    settings.USERS_PROFILING_TOKEN = "s3cret"
+    assert not profiling.get("/users", {"profile": "1"}).has_header("X-Profile-Id")
+    assert profiling.get("/users", {"profile": "s3cret"}).has_header("X-Profile-Id")
+    assert profiling.get("/profiles").status_code == 404
+    for _ in range(2):
+        response = profiling.get("/profiles", HTTP_X_PROFILE="s3cret")
+        assert not response.has_header("X-Profile-Id")
+        assert len(response.json()["profiles"]) == 1
+
+
+@pytest.mark.api
+def test_profiles_are_hidden_when_disabled(api_client):
+    """Test that ``/profiles`` answers 404 with profiling off.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    assert api_client.get("/profiles").status_code == 404
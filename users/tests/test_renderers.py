@@ -0,0 +1,140 @@
+"""Tests for the JSON renderer and parser of the users API.
+
+Each is compared with DRF's own ``JSONRenderer`` / ``JSONParser``, with
+``orjson`` and with the stdlib fallback used when it is not installed.
+"""
+
+# pylint: disable=import-error,redefined-outer-name
+import datetime
+import decimal
+import io
+import uuid
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+from users import renderers, store
+from users.renderers import UsersJSONParser, UsersJSONRenderer
+
+RENDERED = [
+    None,
+    [],
+    store.SAMPLE_USERS,
+    {"firstName": "Zoë", "lastName": "Ñúñez 中文 😀", "phone": None},
+    {"bio": "line\u2028para\u2029end", "n": [1, -2.5, True, False]},
+    ReturnDict(
+        {"email": [ErrorDetail("Enter a valid email.", code="invalid")]},
+        serializer=None,
+    ),
+    ReturnList([{"id": 1}], serializer=None),
+    {"at": datetime.datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.UTC)},
+    {"day": datetime.date(2024, 1, 2), "span": datetime.timedelta(seconds=90)},
+    {"amount": decimal.Decimal("1.50"), "id": uuid.UUID(int=1)},
+    {1: "int key", "tuple": (1, 2), "lazy": gettext_lazy("Not found.")},
+    {"big": 2**70, "bytes": b"raw"},
+]
+
+PARSED = [
+    b'{"firstName":"John","email":"john@example.com"}',
+    '{"firstName":"Zoë","bio":"\u2028"}'.encode(),
+    b'[1, 2.5, -3e2, true, false, null, "x"]',
+    b'{"phone": 123456789012345678901234567890}',
+    b'{"firstName": "\\ud800"}',
+    b'{"a": 1, "a": 2}',
+    b'"\xef\xbb\xbf{}"',
+    b"\xef\xbb\xbf{}",
+    b'{"n": NaN}',
+    b'{"n": 1e400}',
+    b"{not json",
+    b"\xff\xfe",
+    b"",
+]
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def codec(request, monkeypatch):
+    """Run the test with orjson and with the stdlib fallback."""
+    if request.param == "orjson" and renderers.orjson is None:
+        pytest.skip("orjson is not installed")
+    if request.param == "stdlib":
+        monkeypatch.setattr(renderers, "orjson", None)
+    return request.param
+
+
+def _parse(parser, body: bytes, encoding: str = "utf-8"):
+    """Parse ``body``, returning the result or the ParseError message."""
+    try:
+        return parser.parse(io.BytesIO(body), parser_context={"encoding": encoding})
+    except ParseError as exc:
+        return ParseError, str(exc.detail)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("data", RENDERED)
+def test_renderer_matches_drf(codec, data):
+    """Test that the renderer's bytes are DRF's.
+
+    Args:
+        codec: ``orjson`` or ``stdlib``.
+        data: The data to render.
+    """
+    assert codec
+    for media_type in ("application/json", "application/json; indent=2"):
+        expected = JSONRenderer().render(data, media_type)
+        assert UsersJSONRenderer().render(data, media_type) == expected
+
+
+@pytest.mark.unit
+def test_renderer_errors_match_drf(codec):
+    """Test that data DRF cannot render fails the same way.
+
+    Args:
+        codec: ``orjson`` or ``stdlib``.
+    """
+    assert codec
+    for data, error in ((object(), TypeError), (float("nan"), ValueError)):
+        with pytest.raises(error):
+            JSONRenderer().render([data])
+        if codec == "orjson" and error is ValueError:
+            continue  # orjson writes NaN as null
+        with pytest.raises(error):
+            UsersJSONRenderer().render([data])
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("body", PARSED)
+def test_parser_matches_drf(codec, body):
+    """Test that the parser's results and errors are DRF's.
+
+    Args:
+        codec: ``orjson`` or ``stdlib``.
+        body: The request body.
+    """
+    assert codec
+    for encoding in ("utf-8", "latin-1"):
+        expected = _parse(JSONParser(), body, encoding)
+        assert _parse(UsersJSONParser(), body, encoding) == expected
+
+
+@pytest.mark.api
+def test_api_uses_the_users_codec(api_client):
+    """Test that the API renders and parses through the users codec.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    response = api_client.post(
+        "/user",
+        '{"firstName": "Zoë", "lastName": "a\u2028b",'
+        ' "email": "zoe@example.com", "phone": "+1"}',
+        content_type="application/json",
+    )
+    assert response.status_code == 201
+    assert b'"firstName":"Zo\xc3\xab"' in response.content
+    assert b'"lastName":"a\\u2028b"' in response.content
+    response = api_client.post("/user", "{", content_type="application/json")
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("JSON parse error - ")
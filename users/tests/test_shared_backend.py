@@ -0,0 +1,114 @@
+"""Tests for the cross-process shared store backend.
+
+This module checks that writes made through one backend instance, or one
+process, are visible to every other instance attached to the same log.
+"""
+
+# pylint: disable=import-error,redefined-outer-name
+import multiprocessing
+import pytest
+from users import store
+from users.backends.shared import SharedMemoryBackend
+
+
+def _user(n):
+    """Build the create payload for the n-th test user."""
+    return {
+        "firstName": f"User{n}",
+        "lastName": "Shared",
+        "email": f"user{n}@example.com",
+        "phone": str(n),
+    }
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    """Provide a fresh shared log path."""
+    return str(tmp_path / "users.log")
+
+
+@pytest.fixture
+def attach(log_path):
+    """Provide a factory attaching new backends to the shared log."""
+    backends = []
+
+    def make(**kwargs):
+        backend = SharedMemoryBackend(log_path, **kwargs)
+        backends.append(backend)
+        return backend
+
+    yield make
+    for backend in backends:
+        backend.close()
+
+
+def _create_in_child(log_path, count):
+    """Create users through a backend opened in a separate process."""
+    backend = SharedMemoryBackend(log_path)
+    for n in range(count):
+        backend.create_user(_user(n))
+    backend.close()
+
+
+@pytest.mark.unit
+def test_writes_are_visible_to_other_instances(attach):
+    """Test that two backends on one log see the same data and versions.
+
+    Verifies creates, updates, deletes and email uniqueness across
+    instances, which stand in for separate worker processes.
+    """
+    first, second = attach(), attach()
+    first.seed(store.SAMPLE_USERS)
+    second.seed(store.SAMPLE_USERS)
+    assert len(second.list_users()) == len(store.SAMPLE_USERS)
+
+    created = first.create_user(_user(1))
+    assert second.get_user(created["id"]) == created
+    with pytest.raises(store.DuplicateEmailError):
+        second.create_user(_user(1))
+
+    second.update_user(created["id"], {"phone": "42"})
+    assert first.get_user(created["id"])["phone"] == "42"
+    assert first.get_user_snapshot(created["id"]) == second.get_user_snapshot(
+        created["id"]
+    )
+    assert first.get_generation() == second.get_generation()
+
+    first.delete_user(created["id"])
+    assert second.get_user(created["id"]) is None
+    assert attach().list_users() == first.list_users()
+
+
+@pytest.mark.unit
+def test_compaction_keeps_replicas_consistent(attach):
+    """Test that readers follow the log through compactions.
+
+    Verifies that a tiny compaction threshold rewrites the log while the
+    other instance keeps serving the same users, versions and cursors.
+    """
+    writer, reader = attach(compact_bytes=2048), attach()
+    ids = [writer.create_user(_user(n))["id"] for n in range(20)]
+    for uid in ids[::2]:
+        writer.delete_user(uid)
+    for uid in ids[1::2]:
+        writer.update_user(uid, {"lastName": "Compacted"})
+
+    assert reader.list_users() == writer.list_users()
+    assert reader.get_generation() == writer.get_generation()
+    assert reader.list_users_page(3, 5) == writer.list_users_page(3, 5)
+    assert attach().list_users() == writer.list_users()
+    assert attach().get_changes(0, 100) == writer.get_changes(0, 100)
+
+
+@pytest.mark.unit
+def test_writes_from_another_process(attach, log_path):
+    """Test that a user created by another process can be read here."""
+    backend = attach()
+    context = multiprocessing.get_context("fork")
+    child = context.Process(target=_create_in_child, args=(log_path, 5))
+    child.start()
+    child.join(timeout=30)
+    assert child.exitcode == 0
+    assert [user["email"] for user in backend.list_users()] == [
+        f"user{n}@example.com" for n in range(5)
+    ]
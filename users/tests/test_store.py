@@ -0,0 +1,318 @@
+"""Tests for the in-memory user store.
+
+This module contains unit tests for the functions in users.store, covering
+lookup, update and delete by id and the ordering of listed users.
+"""
+
+# pylint: disable=import-error
+import pytest
+from users import store
+from users.backends import indexes, memory
+
+NEW_USER = {
+    "firstName": "John",
+    "lastName": "Doe",
+    "email": "john.doe@example.com",
+    "phone": "+1234567890",
+}
+
+
+@pytest.mark.unit
+def test_list_users_preserves_insertion_order():
+    """Test that listed users come back in the order they were created.
+
+    Verifies that deleting and updating users does not reorder the
+    remaining ones and that new users are appended at the end.
+    """
+    ids = [user["id"] for user in store.list_users()]
+    store.delete_user(ids[3])
+    store.update_user(ids[5], {"firstName": "Changed"})
+    created = store.create_user(NEW_USER)
+
+    listed = [user["id"] for user in store.list_users()]
+    assert listed == ids[:3] + ids[4:] + [created["id"]]
+
+
+@pytest.mark.unit
+def test_get_update_and_delete_by_id():
+    """Test the lookup, update and delete paths for a single user.
+
+    Verifies that a user can be fetched, updated and deleted by id, and
+    that missing ids are reported as None/False.
+    """
+    created = store.create_user(NEW_USER)
+    assert store.get_user(created["id"]) is created
+
+    updated = store.update_user(created["id"], {"phone": "+1987654321"})
+    assert updated["phone"] == "+1987654321"
+    assert store.get_user(created["id"])["phone"] == "+1987654321"
+
+    assert store.delete_user(created["id"]) is True
+    assert store.get_user(created["id"]) is None
+    assert store.delete_user(created["id"]) is False
+    assert store.update_user(created["id"], {"phone": "x"}) is None
+
+
+@pytest.mark.unit
+def test_email_index_tracks_writes():
+    """Test that the email index follows create, update and delete.
+
+    Verifies that duplicates are rejected regardless of case and that an
+    address becomes available again once its owner changes or is deleted.
+    """
+    created = store.create_user(NEW_USER)
+    assert store.find_user_by_email("JOHN.DOE@example.com") is created
+
+    with pytest.raises(store.DuplicateEmailError):
+        store.create_user({**NEW_USER, "email": "John.Doe@Example.com"})
+
+    store.update_user(created["id"], {"email": "john@example.com"})
+    assert store.find_user_by_email("john.doe@example.com") is None
+    assert store.find_user_by_email("john@example.com")["id"] == created["id"]
+
+    store.delete_user(created["id"])
+    assert store.find_user_by_email("john@example.com") is None
+    store.clear_users()
+    assert store.find_user_by_email("emma.johnson@email.com") is None
+
+
+@pytest.mark.unit
+def test_list_users_page_survives_compaction(monkeypatch):
+    """Test keyset pages across deletes that trigger index compaction.
+
+    Verifies that a position handed out before a compaction still resumes
+    at the right user afterwards.
+    """
+    monkeypatch.setattr(memory, "_COMPACT_MIN_DEAD", 2)
+    ids = [user["id"] for user in store.list_users()]
+
+    first, position = store.list_users_page(4)
+    assert [user["id"] for user in first] == ids[:4]
+    for uid in ids[:3] + ids[5:8]:
+        store.delete_user(uid)
+
+    rest, position = store.list_users_page(10, position)
+    assert [user["id"] for user in rest] == [ids[4], ids[8], ids[9]]
+    assert position is None
+
+
+@pytest.mark.unit
+def test_generation_and_versions_advance_on_writes():
+    """Test that every write moves the store generation forward.
+
+    Verifies that the written user's version follows the generation and
+    that other users keep their versions.
+    """
+    other = store.list_users()[0]["id"]
+    other_version = store.get_user_version(other)
+
+    generation = store.get_generation()
+    created = store.create_user(NEW_USER)
+    assert store.get_generation() > generation
+    assert store.get_user_version(created["id"]) == store.get_generation()
+
+    generation = store.get_generation()
+    store.update_user(created["id"], {"firstName": "Jack"})
+    assert store.get_user_version(created["id"]) == store.get_generation()
+    assert store.get_generation() > generation
+
+    store.delete_user(created["id"])
+    assert store.get_user_version(created["id"]) is None
+    assert store.get_user_version(other) == other_version
+
+
+@pytest.mark.unit
+def test_search_indexes_track_writes():
+    """Test that prefix search follows create, update and delete.
+
+    Verifies that filters ignore case, that terms may match any searchable
+    field and that every filter has to match.
+    """
+
+    def search(prefixes=None, terms=()):
+        users, _ = store.search_users_page(prefixes or {}, list(terms), 100)
+        return [user["firstName"] for user in users]
+
+    assert search(terms=["WIL"]) == ["Liam", "Ethan", "William"]
+    assert search(terms=["wil", "liam"]) == ["Liam"]
+    assert search({"lastName": "w", "firstName": "E"}) == ["Ethan"]
+
+    created = store.create_user({**NEW_USER, "lastName": "Wilde"})
+    assert search(terms=["wil"])[-1] == "John"
+    store.update_user(created["id"], {"lastName": "Doe"})
+    assert "John" not in search(terms=["wil"])
+    assert search({"lastName": "do"}) == ["John"]
+    store.delete_user(created["id"])
+    assert not search({"lastName": "do"})
+
+
+@pytest.mark.unit
+def test_search_pages_walk_broad_filters_and_sort_selective_ones():
+    """Test that both ways of paging a search return the same users.
+
+    A filter most users pass is applied while walking insertion order; a
+    rare one is answered from the indexes. Either way, every match comes
+    back once, in insertion order, across pages.
+    """
+    table = memory.UserTable()
+    for n in range(300):
+        last = "Rare" if n % 50 == 7 else "Common"
+        user = {**NEW_USER, "id": f"u{n:03d}", "lastName": last, "email": f"{n}@x.io"}
+        user["createdAt"] = user["updatedAt"] = "2024-01-01T00:00:00+00:00"
+        table.add(user, 0.0)
+    table.flush()
+
+    def search(prefixes, terms):
+        ids, after = [], None
+        while True:
+            users, after = table.search_page(prefixes, terms, after, 7)
+            ids.extend(user["id"] for user in users)
+            if after is None:
+                return ids
+
+    common = [n for n in range(300) if n % 50 != 7]
+    assert search({"lastName": "com"}, []) == [f"u{n:03d}" for n in common]
+    assert search({}, ["rar"]) == [f"u{n:03d}" for n in range(7, 300, 50)]
+    # Emails start with the user's number.
+    thirties = [f"u{n:03d}" for n in common if str(n).startswith("3")]
+    assert search({"firstName": "jo"}, ["comm", "3"]) == thirties
+
+
+def _walk(field, descending=False, start=None, **filters):
+    """First names of every user on the sorted pages, three at a time."""
+    names, position = [], None
+    while True:
+        users, position = store.sorted_users_page(
+            field, 3, position, descending=descending, start=start, **filters
+        )
+        names.extend(user["firstName"] for user in users)
+        if position is None:
+            return names
+
+
+@pytest.mark.unit
+def test_sorted_pages_track_writes():
+    """Test ordered and range pages over the sorted indexes.
+
+    Verifies that pages follow each field's order in both directions,
+    that ``start`` bounds the walk and that writes move users at once.
+    """
+    assert _walk("lastName")[:3] == ["Isabella", "Sophia", "Noah"]
+    newest = ["Mason", "Noah", "William", "Ava", "Liam", "Isabella"]
+    assert _walk("updatedAt", descending=True)[:6] == newest
+    since = store.sort_key("updatedAt", "2023-09-12T10:18:40+00:00")
+    assert _walk("updatedAt", start=since) == ["Ava", "William", "Noah", "Mason"]
+    assert _walk("createdAt", terms=["wil"]) == ["Ethan", "Liam", "William"]
+
+    emma = store.find_user_by_email("emma.johnson@email.com")
+    store.update_user(emma["id"], {"lastName": "Aaron"})
+    assert _walk("updatedAt", descending=True)[0] == "Emma"
+    assert _walk("lastName")[0] == "Emma"
+    store.delete_user(emma["id"])
+    assert "Emma" not in _walk("createdAt")
+    created = store.create_user(NEW_USER)
+    assert _walk("createdAt", descending=True)[0] == created["firstName"]
+
+
+@pytest.mark.unit
+def test_sorted_index_scans_across_chunks(monkeypatch):
+    """Test ``SortedIndex`` against a plain sorted list with tiny chunks.
+
+    Verifies that additions show only once flushed and that a scan keeps
+    reading the version it started on while the index changes.
+    """
+    monkeypatch.setattr(indexes, "_CHUNK", 2)
+    index, expected = indexes.SortedIndex(), []
+    for n in [5, 3, 9, 1, 7, 2, 8, 6, 4, 0] * 2:
+        entry = (n, len(expected))
+        index.add(entry)
+        expected.append(entry)
+        if n % 3 == 0:
+            index.remove(expected.pop(0))
+    index.add((10, 0))
+    expected.append((10, 0))
+    assert (10, 0) not in index.scan()
+    index.flush()
+    expected.sort()
+    assert list(index.scan()) == expected
+    assert list(index.scan((6,))) == [entry for entry in expected if entry >= (6,)]
+    below = [entry for entry in expected if entry < (6,)]
+    assert list(index.scan((6,), descending=True)) == below[::-1]
+    assert list(index.scan(descending=True)) == expected[::-1]
+    assert max(len(chunk) for chunk in index.layout[0]) <= 4
+
+    scan = index.scan()
+    first = next(scan)
+    for entry in expected[1:]:
+        index.remove(entry)
+    index.add((-1, 0))
+    index.flush()
+    assert [first, *scan] == expected
+    assert list(index.scan()) == [(-1, 0), first]
+
+
+@pytest.mark.unit
+def test_change_log_is_bounded():
+    """Test that old changes are dropped and cursors before them expire.
+
+    Verifies that the log keeps the last ``change_log_size`` generations,
+    records deletes as tombstones and restarts after a clear.
+    """
+    backend = memory.MemoryBackend(change_log_size=3)
+    created = [
+        backend.create_user({**NEW_USER, "email": f"{n}@x.io"}) for n in range(4)
+    ]
+    backend.delete_user(created[0]["id"])
+    with pytest.raises(store.ChangesExpiredError) as expired:
+        backend.get_changes(1, 10)
+    assert expired.value.generation == 5
+
+    changes, position, more = backend.get_changes(2, 10)
+    assert [(change["type"], change["seq"]) for change in changes] == [
+        ("created", 3),
+        ("created", 4),
+        ("deleted", 5),
+    ]
+    assert changes[-1]["user"] is None and changes[0]["user"] == created[2]
+    assert (position, more) == (5, False)
+
+    backend.clear_users()
+    with pytest.raises(store.ChangesExpiredError):
+        backend.get_changes(5, 10)
+    assert backend.get_changes(6, 10) == ([], 6, False)
+
+
+@pytest.mark.unit
+def test_create_users_reports_bad_items_without_failing_the_batch():
+    """Test that a malformed item gets an error while the others are created."""
+    results = store.create_users(
+        [
+            {"firstName": "A", "email": "a@example.com"},
+            {"firstName": "B"},
+            {"firstName": "C", "email": "c@example.com", "phone": "1"},
+        ]
+    )
+    assert isinstance(results[1], KeyError)
+    assert [results[0]["lastName"], results[0]["phone"]] == ["", ""]
+    assert store.get_user(results[2]["id"])["phone"] == "1"
+    assert store.count_users() == len(store.SAMPLE_USERS) + 2
+
+
+@pytest.mark.unit
+def test_update_users_reports_bad_items_without_failing_the_batch():
+    """Test that a malformed item gets an error while the others are updated."""
+    ids = [user["id"] for user in store.list_users()[:2]]
+    before = store.get_user(ids[1])
+    results = store.update_users(
+        [
+            (ids[0], {"lastName": "A"}),
+            (ids[1], None),
+            (ids[1], {"firstName": "B", "phone": 1}),
+            (ids[0], {"phone": "1"}),
+        ]
+    )
+    assert isinstance(results[1], TypeError)
+    assert isinstance(results[2], TypeError)
+    assert store.get_user(ids[1]) == before
+    assert [results[3]["lastName"], results[3]["phone"]] == ["A", "1"]
+    assert store.get_user(ids[0]) == results[3]
@@ -0,0 +1,195 @@
+"""Concurrency stress tests for the user store.
+
+This module hammers the store from many threads at once to check that
+writes are never lost and readers never observe half-applied writes.
+"""
+
+# pylint: disable=import-error
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from users import store
+from users.backends import memory
+
+THREADS = 8
+
+
+@pytest.fixture(autouse=True)
+def frequent_thread_switches():
+    """Make the interpreter switch threads as often as possible."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def _run_concurrently(*workers):
+    """Run every worker on its own thread and re-raise the first failure."""
+    with ThreadPoolExecutor(max_workers=len(workers)) as pool:
+        for future in [pool.submit(worker) for worker in workers]:
+            future.result()
+
+
+@pytest.mark.unit
+def test_no_lost_updates_under_contention():
+    """Test that concurrent writers never overwrite each other's changes.
+
+    Every thread increments one shared counter with optimistic
+    read-modify-write loops while others create users; every increment and
+    every created user must be present at the end.
+    """
+    counter = store.create_user(
+        {"firstName": "C", "lastName": "C", "email": "c@example.com", "phone": "0"}
+    )
+    increments = 200
+
+    def increment():
+        for _ in range(increments):
+            while True:
+                user, version = store.get_user_snapshot(counter["id"])
+                try:
+                    store.update_user(
+                        counter["id"],
+                        {"phone": str(int(user["phone"]) + 1)},
+                        if_versions={version},
+                    )
+                    break
+                except store.VersionConflictError:
+                    continue
+
+    def create(worker):
+        def run():
+            for i in range(increments):
+                store.create_user(
+                    {
+                        "firstName": "W",
+                        "lastName": str(worker),
+                        "email": f"w{worker}.{i}@example.com",
+                        "phone": "1",
+                    }
+                )
+
+        return run
+
+    before = len(store.list_users())
+    _run_concurrently(
+        *(increment for _ in range(THREADS)), *(create(n) for n in range(THREADS))
+    )
+
+    assert store.get_user(counter["id"])["phone"] == str(THREADS * increments)
+    assert len(store.list_users()) == before + THREADS * increments
+    for worker in range(THREADS):
+        assert store.find_user_by_email(f"w{worker}.0@example.com") is not None
+
+
+@pytest.mark.unit
+def test_readers_never_see_torn_writes(monkeypatch):
+    """Test that lock-free readers always see whole records and pages.
+
+    Writers keep rewriting users so that firstName equals lastName and keep
+    creating and deleting users to force keyset compaction, while readers
+    check that invariant and that pages stay in insertion order.
+    """
+    monkeypatch.setattr(memory, "_COMPACT_MIN_DEAD", 4)
+    ids = [user["id"] for user in store.list_users()]
+    for uid in ids:
+        store.update_user(uid, {"firstName": "t", "lastName": "t"})
+    rounds = 300
+
+    def rewrite():
+        for i in range(rounds):
+            for uid in ids:
+                store.update_user(uid, {"firstName": f"t{i}", "lastName": f"t{i}"})
+
+    def churn():
+        for i in range(rounds):
+            user = store.create_user(
+                {
+                    "firstName": "x",
+                    "lastName": "x",
+                    "email": f"churn{i}@example.com",
+                    "phone": "1",
+                }
+            )
+            store.delete_user(user["id"])
+
+    def read():
+        for _ in range(rounds):
+            for uid in ids:
+                user, version = store.get_user_snapshot(uid)
+                assert user["firstName"] == user["lastName"]
+                assert version is not None
+            page, position = store.list_users_page(5)
+            while True:
+                assert all(u["firstName"] == u["lastName"] for u in page)
+                if position is None:
+                    break
+                page, position = store.list_users_page(5, position)
+
+    _run_concurrently(rewrite, churn, *(read for _ in range(THREADS)))
+    assert [user["id"] for user in store.list_users()] == ids
+
+
+@pytest.mark.unit
+def test_index_reads_take_no_lock():
+    """Test that searches, sorted pages and the change feed never wait.
+
+    Verifies that they answer while another thread holds the write lock,
+    and stay consistent while writers rewrite, create and delete users.
+    """
+    backend = store.get_backend()
+    generation = store.get_generation()
+
+    def read():
+        names = [user["firstName"] for user in store.list_users()]
+        users, _ = store.search_users_page({"firstName": "e"}, [], 100)
+        assert [user["firstName"] for user in users] == [
+            name for name in names if name.startswith("E")
+        ]
+        users, _ = store.sorted_users_page("lastName", 100, prefixes={}, terms=[])
+        assert sorted(user["firstName"] for user in users) == sorted(names)
+        changes, position, _ = store.get_changes(generation, 100)
+        seqs = [change["seq"] for change in changes]
+        assert seqs == list(range(generation + 1, position + 1))
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        with backend.lock:
+            pool.submit(read).result(timeout=5)
+
+    ids = [user["id"] for user in store.list_users()]
+    for uid in ids:
+        store.update_user(uid, {"firstName": "t", "lastName": "t"})
+    rounds = 100
+
+    def rewrite():
+        for i in range(rounds):
+            for uid in ids:
+                store.update_user(uid, {"firstName": f"t{i}", "lastName": f"t{i}"})
+
+    def churn():
+        for i in range(rounds):
+            user = store.create_user(
+                {
+                    "firstName": "x",
+                    "lastName": "x",
+                    "email": f"churn{i}@example.com",
+                    "phone": "1",
+                }
+            )
+            store.delete_user(user["id"])
+
+    def read_while_writing():
+        for _ in range(rounds):
+            users, _ = store.search_users_page({"firstName": "t"}, [], 100)
+            assert len(users) == len(ids)
+            assert all(user["firstName"] == user["lastName"] for user in users)
+            users, _ = store.sorted_users_page(
+                "updatedAt", 5, descending=True, prefixes={}, terms=[]
+            )
+            assert len(users) == 5
+            since = store.get_generation() - 20
+            changes, position, _ = store.get_changes(since, 100)
+            seqs = [change["seq"] for change in changes]
+            assert seqs == list(range(since + 1, position + 1))
+
+    _run_concurrently(rewrite, churn, *(read_while_writing for _ in range(THREADS)))
@@ -5,8 +5,10 @@ testing the complete request-response cycle for user operations.
 """
 
 # pylint: disable=import-error,unused-import
+import json
 import pytest
 from rest_framework import status
+from users import cache, store
 
 
 @pytest.mark.api
@@ -48,3 +50,547 @@ def test_create_user(api_client):
     assert response.json()["lastName"] == "Doe"
     assert response.json()["email"] == "john.doe@example.com"
     assert response.json()["phone"] == "+1234567890"
+
+
+@pytest.mark.api
+def test_create_user_rejects_duplicate_email(api_client):
+    """Test that creating a user with a taken email fails.
+
+    Verifies that the email comparison ignores case and that the error is
+    reported against the email field with a 400 status.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    response = api_client.post(
+        "/user",
+        data={
+            "firstName": "Emma",
+            "lastName": "Clone",
+            "email": "Emma.Johnson@email.com",
+            "phone": "+1234567890",
+        },
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "email" in response.json()
+
+
+@pytest.mark.api
+def test_update_user_email_uniqueness(api_client):
+    """Test email uniqueness when updating a user.
+
+    Verifies that a user may keep its own email but may not take the email
+    of another user.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    users = api_client.get("/users").json()
+    first, second = users[0], users[1]
+
+    response = api_client.patch(
+        f"/user/{first['id']}", data={"email": first["email"].upper()}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    response = api_client.patch(f"/user/{first['id']}", data={"email": second["email"]})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "email" in response.json()
+
+
+@pytest.mark.api
+def test_list_users_filtered_by_email(api_client):
+    """Test the exact email lookup on the users list endpoint.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    response = api_client.get("/users", {"email": "LIAM.williams@email.com"})
+    assert response.status_code == status.HTTP_200_OK
+    assert [user["firstName"] for user in response.json()] == ["Liam"]
+
+    response = api_client.get("/users", {"email": "nobody@email.com"})
+    assert response.json() == []
+
+
+@pytest.mark.api
+def test_list_users_search_and_prefix_filters(api_client):
+    """Test ``q`` and the prefix filters on the users list endpoint.
+
+    Verifies that matches keep insertion order, page with cursors, and
+    reflect later writes.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    response = api_client.get("/users", {"q": "wil", "limit": 2})
+    assert [user["firstName"] for user in response.json()] == ["Liam", "Ethan"]
+    link = response.headers["Link"]
+    response = api_client.get(link[1 : link.index(">")])
+    assert [user["firstName"] for user in response.json()] == ["William"]
+    assert "Link" not in response.headers
+
+    response = api_client.get("/users", {"phone": "+1-555-555-07", "fields": "id"})
+    assert len(response.json()) == 2
+    response = api_client.get("/users", {"emailPrefix": "AVA", "lastName": "mo"})
+    assert [user["firstName"] for user in response.json()] == ["Ava"]
+
+    uid = response.json()[0]["id"]
+    api_client.patch(f"/user/{uid}", data={"lastName": "Wilkins"})
+    response = api_client.get("/users", {"q": "wil"})
+    assert [user["firstName"] for user in response.json()] == [
+        "Liam",
+        "Ethan",
+        "Ava",
+        "William",
+    ]
+    assert api_client.get("/users", {"q": "  "}).json() == store.list_users()
+
+
+@pytest.mark.api
+def test_list_users_sorted(api_client):
+    """Test ``sort`` and ``from`` on the users list endpoint.
+
+    Verifies that sorted pages chain through their cursors, that ``from``
+    starts the walk at a value and that bad parameters are rejected.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    seen, url = [], "/users?sort=-updatedAt&limit=4&fields=firstName"
+    while url:
+        response = api_client.get(url)
+        seen.extend(user["firstName"] for user in response.json())
+        link = response.headers.get("Link")
+        url = link[1 : link.index(">")] if link else None
+    assert seen[:4] == ["Mason", "Noah", "William", "Ava"]
+    assert len(seen) == len(store.SAMPLE_USERS)
+
+    response = api_client.get(
+        "/users", {"sort": "updatedAt", "from": "2023-09-12T10:18:40Z"}
+    )
+    assert [user["firstName"] for user in response.json()] == [
+        "Ava",
+        "William",
+        "Noah",
+        "Mason",
+    ]
+    response = api_client.get("/users", {"sort": "lastName", "q": "wil"})
+    assert [user["lastName"] for user in response.json()] == [
+        "Thomas",
+        "Williams",
+        "Wilson",
+    ]
+
+    cursor = api_client.get("/users?sort=lastName&limit=1").headers["Link"]
+    cursor = cursor[cursor.index("cursor=") + 7 : cursor.index(">")]
+    for params in (
+        {"sort": "email"},
+        {"from": "2023-01-01"},
+        {"sort": "createdAt", "from": "yesterday"},
+        {"cursor": cursor},
+        {"sort": "createdAt", "cursor": cursor},
+    ):
+        response = api_client.get("/users", params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, params
+
+
+@pytest.mark.api
+def test_list_users_cursor_pagination(api_client):
+    """Test walking the users list page by page with cursors.
+
+    Verifies that following the ``next`` links visits every user exactly
+    once, in insertion order, and that the last page has no link.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    expected = [user["id"] for user in api_client.get("/users").json()]
+    api_client.delete(f"/user/{expected.pop(4)}")
+
+    seen, url = [], "/users?limit=3"
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) <= 3
+        seen.extend(user["id"] for user in response.json())
+        link = response.headers.get("Link")
+        url = link[1 : link.index(">")] if link else None
+    assert seen == expected
+
+
+@pytest.mark.api
+def test_list_users_rejects_bad_pagination_params(api_client):
+    """Test that malformed limit and cursor values return 400.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    assert api_client.get("/users?limit=0").status_code == 400
+    assert api_client.get("/users?limit=abc").status_code == 400
+    assert api_client.get("/users?limit=%C2%B2").status_code == 400
+    assert api_client.get("/users?cursor=not-a-cursor").status_code == 400
+
+
+@pytest.mark.api
+def test_stream_users_as_ndjson(api_client, settings):
+    """Test streaming every user as newline-delimited JSON.
+
+    Verifies that both the query flag and the Accept header select the
+    stream and that chunking does not drop or reorder users.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+        settings: pytest-django settings fixture.
+    """
+    settings.USERS_STREAM_CHUNK_SIZE = 3
+    expected = api_client.get("/users").json()
+
+    for response in (
+        api_client.get("/users?stream=1"),
+        api_client.get("/users", HTTP_ACCEPT="application/x-ndjson"),
+    ):
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson"
+        body = b"".join(response.streaming_content).decode()
+        assert [json.loads(line) for line in body.splitlines()] == expected
+
+
+@pytest.mark.api
+def test_stream_users_as_json_array(api_client, settings):
+    """Test streaming every user as a chunked JSON array.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+        settings: pytest-django settings fixture.
+    """
+    settings.USERS_STREAM_CHUNK_SIZE = 4
+    expected = api_client.get("/users").json()
+
+    response = api_client.get("/users?stream=json")
+    assert json.loads(b"".join(response.streaming_content)) == expected
+
+    store.clear_users()
+    response = api_client.get("/users?stream=json")
+    assert json.loads(b"".join(response.streaming_content)) == []
+
+
+@pytest.mark.api
+def test_responses_served_from_cache_until_a_write(api_client):
+    """Test the pre-encoded response caches for list and detail reads.
+
+    Verifies that repeated reads are cache hits and that a write makes the
+    next read return fresh data.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    cache.clear_caches()
+    first = api_client.get("/users").json()[0]
+    api_client.get("/users")
+    api_client.get(f"/user/{first['id']}")
+    api_client.get(f"/user/{first['id']}")
+    stats = cache.cache_stats()
+    assert stats["users-list"]["hits"] == 1
+    assert stats["user-detail"]["hits"] == 1
+
+    api_client.patch(f"/user/{first['id']}", data={"firstName": "Changed"})
+    assert api_client.get("/users").json()[0]["firstName"] == "Changed"
+    assert api_client.get(f"/user/{first['id']}").json()["firstName"] == "Changed"
+
+
+@pytest.mark.api
+def test_conditional_get_returns_not_modified(api_client):
+    """Test ETag and Last-Modified revalidation of list and detail reads.
+
+    Verifies that a matching ``If-None-Match`` or ``If-Modified-Since``
+    gets a 304 and that a write changes the ETags.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    listed = api_client.get("/users")
+    uid = listed.json()[0]["id"]
+    detail = api_client.get(f"/user/{uid}")
+    assert listed["ETag"] and detail["ETag"]
+
+    for url, response in (("/users", listed), (f"/user/{uid}", detail)):
+        revalidated = api_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+        assert revalidated["ETag"] == response["ETag"]
+        assert not revalidated.content
+        revalidated = api_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+
+    api_client.patch(f"/user/{uid}", data={"firstName": "Changed"})
+    for url, response in (("/users", listed), (f"/user/{uid}", detail)):
+        refreshed = api_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert refreshed.status_code == status.HTTP_200_OK
+        assert refreshed["ETag"] != response["ETag"]
+
+
+@pytest.mark.api
+def test_patch_with_if_match(api_client):
+    """Test optimistic concurrency on PATCH with ``If-Match``.
+
+    Verifies that an update with the current ETag succeeds and returns the
+    new ETag, while a stale ETag is rejected with 412.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    uid = api_client.get("/users").json()[0]["id"]
+    etag = api_client.get(f"/user/{uid}")["ETag"]
+
+    response = api_client.patch(
+        f"/user/{uid}", data={"firstName": "First"}, HTTP_IF_MATCH=etag
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"] != etag
+
+    response = api_client.patch(
+        f"/user/{uid}", data={"firstName": "Second"}, HTTP_IF_MATCH=etag
+    )
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert api_client.get(f"/user/{uid}").json()["firstName"] == "First"
+    response = api_client.patch(
+        f"/user/{uid}", data={"firstName": "Third"}, HTTP_IF_MATCH='"v\u00b2"'
+    )
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+
+
+@pytest.mark.api
+def test_bulk_create_with_partial_failure(api_client):
+    """Test creating many users in one request.
+
+    Verifies that valid items are created while invalid ones and duplicate
+    emails, including duplicates within the batch, get per-item errors.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    new_user = {
+        "firstName": "Bulk",
+        "lastName": "User",
+        "email": "bulk@example.com",
+        "phone": "+1234567890",
+    }
+    response = api_client.post(
+        "/users/bulk",
+        data=[
+            new_user,
+            {**new_user, "email": "not-an-email"},
+            {**new_user, "email": "BULK@example.com"},
+            {**new_user, "email": "bulk2@example.com"},
+        ],
+        format="json",
+    )
+    assert response.status_code == status.HTTP_207_MULTI_STATUS
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == [201, 400, 400, 201]
+    assert "email" in results[1]["errors"]
+    assert "email" in results[2]["errors"]
+    assert store.get_user(results[3]["user"]["id"])["email"] == "bulk2@example.com"
+    assert len(store.list_users()) == 12
+
+
+@pytest.mark.api
+def test_bulk_create_without_optional_fields(api_client):
+    """Test that bulk items may leave out lastName and phone, as for POST /user.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    response = api_client.post(
+        "/users/bulk",
+        data=[
+            {"firstName": "Min", "email": "min@example.com"},
+            {"firstName": "Max", "lastName": "Full", "email": "max@example.com"},
+        ],
+        format="json",
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    users = [result["user"] for result in response.json()["results"]]
+    assert (users[0]["lastName"], users[0]["phone"]) == ("", "")
+    assert (users[1]["lastName"], users[1]["phone"]) == ("Full", "")
+    assert len(store.list_users()) == 12
+
+
+@pytest.mark.api
+def test_bulk_update_and_delete(api_client):
+    """Test updating and deleting many users in one request each.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    first, second = (user["id"] for user in store.list_users()[:2])
+    response = api_client.patch(
+        "/users/bulk",
+        data=[
+            {"id": first, "lastName": "Updated"},
+            {"id": second, "email": "emma.johnson@email.com"},
+            {"id": "missing", "lastName": "Nobody"},
+            {"lastName": "No id"},
+        ],
+        format="json",
+    )
+    assert response.status_code == status.HTTP_207_MULTI_STATUS
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == [200, 400, 404, 400]
+    assert results[0]["user"]["lastName"] == "Updated"
+    assert "id" in results[3]["errors"]
+
+    response = api_client.delete("/users/bulk", data=[first, second], format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert [result["status"] for result in response.json()["results"]] == [204, 204]
+    response = api_client.delete("/users/bulk", data=[first], format="json")
+    assert response.status_code == status.HTTP_207_MULTI_STATUS
+
+
+@pytest.mark.api
+def test_bulk_rejects_bad_payloads(api_client, settings):
+    """Test that the item list itself must be a bounded, non-empty array.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+        settings: pytest-django settings fixture.
+    """
+    settings.USERS_BULK_MAX_ITEMS = 2
+    assert api_client.post("/users/bulk", data={}, format="json").status_code == 400
+    assert api_client.post("/users/bulk", data=[], format="json").status_code == 400
+    response = api_client.delete("/users/bulk", data=["a", "b", "c"], format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert len(store.list_users()) == 10
+
+
+@pytest.mark.api
+def test_lookup_users_by_ids(api_client):
+    """Test fetching many users by id with GET /users?ids= and POST /users/lookup.
+
+    Verifies that found users come back in request order, each id once,
+    and that unknown ids are listed as missing.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    first, second = (user["id"] for user in store.list_users()[:2])
+    response = api_client.get(f"/users?ids={second}, missing,{first},{second}")
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert [user["id"] for user in body["users"]] == [second, first]
+    assert body["missing"] == ["missing"]
+
+    response = api_client.post("/users/lookup", data=[first, "x"], format="json")
+    assert response.json() == {"users": [store.get_user(first)], "missing": ["x"]}
+    assert api_client.get("/users?ids=").status_code == status.HTTP_400_BAD_REQUEST
+    response = api_client.post("/users/lookup", data={}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.api
+def test_change_feed(api_client):
+    """Test delta sync through ``GET /users/changes``.
+
+    Verifies that the feed replays writes in order with tombstones for
+    deletes, pages with ``limit`` and asks stale clients to resync.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    seeded = store.get_generation() - len(store.SAMPLE_USERS)
+    response = api_client.get("/users/changes", {"since": seeded})
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert [change["user"] for change in body["changes"]] == store.SAMPLE_USERS
+    assert body["next"] == store.get_generation() and body["more"] is False
+
+    new_user = {
+        "firstName": "Feed",
+        "lastName": "User",
+        "email": "feed@example.com",
+        "phone": "+1234567890",
+    }
+    uid = api_client.post("/user", data=new_user).json()["id"]
+    api_client.patch(f"/user/{uid}", data={"lastName": "Smith"})
+    api_client.delete(f"/user/{uid}")
+    response = api_client.get("/users/changes", {"since": body["next"], "limit": 2})
+    page = response.json()
+    assert [change["type"] for change in page["changes"]] == ["created", "updated"]
+    assert page["changes"][1]["user"]["lastName"] == "Smith"
+    assert page["more"] is True
+    page = api_client.get("/users/changes", {"since": page["next"]}).json()
+    assert page["changes"] == [
+        {
+            "seq": store.get_generation(),
+            "type": "deleted",
+            "id": uid,
+            "at": page["changes"][0]["at"],
+            "user": None,
+        }
+    ]
+    assert page["more"] is False
+
+    assert api_client.get("/users/changes").status_code == status.HTTP_410_GONE
+    store.clear_users()
+    response = api_client.get("/users/changes", {"since": page["next"]})
+    assert response.status_code == status.HTTP_410_GONE
+    assert response.json()["resync"] is True
+    assert response.json()["next"] == store.get_generation()
+    for since in ("-1", "\u00b2"):
+        response = api_client.get("/users/changes", {"since": since})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.api
+def test_sparse_fieldsets(api_client):
+    """Test that ``fields`` projects users on list, detail and stream responses.
+
+    Verifies that keys come back in schema order, that the projection has
+    its own ETag and cache entry, and that If-Match still accepts it.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    response = api_client.get("/users?fields=email,id&limit=2")
+    first = store.list_users()[0]
+    assert response.json()[0] == {"id": first["id"], "email": first["email"]}
+    assert list(response.json()[0]) == ["id", "email"]
+    assert response["ETag"] != api_client.get("/users?limit=2")["ETag"]
+    assert len(api_client.get("/users?limit=2").json()[0]) == 7
+
+    detail = api_client.get(f"/user/{first['id']}?fields=phone")
+    assert detail.json() == {"phone": first["phone"]}
+    full = api_client.get(f"/user/{first['id']}")
+    assert detail["ETag"] != full["ETag"]
+    response = api_client.get(
+        f"/user/{first['id']}?fields=phone", HTTP_IF_NONE_MATCH=detail["ETag"]
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    response = api_client.patch(
+        f"/user/{first['id']}",
+        data={"lastName": "Sparse"},
+        HTTP_IF_MATCH=detail["ETag"],
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    streamed = api_client.get("/users?stream=1&fields=id")
+    lines = b"".join(streamed.streaming_content).decode().splitlines()
+    assert json.loads(lines[0]) == {"id": first["id"]}
+    lookup = api_client.get(f"/users?ids={first['id']}&fields=lastName")
+    assert lookup.json()["users"] == [{"lastName": "Sparse"}]
+
+
+@pytest.mark.api
+def test_sparse_fieldsets_reject_unknown_fields(api_client):
+    """Test that unknown or empty field lists are rejected with a 400.
+
+    Args:
+        api_client: Django REST framework API client fixture.
+    """
+    response = api_client.get("/users?fields=id,password")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "password" in response.json()["fields"][0]
+    assert api_client.get("/users?fields=,").status_code == 400
@@ -0,0 +1,133 @@
+"""Tests for the compiled validation of user payloads.
+
+Every payload is validated twice, with ``USERS_FAST_VALIDATION`` on and
+off, and the outcomes must be identical down to the error codes.
+"""
+
+# pylint: disable=import-error
+import pytest
+from django.http import QueryDict
+from users import store
+from users.serializers import UserCreateSerializer, UserUpdateSerializer
+from users.validation import compile_serializer
+
+VALID = {
+    "firstName": "John",
+    "lastName": "Doe",
+    "email": "john.doe@example.com",
+    "phone": "+1234567890",
+}
+
+PAYLOADS = [
+    VALID,
+    {**VALID, "firstName": "  Padded  ", "extra": "ignored"},
+    {"firstName": "Only"},
+    {"email": "only@example.com"},
+    {},
+    {**VALID, "firstName": ""},
+    {**VALID, "lastName": "   "},
+    {**VALID, "firstName": "x" * 256, "phone": "1" * 51},
+    {**VALID, "firstName": "x" * 255, "phone": "1" * 50},
+    {**VALID, "firstName": 42, "phone": 1.5},
+    {**VALID, "firstName": True, "lastName": None, "phone": ["+1"]},
+    {**VALID, "firstName": "nul\x00", "lastName": "sur\ud800rogate"},
+    {**VALID, "email": "not-an-email"},
+    {**VALID, "email": "  spaced@example.com "},
+    {**VALID, "email": "a" * 310 + "@example.com"},
+    {**VALID, "email": "JOHN.DOE@EXAMPLE.COM"},
+    {**VALID, "email": store.SAMPLE_USERS[0]["email"].upper()},
+    ["not", "a", "dict"],
+    "text",
+    None,
+]
+
+
+def _outcome(serializer) -> tuple:
+    """Validate and capture everything a view could look at."""
+    valid = serializer.is_valid()
+    return valid, serializer.errors, serializer.validated_data
+
+
+def _both(settings, make) -> tuple:
+    """Validate the serializer ``make()`` builds with fast validation on and off."""
+    outcomes = []
+    for fast in (True, False):
+        settings.USERS_FAST_VALIDATION = fast
+        outcomes.append(_outcome(make()))
+    return tuple(outcomes)
+
+
+@pytest.mark.unit
+def test_user_serializers_compile(settings):
+    """Test that both user serializers validate without building their fields.
+
+    Args:
+        settings: pytest-django settings fixture.
+    """
+    settings.USERS_FAST_VALIDATION = True
+    for serializer_class in (UserCreateSerializer, UserUpdateSerializer):
+        validator = compile_serializer(serializer_class)
+        assert [rule.name for rule in validator.rules] == list(VALID)
+        serializer = serializer_class(data=VALID)
+        assert serializer.is_valid()
+        assert "fields" not in serializer.__dict__
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_create_matches_drf(settings, payload):
+    """Test that creation payloads validate exactly as with DRF.
+
+    Args:
+        settings: pytest-django settings fixture.
+        payload: The request body.
+    """
+    fast, drf = _both(settings, lambda: UserCreateSerializer(data=payload))
+    assert fast == drf
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_update_matches_drf(settings, payload):
+    """Test that update payloads validate exactly as with DRF.
+
+    Args:
+        settings: pytest-django settings fixture.
+        payload: The request body.
+    """
+    uid = store.SAMPLE_USERS[1]["id"]
+    fast, drf = _both(settings, lambda: UserUpdateSerializer(uid, data=payload))
+    assert fast == drf
+    fast, drf = _both(
+        settings, lambda: UserUpdateSerializer(uid, data=payload, partial=True)
+    )
+    assert fast == drf
+
+
+@pytest.mark.unit
+def test_form_and_bulk_payloads_match_drf(settings):
+    """Test form-encoded payloads and bulk lists against DRF.
+
+    Args:
+        settings: pytest-django settings fixture.
+    """
+    form = QueryDict(
+        "firstName=Form&firstName=Last&lastName=&phone=&email=form@example.com"
+    )
+    fast, drf = _both(settings, lambda: UserCreateSerializer(data=form))
+    assert fast == drf and fast[2]["firstName"] == "Last"
+    fast, drf = _both(settings, lambda: UserUpdateSerializer(data=QueryDict("phone=")))
+    assert fast == drf
+
+    def bulk():
+        return UserCreateSerializer(data=PAYLOADS, many=True)
+
+    settings.USERS_FAST_VALIDATION = True
+    fast = bulk()
+    fast.is_valid()
+    settings.USERS_FAST_VALIDATION = False
+    drf = bulk()
+    drf.is_valid()
+    assert fast.validated_data == drf.validated_data
+    assert fast.item_errors == drf.item_errors
+    assert any(fast.item_errors) and not all(fast.item_errors)
@@ -1,14 +1,84 @@
 """URL configuration for the users app.
 
 Defines URL patterns for user-related API endpoints including
-list, create, retrieve, update, and delete operations.
+list, create, retrieve, update, and delete operations, their bulk
+counterparts including lookup of many users by id, and the change feed
+(polled, or pushed as events). With ``USERS_ASYNC_VIEWS`` set, the list,
+create and detail endpoints are served by their async variants. With
+``USERS_METRICS`` set, ``/metrics`` serves the API's metrics, and with
+``USERS_PROFILING`` set, ``/profiles`` lists recent request profiles.
 """
 
+from django.conf import settings
 from django.urls import path
-from .views import UsersListView, UserDetailView, UserCreateView
+from .async_views import AsyncUserCreateView, AsyncUserDetailView, AsyncUsersListView
+from .views import (
+    UsersListView,
+    UsersBulkView,
+    UsersLookupView,
+    UsersChangesView,
+    UsersEventsView,
+    UserDetailView,
+    UserCreateView,
+    MetricsView,
+    ProfilesView,
+    ProfileView,
+)
 
-urlpatterns = [
-    path("users", UsersListView.as_view(), name="users-list"),
-    path("user", UserCreateView.as_view(), name="user-create"),
-    path("user/<str:uid>", UserDetailView.as_view(), name="user-detail"),
-]
+
+def user_urlpatterns(asynchronous: bool) -> list:
+    """Build the users URL patterns.
+
+    Args:
+        asynchronous (bool): Whether to serve the list, create and detail
+            endpoints with their async views.
+
+    Returns:
+        list: The URL patterns.
+    """
+    if asynchronous:
+        list_view, create_view, detail_view = (
+            AsyncUsersListView,
+            AsyncUserCreateView,
+            AsyncUserDetailView,
+        )
+    else:
+        list_view, create_view, detail_view = (
+            UsersListView,
+            UserCreateView,
+            UserDetailView,
+        )
+    return [
+        path("users", list_view.as_view(), name="users-list"),
+        path("users/bulk", UsersBulkView.as_view(), name="users-bulk"),
+        path("users/lookup", UsersLookupView.as_view(), name="users-lookup"),
+        path("users/changes", UsersChangesView.as_view(), name="users-changes"),
+        path("users/events", UsersEventsView.as_view(), name="users-events"),
+        path("user", create_view.as_view(), name="user-create"),
+        path("user/<str:uid>", detail_view.as_view(), name="user-detail"),
+    ]
+
+
+def profile_urlpatterns() -> list:
+    """Build the URL patterns of the request profiles.
+
+    Returns:
+        list: The URL patterns.
+    """
+    return [
+        path("profiles", ProfilesView.as_view(), name="profiles"),
+        path(
+            "profiles/<str:profile_id>/<str:fmt>",
+            ProfileView.as_view(),
+            name="profile",
+        ),
+    ]
+
+
+urlpatterns = user_urlpatterns(settings.USERS_ASYNC_VIEWS)
+
+if settings.USERS_METRICS:
+    urlpatterns.append(path("metrics", MetricsView.as_view(), name="metrics"))
+
+if settings.USERS_PROFILING:
+    urlpatterns += profile_urlpatterns()
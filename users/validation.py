@@ -0,0 +1,183 @@
+"""Compiled validation of user payloads.
+
+DRF validates a serializer by deep-copying its declared fields for every
+instance and running each field through its generic validation steps. For
+the user serializers, whose fields are plain strings, that machinery costs
+far more than the checks themselves. ``compile_serializer`` turns a
+serializer's declared fields into a flat tuple of rules once; a payload
+whose fields all pass the fast checks of their rules is accepted without
+touching the field machinery. Any field that does not pass is handed to
+its declared DRF field, so rejected payloads get exactly DRF's errors.
+"""
+
+from __future__ import annotations
+import copy
+import re
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import NamedTuple
+
+# pylint: disable=import-error,too-few-public-methods
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import (
+    EmailValidator,
+    MaxLengthValidator,
+    ProhibitNullCharactersValidator,
+)
+from rest_framework import serializers
+from rest_framework.fields import SkipField, empty, get_error_detail
+from rest_framework.settings import api_settings
+from rest_framework.validators import ProhibitSurrogateCharactersValidator
+
+_SURROGATES = re.compile("[\ud800-\udfff]")
+
+# Validators of a string field that the fast checks cover.
+_COMPILED_VALIDATORS = (
+    EmailValidator,
+    MaxLengthValidator,
+    ProhibitNullCharactersValidator,
+    ProhibitSurrogateCharactersValidator,
+)
+
+
+class _Rule(NamedTuple):
+    """The checks compiled from one declared string field."""
+
+    name: str
+    field: serializers.CharField
+    required: bool
+    max_length: int | None
+    email: EmailValidator | None
+    validate_method: str
+
+
+def _compile_field(name: str, field) -> _Rule | None:
+    """Compile a declared field into a rule, or None if it cannot be."""
+    if not isinstance(field, serializers.CharField):
+        return None
+    unsupported = (
+        field.read_only,
+        field.allow_blank,
+        field.allow_null,
+        not field.trim_whitespace,
+        field.min_length is not None,
+        field.default is not empty,
+        field.source not in (None, name),
+    )
+    if any(unsupported):
+        return None
+    validators = field.validators
+    if any(type(validator) not in _COMPILED_VALIDATORS for validator in validators):
+        return None
+    emails = [v for v in validators if isinstance(v, EmailValidator)]
+    # A private copy that knows its name, as binding it to a serializer would
+    # give it, for get_value and the errors of run_validation.
+    field = copy.deepcopy(field)
+    field.field_name = name
+    return _Rule(
+        name,
+        field,
+        field.required,
+        field.max_length,
+        emails[0] if emails else None,
+        f"validate_{name}",
+    )
+
+
+class CompiledValidator:
+    """Validates payloads against the rules compiled from a serializer.
+
+    Attributes:
+        rules (tuple[_Rule, ...]): One rule per declared field, in
+            declaration order.
+    """
+
+    def __init__(self, rules: tuple[_Rule, ...]):
+        self.rules = rules
+
+    @staticmethod
+    def _fast_value(rule: _Rule, value) -> str | None:
+        """Get the validated value if it passes the fast checks, else None."""
+        if type(value) is not str:  # pylint: disable=unidiomatic-typecheck
+            return None
+        value = value.strip()
+        if not value or "\x00" in value or _SURROGATES.search(value):
+            return None
+        if rule.max_length is not None and len(value) > rule.max_length:
+            return None
+        if rule.email is not None:
+            try:
+                rule.email(value)
+            except DjangoValidationError:
+                return None
+        return value
+
+    def validate(self, serializer: serializers.Serializer, data) -> dict:
+        """Validate a payload as ``serializer.to_internal_value`` would.
+
+        Args:
+            serializer (serializers.Serializer): The serializer being
+                validated, for its ``validate_<field>`` methods and
+                ``partial`` flag.
+            data: The payload.
+
+        Returns:
+            dict: The validated data.
+
+        Raises:
+            serializers.ValidationError: With the errors DRF would report.
+        """
+        if not isinstance(data, Mapping):
+            message = serializer.error_messages["invalid"]
+            raise serializers.ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        str(message).format(datatype=type(data).__name__)
+                    ]
+                },
+                code="invalid",
+            )
+        partial = getattr(serializer.root, "partial", False)
+        validated, errors = {}, {}
+        for rule in self.rules:
+            value = rule.field.get_value(data)
+            if value is empty and (partial or not rule.required):
+                continue
+            try:
+                fast = self._fast_value(rule, value)
+                value = rule.field.run_validation(value) if fast is None else fast
+                validate_method = getattr(serializer, rule.validate_method, None)
+                if validate_method is not None:
+                    value = validate_method(value)
+            except serializers.ValidationError as exc:
+                errors[rule.name] = exc.detail
+            except DjangoValidationError as exc:
+                errors[rule.name] = get_error_detail(exc)
+            except SkipField:
+                pass
+            else:
+                validated[rule.name] = value
+        if errors:
+            raise serializers.ValidationError(errors)
+        return validated
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class) -> CompiledValidator | None:
+    """Compile the declared fields of a serializer class, once per class.
+
+    Args:
+        serializer_class: A ``Serializer`` subclass.
+
+    Returns:
+        CompiledValidator | None: The validator, or None if the serializer
+        declares a field or validator the fast checks do not cover.
+    """
+    meta = getattr(serializer_class, "Meta", None)
+    if getattr(meta, "validators", None):
+        return None
+    declared = serializer_class._declared_fields  # pylint: disable=protected-access
+    rules = tuple(_compile_field(name, field) for name, field in declared.items())
+    if any(rule is None for rule in rules):
+        return None
+    return CompiledValidator(rules)
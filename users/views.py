@@ -1,27 +1,415 @@
 """API views for user management.
 
-Provides REST API endpoints for user CRUD operations using Django REST Framework.
-Includes views for listing users, creating users, and managing individual user details.
+Provides REST API endpoints for user CRUD operations using Django REST Framework:
+single and bulk user endpoints, the change feed (polled, or pushed by an async
+view under ASGI), Prometheus metrics and recent request profiles.
 """
 
 # pylint: disable=import-error,too-few-public-methods
+from __future__ import annotations
+from typing import NamedTuple
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+)
+from django.urls import reverse
+from django.views import View
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
-from .store import list_users, get_user, create_user, update_user, delete_user
-from .serializers import UserCreateSerializer, UserUpdateSerializer
+from rest_framework import serializers, status
+from .store import (
+    ChangesExpiredError,
+    DuplicateEmailError,
+    VersionConflictError,
+    list_users_page,
+    search_users_page,
+    sorted_users_page,
+    get_users,
+    get_user_snapshot,
+    find_user_by_email,
+    create_user,
+    update_user,
+    delete_user,
+    create_users,
+    update_users,
+    delete_users,
+    get_changes,
+    get_generation,
+    get_last_modified,
+    count_users,
+)
+from .cache import detail_cache, list_cache
+from .events import EVENT_STREAM_MEDIA_TYPE, hub, poll_changes, stream_changes
+from .conditional import (
+    LIST_ETAG_PREFIX,
+    USER_ETAG_PREFIX,
+    if_match_versions,
+    make_etag,
+    not_modified,
+    set_validators,
+    user_timestamp,
+)
+from .fields import Projection, get_projection
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics
+from .filters import Search, Sort, get_search, get_sort
+from .profiling import (
+    EXEMPT as PROFILING_EXEMPT,
+    FORMATS as PROFILE_FORMATS,
+    authorized,
+    get_ring,
+    render_report,
+    requested_flag,
+)
+from .pagination import (
+    LAST_EVENT_ID_HEADER,
+    SINCE_PARAM,
+    TIMEOUT_PARAM,
+    get_limit,
+    get_position,
+    get_since,
+    next_link,
+    parse_count,
+)
+from .renderers import NDJSONRenderer, UsersJSONRenderer
+from .serializers import (
+    DUPLICATE_EMAIL_MESSAGE,
+    UserCreateSerializer,
+    UserUpdateSerializer,
+)
+from .streaming import stream_users
+
+
+def _duplicate_email_error() -> serializers.ValidationError:
+    """Build the 400 error raised when the store rejects a duplicate email.
+
+    The serializers check for duplicates up front; this covers a duplicate
+    that slipped in between validation and the store write.
+    """
+    return serializers.ValidationError({"email": [DUPLICATE_EMAIL_MESSAGE]})
+
+
+_json_renderer = UsersJSONRenderer()
+
+
+def _wants_plain_json(request) -> bool:
+    """Check whether content negotiation picked the plain JSON renderer.
+
+    Only those responses are served from the byte caches; other formats,
+    such as the browsable API, go through the normal DRF rendering path.
+    """
+    return isinstance(request.accepted_renderer, JSONRenderer)
+
+
+def _json_response(body: bytes, status_code: int = 200) -> HttpResponse:
+    """Wrap an already-encoded JSON body in a response."""
+    return HttpResponse(body, status=status_code, content_type="application/json")
+
+
+def _written_user_response(request, user: dict, status_code: int) -> Response:
+    """Build the response to a create or update.
+
+    Validators are attached only if ``user`` still matches the stored
+    record; if another write has already changed it, its version would
+    describe a different body, so the client has to revalidate with a GET.
+    """
+    response = Response(user, status=status_code)
+    current, version = get_user_snapshot(user["id"])
+    if current == user:
+        set_validators(
+            response,
+            make_etag(USER_ETAG_PREFIX, version, request),
+            user_timestamp(user),
+        )
+    return response
+
+
+def _bulk_limits() -> dict:
+    """Bounds on the item list of a bulk request."""
+    return {"allow_empty": False, "max_length": settings.USERS_BULK_MAX_ITEMS}
+
+
+def _lookup_response(ids, projection: Projection | None = None) -> Response:
+    """Resolve a list of user ids in one pass over the store.
+
+    Args:
+        ids: The requested ids; validated as a non-empty list of at most
+            ``USERS_BULK_MAX_ITEMS`` strings.
+        projection (Projection | None): Sparse fieldset for the users.
+
+    Returns:
+        Response: ``{"users": [...], "missing": [...]}`` with the users found
+        and the ids not found, both in request order, each id once.
+    """
+    ids = serializers.ListField(
+        child=serializers.CharField(), **_bulk_limits()
+    ).run_validation(ids)
+    ids = list(dict.fromkeys(ids))
+    found = get_users(ids)
+    users = [user for user in found if user is not None]
+    return Response(
+        {
+            "users": projection.many(users) if projection else users,
+            "missing": [uid for uid, user in zip(ids, found) if user is None],
+        }
+    )
+
+
+class _PageQuery(NamedTuple):
+    """What selects a page of the users list; hashable, for cache keys."""
+
+    limit: int
+    after: int | tuple[float | str, int] | None
+    search: Search | None
+    sort: Sort | None
+
+
+def _projected_page(query: _PageQuery, projection: Projection | None) -> tuple:
+    """Read a keyset page from the store, filtered, ordered and projected.
+
+    Returns:
+        tuple: The users on the page and the store position of the next.
+    """
+    search, sort = query.search, query.sort
+    prefixes = dict(search.prefixes) if search else {}
+    terms = list(search.terms) if search else []
+    if sort is not None:
+        users, position = sorted_users_page(
+            sort.field,
+            query.limit,
+            query.after,
+            descending=sort.descending,
+            start=sort.start,
+            prefixes=prefixes,
+            terms=terms,
+        )
+    elif search is not None:
+        users, position = search_users_page(prefixes, terms, query.limit, query.after)
+    else:
+        users, position = list_users_page(query.limit, query.after)
+    return (projection.many(users) if projection else users), position
+
+
+def _cached_page(key: tuple, query: _PageQuery, projection: Projection | None) -> tuple:
+    """Get an encoded keyset page from ``list_cache``, filling it on a miss."""
+    cached = list_cache.get(key)
+    if cached is None:
+        users, position = _projected_page(query, projection)
+        cached = (_json_renderer.render(users), position)
+        list_cache.put(key, cached, len(cached[0]))
+    return cached
 
 
 class UsersListView(APIView):
     """API view for listing all users."""
 
-    def get(self, _request):
-        """Retrieve all users.
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+
+    @staticmethod
+    def _stream_format(request) -> str | None:
+        """Work out whether, and how, the client asked for a full stream.
+
+        ``?stream=json`` streams a JSON array; ``?stream=1`` or an
+        ``Accept: application/x-ndjson`` header streams NDJSON.
 
         Returns:
-            Response: JSON response containing list of all users.
+            str | None: ``"json"`` or ``"ndjson"``, or None for a paged
+            response.
         """
-        return Response(list_users())
+        stream = request.query_params.get("stream", "").lower()
+        if stream == "json":
+            return "json"
+        if stream in ("1", "true", "ndjson"):
+            return "ndjson"
+        if request.accepted_renderer.format == NDJSONRenderer.format:
+            return "ndjson"
+        return None
+
+    def get(self, request):
+        """Retrieve a page of users, or the users matching ids or an email.
+
+        Args:
+            request: HTTP request. An ``ids`` query parameter looks up the
+                comma-separated user ids (see ``UsersLookupView``). An
+                ``email`` query parameter restricts the result to the user
+                with that address, ignoring case. Otherwise ``limit`` and
+                ``cursor`` select the page, narrowed by ``q`` and the prefix
+                filters and ordered by ``sort`` from ``from`` (see
+                ``users.filters``), or ``stream`` (see
+                ``_stream_format``) exports every user. ``fields`` limits
+                each user to the listed fields in every case.
+
+        Returns:
+            Response: JSON response containing list of users. When more
+            users follow, a ``Link`` header with ``rel="next"`` points to
+            the next page. Streamed exports return a
+            ``StreamingHttpResponse`` instead. Pages carry an ``ETag`` for
+            the store generation and honour ``If-None-Match`` and
+            ``If-Modified-Since`` with a 304.
+        """
+        projection = get_projection(request)
+        ids = request.query_params.get("ids")
+        if ids is not None:
+            return _lookup_response([uid.strip() for uid in ids.split(",")], projection)
+        email = request.query_params.get("email")
+        if email is not None:
+            user = find_user_by_email(email)
+            users = [user] if user else []
+            return Response(projection.many(users) if projection else users)
+        stream_format = self._stream_format(request)
+        if stream_format is not None:
+            return stream_users(stream_format, projection)
+        sort = get_sort(request)
+        query = _PageQuery(
+            get_limit(request),
+            get_position(request, sort.field if sort else None),
+            get_search(request),
+            sort,
+        )
+        return self._page(request, projection, query)
+
+    @staticmethod
+    def _page(request, projection: Projection | None, query: _PageQuery):
+        """Serve one keyset page, from the response cache when possible."""
+        generation, last_modified = get_generation(), get_last_modified()
+        tag = projection.tag if projection else None
+        etag = make_etag(LIST_ETAG_PREFIX, generation, request, tag)
+        unchanged = not_modified(request, etag, last_modified)
+        if unchanged is not None:
+            return unchanged
+        if _wants_plain_json(request) and list_cache.enabled:
+            body, position = _cached_page((generation, query, tag), query, projection)
+            response = _json_response(body)
+        else:
+            users, position = _projected_page(query, projection)
+            response = Response(users)
+        link = next_link(request, position, query.sort.field if query.sort else None)
+        if link is not None:
+            response["Link"] = f'<{link}>; rel="next"'
+        return set_validators(response, etag, last_modified)
+
+
+class UsersLookupView(APIView):
+    """API view for fetching many users by id in one request.
+
+    ``POST /users/lookup`` takes the ids as a JSON array in the body, for
+    lists too long for the ``GET /users?ids=`` query string.
+    """
+
+    def post(self, request):
+        """Look up the users with the given ids.
+
+        Args:
+            request: HTTP request with an array of user ids.
+
+        Returns:
+            Response: The users found and the ids that were not, in request
+            order.
+        """
+        return _lookup_response(request.data, get_projection(request))
+
+
+class UsersChangesView(APIView):
+    """API view for the change feed used for delta sync.
+
+    Clients download the full list once, then poll ``GET /users/changes``
+    with the ``next`` generation of the previous response to receive only
+    the users created, updated or deleted since.
+    """
+
+    def get(self, request):
+        """Get the changes made after a store generation.
+
+        Args:
+            request: HTTP request. ``since`` is the generation the client is
+                up to date with (0 by default) and ``limit`` caps the number
+                of changes returned.
+
+        Returns:
+            Response: ``{"changes": [...], "next": n, "more": bool}`` with
+            the changes in order (deletes as tombstones with a null
+            ``user``), the ``since`` to use next time and whether more
+            changes are waiting. If the changes after ``since`` are no
+            longer retained, 410 Gone with ``"resync": true``: the client
+            must re-download every user and continue from ``next``.
+        """
+        since, limit = get_since(request), get_limit(request)
+        try:
+            changes, position, more = get_changes(since, limit)
+        except ChangesExpiredError as exc:
+            return Response(
+                {
+                    "detail": f"Changes since {since} are no longer available.",
+                    "resync": True,
+                    "next": exc.generation,
+                },
+                status=status.HTTP_410_GONE,
+            )
+        return Response({"changes": changes, "next": position, "more": more})
+
+
+class UsersEventsView(View):
+    """Async view pushing the change feed to connected clients.
+
+    Served through ASGI, where a waiting client costs a coroutine rather
+    than a worker thread. Clients that accept ``text/event-stream`` get
+    Server-Sent Events; others get a long poll answered like
+    ``GET /users/changes``. Under WSGI it answers 501: Django would drain
+    the endless event stream before sending a byte, and a long poll would
+    hold a worker for its whole wait.
+    """
+
+    async def get(self, request):
+        """Wait for the changes made after a store generation.
+
+        Args:
+            request: HTTP request. ``since`` (or the ``Last-Event-ID`` header
+                of a reconnecting SSE client) is the generation the client
+                is up to date with, by default the current one; for a long
+                poll, ``timeout`` caps the wait in seconds.
+
+        Returns:
+            HttpResponse: The SSE stream, or the long poll's answer. 400 for
+            invalid parameters, 501 outside ASGI, 503 while the worker has
+            ``USERS_EVENTS_MAX_SUBSCRIBERS`` subscribers.
+        """
+        if not isinstance(request, ASGIRequest):
+            return _json_response(
+                _json_renderer.render(
+                    {"detail": "Change events are only served through ASGI."}
+                ),
+                status.HTTP_501_NOT_IMPLEMENTED,
+            )
+        try:
+            since = parse_count(
+                request.headers.get(LAST_EVENT_ID_HEADER)
+                or request.GET.get(SINCE_PARAM),
+                SINCE_PARAM,
+            )
+            timeout = parse_count(request.GET.get(TIMEOUT_PARAM), TIMEOUT_PARAM)
+        except serializers.ValidationError as exc:
+            return _json_response(
+                _json_renderer.render(exc.detail), status.HTTP_400_BAD_REQUEST
+            )
+        if len(hub) >= settings.USERS_EVENTS_MAX_SUBSCRIBERS:
+            return _json_response(
+                _json_renderer.render({"detail": "Too many subscribers."}),
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        if since is None:
+            since = await hub.current_position()
+        if EVENT_STREAM_MEDIA_TYPE in request.headers.get("Accept", ""):
+            return stream_changes(since)
+        limit = settings.USERS_EVENTS_LONG_POLL_S
+        return await poll_changes(
+            since, limit if timeout is None else min(limit, timeout)
+        )
 
 
 class UserCreateView(APIView):
@@ -38,48 +426,88 @@ class UserCreateView(APIView):
         """
         serializer = UserCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = create_user(serializer.validated_data)
-        return Response(user, status=status.HTTP_201_CREATED)
+        try:
+            user = create_user(serializer.validated_data)
+        except DuplicateEmailError as exc:
+            raise _duplicate_email_error() from exc
+        return _written_user_response(request, user, status.HTTP_201_CREATED)
 
 
 class UserDetailView(APIView):
     """API view for individual user operations (retrieve, update, delete)."""
 
-    def get(self, _request, uid: str):
+    def get(self, request, uid: str):
         """Retrieve a specific user by ID.
 
+        The response carries an ``ETag`` for the user's version and a
+        ``Last-Modified`` from its ``updatedAt``; matching conditional
+        requests get a 304 without the body being rendered. Plain JSON
+        bodies are served from ``detail_cache``, keyed by id, version and
+        fieldset.
+
         Args:
-            _request: HTTP request (unused).
+            request: HTTP request. A ``fields`` query parameter limits the
+                response to the listed fields.
             uid (str): User ID to retrieve.
 
         Returns:
             Response: JSON response with user data or 404 error.
         """
-        user = get_user(uid)
-        if not user:
+        projection = get_projection(request)
+        user, version = get_user_snapshot(uid)
+        if user is None:
             return Response(
                 {"error": "User not found"}, status=status.HTTP_404_NOT_FOUND
             )
-        return Response(user)
+        tag = projection.tag if projection else None
+        etag = make_etag(USER_ETAG_PREFIX, version, request, tag)
+        last_modified = user_timestamp(user)
+        unchanged = not_modified(request, etag, last_modified)
+        if unchanged is not None:
+            return unchanged
+        if projection:
+            user = projection(user)
+        if not (_wants_plain_json(request) and detail_cache.enabled):
+            return set_validators(Response(user), etag, last_modified)
+        key = (uid, version, tag)
+        body = detail_cache.get(key)
+        if body is None:
+            body = _json_renderer.render(user)
+            detail_cache.put(key, body, len(body))
+        return set_validators(_json_response(body), etag, last_modified)
 
     def patch(self, request, uid: str):
         """Update a specific user by ID.
 
+        An ``If-Match`` header makes the update conditional on the user still
+        having one of the given ETags, for optimistic concurrency control.
+
         Args:
             request: HTTP request containing updated user data.
             uid (str): User ID to update.
 
         Returns:
-            Response: JSON response with updated user data or 404 error.
+            Response: JSON response with updated user data, 404 error, or
+            412 error if the ``If-Match`` precondition failed.
         """
-        serializer = UserUpdateSerializer(data=request.data)
+        serializer = UserUpdateSerializer(uid, data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = update_user(uid, serializer.validated_data)
+        try:
+            user = update_user(
+                uid, serializer.validated_data, if_versions=if_match_versions(request)
+            )
+        except DuplicateEmailError as exc:
+            raise _duplicate_email_error() from exc
+        except VersionConflictError:
+            return Response(
+                {"error": "User has been modified"},
+                status=status.HTTP_412_PRECONDITION_FAILED,
+            )
         if not user:
             return Response(
                 {"error": "User not found"}, status=status.HTTP_404_NOT_FOUND
             )
-        return Response(user)
+        return _written_user_response(request, user, status.HTTP_200_OK)
 
     def delete(self, _request, uid: str):
         """Delete a specific user by ID.
@@ -97,3 +525,248 @@ class UserDetailView(APIView):
                 {"error": "User not found"}, status=status.HTTP_404_NOT_FOUND
             )
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def _item_id(item) -> str | None:
+    """The ``id`` a bulk item names, if it names one."""
+    return item.get("id") if isinstance(item, dict) else None
+
+
+def _not_found_item(uid: str) -> dict:
+    """Result of a bulk item naming a user that does not exist."""
+    return {"id": uid, "status": status.HTTP_404_NOT_FOUND, "error": "User not found"}
+
+
+def _bulk_response(results: list[dict], item_ok: int, response_ok: int) -> Response:
+    """Respond to a bulk request with one result per item, in request order.
+
+    Args:
+        results (list[dict]): The item results, each with a ``status``.
+        item_ok (int): The status of an item that succeeded.
+        response_ok (int): The response status when every item succeeded.
+
+    Returns:
+        Response: ``{"results": [...]}`` with ``response_ok``, or 207
+        Multi-Status if any item failed.
+    """
+    failed = any(result["status"] != item_ok for result in results)
+    return Response(
+        {"results": results},
+        status=status.HTTP_207_MULTI_STATUS if failed else response_ok,
+    )
+
+
+class UsersBulkView(APIView):
+    """API view for creating, updating and deleting many users at once.
+
+    Each request takes a JSON array of up to ``USERS_BULK_MAX_ITEMS`` items.
+    The items are validated one by one, and the valid ones are applied to
+    the store in a single pass. Invalid or failing items do not stop the
+    rest; the response lists a result for every item.
+    """
+
+    def post(self, request):
+        """Create a user for every item.
+
+        Args:
+            request: HTTP request with an array of user data, as for
+                ``POST /user``.
+
+        Returns:
+            Response: 201 with a ``{"status": 201, "user": ...}`` result per
+            item, or 207 if some items were rejected with a ``400`` result
+            carrying their ``errors``.
+        """
+        serializer = UserCreateSerializer(
+            data=request.data, many=True, **_bulk_limits()
+        )
+        serializer.is_valid(raise_exception=True)
+        # ``many=True`` made this a BulkListSerializer.
+        # pylint: disable-next=no-member
+        items, item_errors = serializer.validated_data, serializer.item_errors
+        created = iter(create_users([data for data in items if data is not None]))
+        results = []
+        for data, errors in zip(items, item_errors):
+            user = next(created) if data is not None else None
+            if errors is not None:
+                results.append(
+                    {"status": status.HTTP_400_BAD_REQUEST, "errors": errors}
+                )
+            elif isinstance(user, DuplicateEmailError):
+                results.append(
+                    {
+                        "status": status.HTTP_400_BAD_REQUEST,
+                        "errors": _duplicate_email_error().detail,
+                    }
+                )
+            elif isinstance(user, Exception):
+                results.append(
+                    {
+                        "status": status.HTTP_400_BAD_REQUEST,
+                        "errors": {
+                            api_settings.NON_FIELD_ERRORS_KEY: ["Invalid user data."]
+                        },
+                    }
+                )
+            else:
+                results.append({"status": status.HTTP_201_CREATED, "user": user})
+        return _bulk_response(results, status.HTTP_201_CREATED, status.HTTP_201_CREATED)
+
+    def patch(self, request):
+        """Update the user named by every item.
+
+        Args:
+            request: HTTP request with an array of objects, each holding the
+                user's ``id`` and the fields to change, as for
+                ``PATCH /user/<uid>``.
+
+        Returns:
+            Response: 200 with an ``{"id", "status": 200, "user"}`` result
+            per item, or 207 if some items failed with a 400 or 404 result.
+        """
+        serializer = UserUpdateSerializer(
+            data=request.data, many=True, **_bulk_limits()
+        )
+        serializer.is_valid(raise_exception=True)
+        # ``many=True`` made this a BulkListSerializer.
+        # pylint: disable-next=no-member
+        items, item_errors = serializer.validated_data, serializer.item_errors
+        valid = [data for data in items if data is not None]
+        updated = iter(update_users([(data["id"], data) for data in valid]))
+        results = []
+        for raw, data, errors in zip(request.data, items, item_errors):
+            uid = _item_id(raw)
+            user = next(updated) if data is not None else None
+            if errors is not None:
+                results.append(
+                    {"id": uid, "status": status.HTTP_400_BAD_REQUEST, "errors": errors}
+                )
+            elif isinstance(user, DuplicateEmailError):
+                results.append(
+                    {
+                        "id": uid,
+                        "status": status.HTTP_400_BAD_REQUEST,
+                        "errors": _duplicate_email_error().detail,
+                    }
+                )
+            elif isinstance(user, Exception):
+                results.append(
+                    {
+                        "id": uid,
+                        "status": status.HTTP_400_BAD_REQUEST,
+                        "errors": {
+                            api_settings.NON_FIELD_ERRORS_KEY: ["Invalid user data."]
+                        },
+                    }
+                )
+            elif user is None:
+                results.append(_not_found_item(uid))
+            else:
+                results.append({"id": uid, "status": status.HTTP_200_OK, "user": user})
+        return _bulk_response(results, status.HTTP_200_OK, status.HTTP_200_OK)
+
+    def delete(self, request):
+        """Delete the user named by every id.
+
+        Args:
+            request: HTTP request with an array of user ids.
+
+        Returns:
+            Response: 200 with an ``{"id", "status": 204}`` result per id, or
+            207 if some ids were not found.
+        """
+        ids = serializers.ListField(
+            child=serializers.CharField(), **_bulk_limits()
+        ).run_validation(request.data)
+        results = [
+            (
+                {"id": uid, "status": status.HTTP_204_NO_CONTENT}
+                if deleted
+                else _not_found_item(uid)
+            )
+            for uid, deleted in zip(ids, delete_users(ids))
+        ]
+        return _bulk_response(results, status.HTTP_204_NO_CONTENT, status.HTTP_200_OK)
+
+
+class MetricsView(View):
+    """View serving the API's metrics (``users.metrics``) for Prometheus."""
+
+    def get(self, _request):
+        """Render the metrics in the Prometheus text format.
+
+        Returns:
+            HttpResponse: The exposition, as ``text/plain``.
+        """
+        body = render_metrics(count_users(), get_generation(), len(hub))
+        return HttpResponse(body, content_type=METRICS_CONTENT_TYPE)
+
+
+def _check_profiles_access(request) -> None:
+    """Hide the profiles unless profiling is on and, with a token, sent.
+
+    Raises:
+        Http404: If the request may not see the profiles.
+    """
+    setattr(request, PROFILING_EXEMPT, True)
+    if not settings.USERS_PROFILING:
+        raise Http404
+    if settings.USERS_PROFILING_TOKEN and not authorized(requested_flag(request)):
+        raise Http404
+
+
+class ProfilesView(View):
+    """View listing the request profiles kept by ``users.profiling``."""
+
+    def get(self, request):
+        """List the recent profiles, newest first.
+
+        Returns:
+            JsonResponse: ``profiles``, each with what was profiled and the
+            URL of each of its formats.
+        """
+        _check_profiles_access(request)
+        profiles = get_ring().index()
+        for profile in profiles:
+            for fmt in PROFILE_FORMATS:
+                profile[fmt] = reverse("profile", args=[profile["id"], fmt])
+        return JsonResponse({"profiles": profiles})
+
+
+class ProfileView(View):
+    """View serving one request profile in one of its formats."""
+
+    def get(self, request, profile_id: str, fmt: str):
+        """Serve a profile.
+
+        Args:
+            request: The HTTP request; for ``text``, a ``sort`` query
+                parameter picks the ``pstats`` sort key.
+            profile_id (str): The profile's id.
+            fmt (str): ``pstats`` for the ``pstats`` dump, ``text`` for its
+                text report.
+
+        Returns:
+            HttpResponse: The dump, as an attachment, or the report; 400
+            for an unknown sort key.
+
+        Raises:
+            Http404: If there is no such profile or format.
+        """
+        _check_profiles_access(request)
+        path = get_ring().path(profile_id)
+        if path is None or fmt not in PROFILE_FORMATS:
+            raise Http404
+        if fmt == "pstats":
+            return FileResponse(
+                path.open("rb"),
+                as_attachment=True,
+                filename=path.name,
+                content_type="application/octet-stream",
+            )
+        sort = request.GET.get("sort", "cumulative")
+        try:
+            report = render_report(path, sort)
+        except KeyError:
+            return HttpResponseBadRequest(f"Unknown sort key {sort!r}.")
+        return HttpResponse(report, content_type="text/plain; charset=utf-8")